@@ -2,15 +2,53 @@
 
 from __future__ import annotations
 
-from homeassistant.helpers import device_registry
-from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import Platform, CONF_USERNAME
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from aiohttp import ClientTimeout
 
+from homeassistant.helpers.device_registry import DeviceEntry
+from homeassistant.config_entries import ConfigEntry, ConfigEntryState
+from homeassistant.const import Platform, CONF_MODEL, CONF_USERNAME
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_create_clientsession
+import homeassistant.helpers.config_validation as cv
+from homeassistant.helpers.typing import ConfigType
+
+from .circuit import (
+    async_get_circuit_breaker,
+    create_circuit_breaker_middleware,
+    create_deadline_middleware,
+)
 from .coordinator import CleverTouchUpdateCoordinator
-
-from .const import DOMAIN
+from .metrics import ApiMetrics
+from .ratelimit import async_get_rate_limiter, create_rate_limit_middleware
+from .recording import TrafficRecorder, create_recording_middleware
+from .services import async_setup_services
+from .store import TopologyStore
+
+from .const import (
+    DOMAIN,
+    MODELS,
+    DEFAULT_MODEL_ID,
+    CONF_PER_HOME_UPDATES,
+    CONF_CONNECT_TIMEOUT,
+    CONF_READ_TIMEOUT,
+    CONF_WRITE_TIMEOUT,
+    CONF_RATE_LIMIT,
+    CONF_RATE_BURST,
+    API_CONNECT_TIMEOUT_SECONDS,
+    API_READ_TIMEOUT_SECONDS,
+    API_WRITE_TIMEOUT_SECONDS,
+    API_RATE_LIMIT_PER_SECOND,
+    API_RATE_LIMIT_BURST,
+)
+
+# Options used when creating the client session, applied by reloading the entry,
+# with the values used while not set
+RELOAD_OPTIONS = {
+    CONF_PER_HOME_UPDATES: False,
+    CONF_CONNECT_TIMEOUT: API_CONNECT_TIMEOUT_SECONDS,
+    CONF_READ_TIMEOUT: API_READ_TIMEOUT_SECONDS,
+    CONF_WRITE_TIMEOUT: API_WRITE_TIMEOUT_SECONDS,
+}
 
 PLATFORMS: list[Platform] = [
     Platform.CLIMATE,
@@ -19,6 +57,14 @@ PLATFORMS: list[Platform] = [
     Platform.SWITCH,
 ]
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the services of the integration."""
+    async_setup_services(hass)
+    return True
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Clever Touch E3 from a config entry."""
@@ -28,34 +74,150 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         if username:
             hass.config_entries.async_update_entry(entry, unique_id=username)
 
-    session = async_get_clientsession(hass)
-    coordinator = CleverTouchUpdateCoordinator(hass, entry=entry, session=session)
-    await coordinator.async_refresh()
+    # Use a session of our own to be able to trace the requests made to the API,
+    # to pass them through the circuit breaker and rate limiter shared by all
+    # entries of the host, to give them deadlines, and to record them on demand.
+    # The breaker comes first, so that the requests it rejects spend no tokens,
+    # and deadlines start once a request leaves the rate limiter.
+    metrics = ApiMetrics()
+    model_id = entry.data.get(CONF_MODEL) or DEFAULT_MODEL_ID
+    model = MODELS[model_id]
+    limiter = async_get_rate_limiter(hass, model.url)
+    _async_apply_rate_limit(hass, model.url)
+    breaker = async_get_circuit_breaker(hass, model.url)
+    recorder = TrafficRecorder(hass, model_id, model.url)
+    session = async_create_clientsession(
+        hass,
+        timeout=ClientTimeout(
+            connect=entry.options.get(CONF_CONNECT_TIMEOUT, API_CONNECT_TIMEOUT_SECONDS)
+        ),
+        trace_configs=[metrics.create_trace_config()],
+        middlewares=[
+            create_circuit_breaker_middleware(breaker, metrics),
+            create_rate_limit_middleware(limiter, metrics),
+            create_deadline_middleware(
+                metrics,
+                read_timeout=entry.options.get(
+                    CONF_READ_TIMEOUT, API_READ_TIMEOUT_SECONDS
+                ),
+                write_timeout=entry.options.get(
+                    CONF_WRITE_TIMEOUT, API_WRITE_TIMEOUT_SECONDS
+                ),
+            ),
+            create_recording_middleware(recorder),
+        ],
+    )
+    coordinator = CleverTouchUpdateCoordinator(
+        hass,
+        entry=entry,
+        session=session,
+        metrics=metrics,
+        breaker=breaker,
+        recorder=recorder,
+    )
+
+    # Build devices and entities from the last known topology when available,
+    # and fetch live data in the background instead of blocking the setup
+    restored = await coordinator.async_restore_topology()
+    if not restored:
+        await coordinator.async_refresh()
 
     hass.data.setdefault(DOMAIN, {})
     hass.data[DOMAIN][entry.entry_id] = coordinator
 
-    reg = device_registry.async_get(hass)
-
-    for home_id, home in coordinator.homes.items():
-        reg.async_get_or_create(
-            config_entry_id=entry.entry_id,
-            identifiers={(DOMAIN, coordinator.get_unique_home_id(home_id))},
-            manufacturer=coordinator.model.manufacturer,
-            model=coordinator.model.controller,
-            name=f"{home.info.label} {coordinator.model.controller}",
-            suggested_area=home.info.label,
-            configuration_url=f"https://{coordinator.host}",
-        )
+    coordinator.async_register_homes()
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
+
+    if restored:
+        entry.async_create_background_task(
+            hass, coordinator.async_staggered_refresh(), f"{DOMAIN}-initial-refresh"
+        )
+
     return True
 
 
+def _model_url(entry: ConfigEntry) -> str:
+    return MODELS[entry.data.get(CONF_MODEL) or DEFAULT_MODEL_ID].url
+
+
+def _async_apply_rate_limit(hass: HomeAssistant, host: str) -> None:
+    """Apply the strictest rate limit of the entries using a host to its limiter.
+
+    The entries being set up or loaded count, so that an entry being unloaded
+    no longer constrains the others.
+    """
+    entries = [
+        entry
+        for entry in hass.config_entries.async_entries(DOMAIN)
+        if entry.state in (ConfigEntryState.SETUP_IN_PROGRESS, ConfigEntryState.LOADED)
+        and _model_url(entry) == host
+    ]
+    if not entries:
+        return
+    async_get_rate_limiter(hass, host).configure(
+        min(
+            entry.options.get(CONF_RATE_LIMIT, API_RATE_LIMIT_PER_SECOND)
+            for entry in entries
+        ),
+        min(
+            entry.options.get(CONF_RATE_BURST, API_RATE_LIMIT_BURST)
+            for entry in entries
+        ),
+    )
+
+
+async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Apply changed options to the running coordinator.
+
+    Switching per-home updates on or off changes the coordinators the entities
+    listen to, and timeouts are set on the client session, so both require a
+    reload. Rate limits are applied to the limiter shared with other entries.
+    """
+    _async_apply_rate_limit(hass, _model_url(entry))
+    coordinator: CleverTouchUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+    if any(
+        entry.options.get(option, default)
+        != coordinator.setup_options.get(option, default)
+        for option, default in RELOAD_OPTIONS.items()
+    ):
+        await hass.config_entries.async_reload(entry.entry_id)
+    else:
+        coordinator.async_apply_options(entry.options)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
         hass.data[DOMAIN].pop(entry.entry_id)
+        _async_apply_rate_limit(hass, _model_url(entry))
 
     return unload_ok
+
+
+async def async_remove_config_entry_device(
+    hass: HomeAssistant, entry: ConfigEntry, device_entry: DeviceEntry
+) -> bool:
+    """Allow removing devices that are no longer reported by the cloud."""
+    coordinator: CleverTouchUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+    current_ids = {
+        coordinator.get_unique_device_id(device_id)
+        for home in coordinator.homes.values()
+        for device_id in home.devices
+    }
+    current_ids.update(
+        coordinator.get_unique_home_id(home_id) for home_id in coordinator.homes
+    )
+    current_ids.add(coordinator.get_unique_account_id())
+    return not any(
+        identifier in current_ids
+        for domain, identifier in device_entry.identifiers
+        if domain == DOMAIN
+    )
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the stored topology when a config entry is removed."""
+    await TopologyStore(hass, entry.entry_id).async_remove()
@@ -0,0 +1,203 @@
+"""Token handling for the CleverTouch cloud API."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime
+import logging
+import time
+from typing import NamedTuple
+
+from clevertouch import ApiSession, ApiAuthError
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_TOKEN, EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+from .const import DOMAIN, TOKEN_REFRESH_MARGIN_SECONDS, TOKEN_SAVE_DELAY_SECONDS
+from .metrics import ApiMetrics
+
+DATA_ACCESS_TOKENS = f"{DOMAIN}_access_tokens"
+
+# Requests wait for a new access token if it expires sooner than this
+MIN_TOKEN_VALIDITY_SECONDS = 10
+TOKEN_RETRY_SECONDS = 30
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class AccessToken(NamedTuple):
+    """Access token of a login, and when it expires."""
+
+    access_token: str
+    expires_at: float
+
+
+@callback
+def async_store_access_token(hass: HomeAssistant, api: ApiSession) -> None:
+    """Keep the access token of a login for the setup or reauth that follows.
+
+    Tokens are kept by refresh token, and expired tokens are dropped.
+    """
+    tokens: dict[str, AccessToken] = hass.data.setdefault(DATA_ACCESS_TOKENS, {})
+    now = time.time()
+    for refresh_token in [
+        refresh_token
+        for refresh_token, token in tokens.items()
+        if token.expires_at <= now
+    ]:
+        del tokens[refresh_token]
+    if api.refresh_token and api.access_token:
+        tokens[api.refresh_token] = AccessToken(api.access_token, api.expires_at)
+
+
+@callback
+def async_restore_access_token(hass: HomeAssistant, api: ApiSession) -> bool:
+    """Use the access token of a login with the same refresh token, if any.
+
+    Returns True if a valid access token was restored, sparing the API
+    session a token exchange before its first request.
+    """
+    tokens: dict[str, AccessToken] = hass.data.get(DATA_ACCESS_TOKENS, {})
+    token = tokens.pop(api.refresh_token, None) if api.refresh_token else None
+    if token is None or token.expires_at <= time.time():
+        return False
+    api.access_token, api.expires_at = token
+    return True
+
+
+class TokenManager:
+    """Keep the access token of an API session valid ahead of its expiry.
+
+    The access token is refreshed in the background before it expires, so
+    that reads and writes do not wait for a token exchange. Callers needing
+    a new token share the refresh in flight, and rotated refresh tokens are
+    saved to the config entry in batches.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        api: ApiSession,
+        metrics: ApiMetrics,
+    ) -> None:
+        """Initialize the token manager."""
+        self._hass = hass
+        self._entry = entry
+        self._api = api
+        self._metrics = metrics
+        self._refresh_task: asyncio.Task[None] | None = None
+        self._unsub_refresh: CALLBACK_TYPE | None = None
+        self._unsub_save: CALLBACK_TYPE | None = None
+        # Entries are not unloaded when Home Assistant stops
+        entry.async_on_unload(
+            hass.bus.async_listen(EVENT_HOMEASSISTANT_STOP, self._async_on_stop)
+        )
+
+    @property
+    def expires_in(self) -> float:
+        """Return the seconds until the access token expires."""
+        return self._api.expires_at - time.time()
+
+    async def async_ensure_valid(self) -> None:
+        """Wait until the access token is valid for the requests to come."""
+        if self.expires_in > MIN_TOKEN_VALIDITY_SECONDS:
+            if self._unsub_refresh is None and self._refresh_task is None:
+                self.async_schedule_refresh()
+            return
+        await self.async_refresh()
+
+    async def async_refresh(self) -> None:
+        """Refresh the access token, joining the refresh in flight if any."""
+        if self._refresh_task is None:
+            self._refresh_task = self._entry.async_create_background_task(
+                self._hass,
+                self._async_refresh_token(),
+                f"{DOMAIN}-token-refresh",
+                eager_start=False,
+            )
+        await asyncio.shield(self._refresh_task)
+
+    async def _async_refresh_token(self) -> None:
+        try:
+            await self._api.refresh_openid()
+        finally:
+            self._refresh_task = None
+        _LOGGER.debug("Access token refreshed, expires in %.0f s", self.expires_in)
+        self.async_schedule_refresh()
+        self.async_schedule_save()
+
+    @callback
+    def async_schedule_refresh(self) -> None:
+        """Schedule a refresh of the access token ahead of its expiry."""
+        self._cancel_refresh()
+        remaining = self.expires_in
+        delay = max(remaining - TOKEN_REFRESH_MARGIN_SECONDS, remaining / 2, 0)
+        self._unsub_refresh = async_call_later(
+            self._hass, delay, self._async_refresh_due
+        )
+
+    async def _async_refresh_due(self, _now: datetime) -> None:
+        self._unsub_refresh = None
+        try:
+            await self.async_refresh()
+        except ApiAuthError as ex:
+            # Left to the next update, which starts a reauth
+            _LOGGER.warning("Could not refresh the access token: %s", ex)
+        except Exception as ex:  # pylint: disable=broad-except
+            _LOGGER.debug(
+                "Could not refresh the access token, retrying in %s s: %s",
+                TOKEN_RETRY_SECONDS,
+                ex,
+            )
+            self._unsub_refresh = async_call_later(
+                self._hass, TOKEN_RETRY_SECONDS, self._async_refresh_due
+            )
+
+    def _cancel_refresh(self) -> None:
+        if self._unsub_refresh:
+            self._unsub_refresh()
+            self._unsub_refresh = None
+
+    def _is_rotated(self) -> bool:
+        token = self._api.refresh_token
+        return bool(token) and token != self._entry.data.get(CONF_TOKEN)
+
+    @callback
+    def async_schedule_save(self) -> None:
+        """Save a rotated refresh token with the next batch."""
+        if self._unsub_save is None and self._is_rotated():
+            self._unsub_save = async_call_later(
+                self._hass, TOKEN_SAVE_DELAY_SECONDS, self._async_save_due
+            )
+
+    @callback
+    def _async_save_due(self, _now: datetime) -> None:
+        self._unsub_save = None
+        self.async_save()
+
+    @callback
+    def async_save(self) -> None:
+        """Save a rotated refresh token to the config entry now."""
+        if self._unsub_save:
+            self._unsub_save()
+            self._unsub_save = None
+        if not self._is_rotated():
+            return
+        _LOGGER.debug("Saving rotated refresh token")
+        self._metrics.token_updates += 1
+        self._hass.config_entries.async_update_entry(
+            self._entry, data={**self._entry.data, CONF_TOKEN: self._api.refresh_token}
+        )
+
+    @callback
+    def _async_on_stop(self, _event: Event) -> None:
+        self.async_save()
+
+    @callback
+    def async_shutdown(self) -> None:
+        """Stop refreshing the access token, and save a rotated refresh token."""
+        self._cancel_refresh()
+        self.async_save()
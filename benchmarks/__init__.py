@@ -0,0 +1,5 @@
+"""Offline benchmarks for the CleverTouch integration.
+
+Run with `python benchmarks/run.py --help` in an environment where Home
+Assistant and the clevertouch library are installed.
+"""
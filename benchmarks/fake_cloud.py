@@ -0,0 +1,322 @@
+"""A local stand-in for the CleverTouch cloud API."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+import random
+import socket
+import ssl
+import tempfile
+from typing import Any
+
+from aiohttp import ClientSession, TCPConnector, web
+from aiohttp.abc import AbstractResolver, ResolveResult
+
+from ..const import MODELS
+
+API_PATH = "/api/v0.1/"
+TOKEN_PATH_SUFFIX = "/protocol/openid-connect/token"
+
+STATUS_READ_OK = {"code": "1", "key": "OK", "value": "Success"}
+STATUS_WRITE_OK = {"code": "8", "key": "QUERY_PUSHED", "value": "Query pushed"}
+
+# Device temperatures are expressed in the device unit, (celsius * 18) + 320
+COMFORT_TEMP = 698
+ECO_TEMP = 644
+FROST_TEMP = 446
+BOOST_TEMP = 752
+
+
+@dataclass
+class FakeCloudConfig:
+    """Size and behaviour of the simulated cloud."""
+
+    homes: int = 1
+    radiators: int = 10
+    outlets: int = 2
+    zones: int = 4
+    latency: float = 0.05
+    jitter: float = 0.02
+    error_rate: float = 0.0
+    change_rate: float = 0.1
+    token_lifetime: int = 300
+    seed: int = 0
+
+
+@dataclass
+class FakeCloudStats:
+    """Requests handled by the simulated cloud."""
+
+    requests: Counter[str] = field(default_factory=Counter)
+    hosts: Counter[str] = field(default_factory=Counter)
+    errors: int = 0
+
+    @property
+    def total(self) -> int:
+        """Return the total number of requests."""
+        return sum(self.requests.values())
+
+    def reset(self) -> None:
+        """Reset all counters."""
+        self.requests.clear()
+        self.hosts.clear()
+        self.errors = 0
+
+
+class FakeCloud:
+    """Simulate homes, radiators and outlets behind the CleverTouch API.
+
+    A single HTTPS server answers for the API and authentication hosts of all
+    models in MODELS, relying on the client session to resolve those host
+    names to the local server.
+    """
+
+    def __init__(self, config: FakeCloudConfig) -> None:
+        """Initialize the simulated cloud."""
+        self.config = config
+        self.stats = FakeCloudStats()
+        self._random = random.Random(config.seed)
+        self._hosts = {model.url for model in MODELS.values()}
+        self._hosts |= {f"auth.{host}" for host in self._hosts}
+        self.homes: dict[str, dict[str, Any]] = {
+            f"home{home}": self._make_home(home) for home in range(config.homes)
+        }
+        self._runner: web.AppRunner | None = None
+        self._sessions: list[ClientSession] = []
+        self.port: int = 0
+
+    def _make_home(self, home: int) -> dict[str, Any]:
+        zones = [
+            {"num_zone": str(zone), "zone_label": f"Zone {zone}"}
+            for zone in range(1, self.config.zones + 1)
+        ]
+        devices = [
+            {
+                "id": f"{home}-C{device}",
+                "id_device": f"C{device:03d}",
+                "label_interface": f"Radiator {device}",
+                "num_zone": str(device % self.config.zones + 1),
+                "gv_mode": "0",
+                "nv_mode": "0",
+                "heating_up": "0",
+                "consigne_confort": str(COMFORT_TEMP),
+                "consigne_eco": str(ECO_TEMP),
+                "consigne_hg": str(FROST_TEMP),
+                "consigne_boost": str(BOOST_TEMP),
+                "consigne_manuel": str(COMFORT_TEMP),
+                "temperature_air": str(COMFORT_TEMP - self._random.randint(0, 36)),
+                "time_boost": "3600",
+                "time_boost_format_chrono": {"d": "0", "h": "0", "m": "0", "s": "0"},
+            }
+            for device in range(self.config.radiators)
+        ]
+        devices.extend(
+            {
+                "id": f"{home}-O{device}",
+                "id_device": f"O{device:03d}",
+                "label_interface": f"Outlet {device}",
+                "num_zone": str(device % self.config.zones + 1),
+                "on_off": "0",
+            }
+            for device in range(self.config.outlets)
+        )
+        return {
+            "smarthome_id": f"home{home}",
+            "label": f"Home {home}",
+            "zones": zones,
+            "devices": devices,
+        }
+
+    def _drift(self, home: dict[str, Any]) -> None:
+        """Let some radiators change temperature and heating state."""
+        for device in home["devices"]:
+            if "temperature_air" not in device:
+                continue
+            if self._random.random() >= self.config.change_rate:
+                continue
+            temp = int(device["temperature_air"]) + self._random.choice((-2, 2))
+            device["temperature_air"] = str(temp)
+            device["heating_up"] = (
+                "1" if temp < int(device["consigne_confort"]) else "0"
+            )
+
+    async def _simulate(self, request: web.Request, endpoint: str) -> None:
+        host = request.host.split(":")[0]
+        if host not in self._hosts:
+            raise web.HTTPNotFound(text=f"Unknown host {host}")
+        self.stats.requests[endpoint] += 1
+        self.stats.hosts[host] += 1
+        delay = self.config.latency + self._random.uniform(0, self.config.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if self._random.random() < self.config.error_rate:
+            self.stats.errors += 1
+            raise web.HTTPInternalServerError()
+
+    async def _handle_token(self, request: web.Request) -> web.Response:
+        await self._simulate(request, "token")
+        form = await request.post()
+        if form.get("grant_type") not in ("password", "refresh_token"):
+            raise web.HTTPBadRequest()
+        token = f"token-{self._random.getrandbits(64):x}"
+        return web.json_response(
+            {
+                "access_token": f"access-{token}",
+                "refresh_token": f"refresh-{token}",
+                "expires_in": self.config.token_lifetime,
+            }
+        )
+
+    async def _handle_user(self, request: web.Request) -> web.Response:
+        await self._simulate(request, "user/read")
+        return web.json_response(
+            {
+                "code": STATUS_READ_OK,
+                "data": {
+                    "user_id": "1",
+                    "smarthomes": [
+                        {"smarthome_id": home_id, "label": home["label"]}
+                        for home_id, home in self.homes.items()
+                    ],
+                },
+                "parameters": {},
+            }
+        )
+
+    async def _handle_home(self, request: web.Request) -> web.Response:
+        await self._simulate(request, "smarthome/read")
+        form = await request.post()
+        if (home := self.homes.get(form.get("smarthome_id"))) is None:
+            raise web.HTTPNotFound()
+        self._drift(home)
+        return web.json_response(
+            {"code": STATUS_READ_OK, "data": home, "parameters": {}}
+        )
+
+    async def _handle_query(self, request: web.Request) -> web.Response:
+        await self._simulate(request, "query/push")
+        form = await request.post()
+        if (home := self.homes.get(form.get("smarthome_id"))) is None:
+            raise web.HTTPNotFound()
+        query = {
+            key[len("query[") : -1]: value
+            for key, value in form.items()
+            if key.startswith("query[")
+        }
+        for device in home["devices"]:
+            if device["id_device"] == query.get("id_device"):
+                device.update(query)
+                if "time_boost" in query and device.get("gv_mode") == "4":
+                    remaining = timedelta(seconds=int(query["time_boost"]))
+                    device["time_boost_format_chrono"] = _chrono(remaining)
+        return web.json_response(
+            {"code": STATUS_WRITE_OK, "data": {}, "parameters": {}}
+        )
+
+    async def async_start(self) -> None:
+        """Start serving on a random local port."""
+        app = web.Application()
+        app.router.add_post(API_PATH + "human/user/read/", self._handle_user)
+        app.router.add_post(API_PATH + "human/smarthome/read/", self._handle_home)
+        app.router.add_post(API_PATH + "human/query/push/", self._handle_query)
+        app.router.add_post("/realms/{realm}" + TOKEN_PATH_SUFFIX, self._handle_token)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(
+            self._runner, "127.0.0.1", 0, ssl_context=_create_server_context()
+        )
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]  # noqa: SLF001
+
+    async def async_stop(self) -> None:
+        """Stop serving and close the sessions created."""
+        for session in self._sessions:
+            await session.close()
+        self._sessions.clear()
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def create_session(self, **kwargs: Any) -> ClientSession:
+        """Create a client session that connects all hosts to this server."""
+        session = ClientSession(
+            connector=TCPConnector(resolver=_LocalResolver(self.port), ssl=False),
+            **kwargs,
+        )
+        self._sessions.append(session)
+        return session
+
+
+class _LocalResolver(AbstractResolver):
+    """Resolve every host name to the local server."""
+
+    def __init__(self, port: int) -> None:
+        self._port = port
+
+    async def resolve(
+        self, host: str, port: int = 0, family: socket.AddressFamily = socket.AF_INET
+    ) -> list[ResolveResult]:
+        return [
+            ResolveResult(
+                hostname=host,
+                host="127.0.0.1",
+                port=self._port,
+                family=socket.AF_INET,
+                proto=0,
+                flags=socket.AI_NUMERICHOST,
+            )
+        ]
+
+    async def close(self) -> None:
+        pass
+
+
+def _chrono(remaining: timedelta) -> dict[str, str]:
+    seconds = int(remaining.total_seconds())
+    return {
+        "d": str(seconds // 86400),
+        "h": str(seconds % 86400 // 3600),
+        "m": str(seconds % 3600 // 60),
+        "s": str(seconds % 60),
+    }
+
+
+def _create_server_context() -> ssl.SSLContext:
+    """Create a TLS context with a throwaway self-signed certificate."""
+    # pylint: disable=import-outside-toplevel
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.x509.oid import NameOID
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "fake-clevertouch")])
+    now = datetime.now(timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - timedelta(days=1))
+        .not_valid_after(now + timedelta(days=1))
+        .sign(key, hashes.SHA256())
+    )
+
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    with tempfile.NamedTemporaryFile() as cert_file, tempfile.NamedTemporaryFile() as key_file:
+        cert_file.write(cert.public_bytes(serialization.Encoding.PEM))
+        key_file.write(
+            key.private_bytes(
+                serialization.Encoding.PEM,
+                serialization.PrivateFormat.PKCS8,
+                serialization.NoEncryption(),
+            )
+        )
+        cert_file.flush()
+        key_file.flush()
+        context.load_cert_chain(cert_file.name, key_file.name)
+    return context
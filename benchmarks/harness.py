@@ -0,0 +1,186 @@
+"""Benchmark the integration against the local fake cloud."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from functools import wraps
+from pathlib import Path
+import resource
+import statistics
+import time
+import tracemalloc
+from types import MappingProxyType
+from unittest.mock import patch
+
+from homeassistant import bootstrap, config_entries, core, loader
+from homeassistant.const import CONF_MODEL, CONF_TOKEN, CONF_USERNAME
+from homeassistant.helpers.entity import Entity
+
+from ..const import DOMAIN
+from ..coordinator import CleverTouchUpdateCoordinator
+from .fake_cloud import FakeCloud, FakeCloudConfig
+from .replay import ReplayCloud
+
+INTEGRATION_MODULE = __package__.rpartition(".")[0]
+
+
+@dataclass
+class BenchmarkConfig:
+    """Parameters of a benchmark run."""
+
+    cloud: FakeCloudConfig = field(default_factory=FakeCloudConfig)
+    model_id: str = "purmo"
+    cycles: int = 20
+    trace_memory: bool = False
+    # Recording replayed instead of the simulated cloud, and its speed
+    replay: Path | None = None
+    replay_speed: float = 1.0
+
+
+@dataclass
+class BenchmarkReport:
+    """Results of a benchmark run."""
+
+    setup_seconds: float = 0.0
+    entities: int = 0
+    refresh_seconds: list[float] = field(default_factory=list)
+    api_calls: list[int] = field(default_factory=list)
+    state_writes: list[int] = field(default_factory=list)
+    failed_cycles: int = 0
+    peak_rss_mb: float = 0.0
+    peak_traced_mb: float | None = None
+
+    def format(self) -> str:
+        """Format the report for humans."""
+        lines = [
+            f"setup:            {self.setup_seconds * 1000:.1f} ms "
+            f"({self.entities} entities)",
+            "refresh latency:  " + _format_percentiles(self.refresh_seconds),
+            f"api calls/cycle:  {_mean(self.api_calls):.1f}",
+            f"state writes/cycle: {_mean(self.state_writes):.1f}",
+            f"failed cycles:    {self.failed_cycles}/{len(self.refresh_seconds)}",
+            f"peak rss:         {self.peak_rss_mb:.1f} MB",
+        ]
+        if self.peak_traced_mb is not None:
+            lines.append(f"peak traced:      {self.peak_traced_mb:.1f} MB")
+        return "\n".join(lines)
+
+
+class _StateWriteCounter:
+    """Count calls to Entity.async_write_ha_state."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self._patch = None
+
+    def __enter__(self) -> _StateWriteCounter:
+        original = Entity.async_write_ha_state
+
+        @wraps(original)
+        def _counting(entity: Entity) -> None:
+            self.count += 1
+            original(entity)
+
+        self._patch = patch.object(Entity, "async_write_ha_state", _counting)
+        self._patch.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._patch.stop()
+
+
+async def async_run(config: BenchmarkConfig, config_dir: str) -> BenchmarkReport:
+    """Set up the integration against the fake cloud and time refresh cycles.
+
+    The config directory must contain the integration below
+    custom_components, and be importable as a package root.
+    """
+    report = BenchmarkReport()
+    model_id = config.model_id
+    if config.replay:
+        cloud: FakeCloud = ReplayCloud(config.replay, config.replay_speed)
+        model_id = cloud.model_id
+    else:
+        cloud = FakeCloud(config.cloud)
+    await cloud.async_start()
+
+    hass = core.HomeAssistant(config_dir)
+    loader.async_setup(hass)
+    hass.config_entries = config_entries.ConfigEntries(hass, {})
+    await bootstrap.async_load_base_functionality(hass)
+    await hass.async_start()
+
+    if config.trace_memory:
+        tracemalloc.start()
+
+    try:
+        entry = config_entries.ConfigEntry(
+            data={
+                CONF_USERNAME: "benchmark@example.com",
+                CONF_TOKEN: "benchmark-refresh-token",
+                CONF_MODEL: model_id,
+            },
+            discovery_keys=MappingProxyType({}),
+            domain=DOMAIN,
+            minor_version=1,
+            options={},
+            source=config_entries.SOURCE_USER,
+            subentries_data=None,
+            title="Benchmark",
+            unique_id="benchmark@example.com",
+            version=1,
+        )
+
+        with (
+            patch(
+                f"{INTEGRATION_MODULE}.async_create_clientsession",
+                side_effect=lambda hass, **kwargs: cloud.create_session(**kwargs),
+            ),
+            _StateWriteCounter() as writes,
+        ):
+            start = time.perf_counter()
+            await hass.config_entries.async_add(entry)
+            await hass.async_block_till_done()
+            report.setup_seconds = time.perf_counter() - start
+            report.entities = len(hass.states.async_entity_ids())
+
+            coordinator: CleverTouchUpdateCoordinator = hass.data[DOMAIN][
+                entry.entry_id
+            ]
+            for _ in range(config.cycles):
+                cloud.stats.reset()
+                writes.count = 0
+                start = time.perf_counter()
+                await coordinator.async_refresh()
+                report.refresh_seconds.append(time.perf_counter() - start)
+                report.api_calls.append(cloud.stats.total)
+                report.state_writes.append(writes.count)
+                if not coordinator.last_update_success:
+                    report.failed_cycles += 1
+
+            await hass.config_entries.async_unload(entry.entry_id)
+
+        if config.trace_memory:
+            report.peak_traced_mb = tracemalloc.get_traced_memory()[1] / 2**20
+    finally:
+        if config.trace_memory:
+            tracemalloc.stop()
+        await hass.async_stop(force=True)
+        await cloud.async_stop()
+
+    report.peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return report
+
+
+def _mean(values: list[int]) -> float:
+    return statistics.fmean(values) if values else 0.0
+
+
+def _format_percentiles(values: list[float]) -> str:
+    if len(values) < 2:
+        return "n/a"
+    cuts = statistics.quantiles(values, n=100, method="inclusive")
+    return (
+        f"p50 {cuts[49] * 1000:.1f} ms, p90 {cuts[89] * 1000:.1f} ms, "
+        f"p99 {cuts[98] * 1000:.1f} ms, max {max(values) * 1000:.1f} ms"
+    )
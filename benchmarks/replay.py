@@ -0,0 +1,108 @@
+"""Replay of recorded CleverTouch API traffic."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Any
+
+from aiohttp import web
+
+from ..recording import read_recording
+from .fake_cloud import (
+    API_PATH,
+    STATUS_READ_OK,
+    STATUS_WRITE_OK,
+    FakeCloud,
+    FakeCloudConfig,
+)
+
+USER_PATH = API_PATH + "human/user/read/"
+
+
+class ReplayCloud(FakeCloud):
+    """Serve the responses of a recording instead of simulated homes.
+
+    Requests are answered with the responses recorded for the same endpoint
+    and home, in the order recorded, starting over when exhausted. Each
+    response is delayed by its recorded duration divided by the speed, or
+    not at all with a speed of 0. Tokens are issued as by the fake cloud,
+    as recorded tokens are scrubbed, and the homes of the user are those of
+    the recorded home reads when the user was not read while recording.
+
+    Sessions of the replay cloud can also be used with the library directly,
+    e.g. to profile Home.refresh() on the payloads of a real installation.
+    """
+
+    def __init__(self, path: Path, speed: float = 1.0) -> None:
+        """Initialize the replay from a recording file."""
+        super().__init__(FakeCloudConfig(homes=0, latency=0.0, jitter=0.0))
+        header, records = read_recording(path)
+        self.model_id: str = header["model"]
+        self.speed = speed
+        self._responses: dict[tuple[str, str | None], list[dict[str, Any]]] = (
+            defaultdict(list)
+        )
+        for record in records:
+            self._responses[_key(record["path"], record["form"])].append(record)
+        self._positions: Counter[tuple[str, str | None]] = Counter()
+        if (USER_PATH, None) not in self._responses:
+            self._responses[USER_PATH, None].append(self._user_record(records))
+
+    @staticmethod
+    def _user_record(records: list[dict[str, Any]]) -> dict[str, Any]:
+        """Return a read of the user with the homes read in the recording."""
+        homes = {
+            data["smarthome_id"]: data.get("label", data["smarthome_id"])
+            for record in records
+            if isinstance(record["body"], dict)
+            and isinstance(data := record["body"].get("data"), dict)
+            and "smarthome_id" in data
+        }
+        return {
+            "duration": 0.0,
+            "status": 200,
+            "body": {
+                "code": STATUS_READ_OK,
+                "data": {
+                    "user_id": "1",
+                    "smarthomes": [
+                        {"smarthome_id": home_id, "label": label}
+                        for home_id, label in homes.items()
+                    ],
+                },
+                "parameters": {},
+            },
+        }
+
+    async def _async_replay(self, request: web.Request, endpoint: str) -> web.Response:
+        await self._simulate(request, endpoint)
+        key = _key(request.path, await request.post())
+        if not (responses := self._responses.get(key)):
+            if endpoint == "query/push":
+                return web.json_response(
+                    {"code": STATUS_WRITE_OK, "data": {}, "parameters": {}}
+                )
+            raise web.HTTPNotFound(text=f"Nothing recorded for {key}")
+        record = responses[self._positions[key] % len(responses)]
+        self._positions[key] += 1
+        if self.speed > 0:
+            await asyncio.sleep(record["duration"] / self.speed)
+        if isinstance(record["body"], str):
+            return web.Response(text=record["body"], status=record["status"])
+        return web.json_response(record["body"], status=record["status"])
+
+    async def _handle_user(self, request: web.Request) -> web.Response:
+        return await self._async_replay(request, "user/read")
+
+    async def _handle_home(self, request: web.Request) -> web.Response:
+        return await self._async_replay(request, "smarthome/read")
+
+    async def _handle_query(self, request: web.Request) -> web.Response:
+        return await self._async_replay(request, "query/push")
+
+
+def _key(path: str, form: Any) -> tuple[str, str | None]:
+    """Return the key matching requests to their recorded responses."""
+    return path, form.get("smarthome_id")
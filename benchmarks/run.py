@@ -0,0 +1,104 @@
+"""Run the offline benchmarks from the command line.
+
+The integration is linked into a temporary Home Assistant configuration
+directory, so that it is loaded as a custom component like in production.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import importlib
+import json
+import logging
+from pathlib import Path
+import sys
+import tempfile
+
+ROOT = Path(__file__).resolve().parent.parent
+DOMAIN = json.loads((ROOT / "manifest.json").read_text())["domain"]
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model", default="purmo", help="model id from MODELS")
+    parser.add_argument("--homes", type=int, default=1)
+    parser.add_argument("--radiators", type=int, default=10, help="per home")
+    parser.add_argument("--outlets", type=int, default=2, help="per home")
+    parser.add_argument("--cycles", type=int, default=20, help="refresh cycles")
+    parser.add_argument(
+        "--latency", type=float, default=0.05, help="seconds per request"
+    )
+    parser.add_argument(
+        "--jitter", type=float, default=0.02, help="extra random seconds"
+    )
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="share of failed requests"
+    )
+    parser.add_argument(
+        "--change-rate",
+        type=float,
+        default=0.1,
+        help="share of radiators changing temperature per read",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--replay", type=Path, help="replay a recording instead of the fake cloud"
+    )
+    parser.add_argument(
+        "--speed", type=float, default=1.0, help="replay speed, 0 for no delays"
+    )
+    parser.add_argument(
+        "--trace-memory", action="store_true", help="also report traced memory"
+    )
+    parser.add_argument("--json", action="store_true", help="print JSON")
+    parser.add_argument("--debug", action="store_true", help="enable debug logs")
+    return parser.parse_args()
+
+
+def main() -> None:
+    """Run a benchmark and print the report."""
+    args = _parse_args()
+    logging.basicConfig(level=logging.DEBUG if args.debug else logging.WARNING)
+    if not args.debug:
+        # The library logs a stack trace for every simulated error
+        logging.getLogger("clevertouch").setLevel(logging.CRITICAL)
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        components = Path(config_dir, "custom_components")
+        components.mkdir()
+        (components / "__init__.py").touch()
+        (components / DOMAIN).symlink_to(ROOT, target_is_directory=True)
+        sys.path.insert(0, config_dir)
+
+        package = f"custom_components.{DOMAIN}.benchmarks"
+        harness = importlib.import_module(f"{package}.harness")
+        fake_cloud = importlib.import_module(f"{package}.fake_cloud")
+
+        config = harness.BenchmarkConfig(
+            cloud=fake_cloud.FakeCloudConfig(
+                homes=args.homes,
+                radiators=args.radiators,
+                outlets=args.outlets,
+                latency=args.latency,
+                jitter=args.jitter,
+                error_rate=args.error_rate,
+                change_rate=args.change_rate,
+                seed=args.seed,
+            ),
+            model_id=args.model,
+            cycles=args.cycles,
+            trace_memory=args.trace_memory,
+            replay=args.replay,
+            replay_speed=args.speed,
+        )
+        report = asyncio.run(harness.async_run(config, config_dir))
+
+    if args.json:
+        print(json.dumps(report.__dict__, indent=2))
+    else:
+        print(report.format())
+
+
+if __name__ == "__main__":
+    main()
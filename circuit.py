@@ -0,0 +1,201 @@
+"""Deadlines and circuit breaking of requests to the CleverTouch cloud API."""
+
+from __future__ import annotations
+
+import asyncio
+from enum import Enum
+import logging
+import time
+
+from aiohttp import (
+    ClientConnectionError,
+    ClientError,
+    ClientHandlerType,
+    ClientMiddlewareType,
+    ClientRequest,
+    ClientResponse,
+    ServerTimeoutError,
+)
+
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN, CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_SECONDS
+from .metrics import ApiMetrics
+from .ratelimit import WRITE_PATH_SUFFIXES
+
+DATA_CIRCUIT_BREAKERS = f"{DOMAIN}_circuit_breakers"
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class CircuitState(Enum):
+    """State of a circuit breaker."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(ClientConnectionError):
+    """Error raised for requests to a host while its circuit is open."""
+
+    def __init__(self, host: str, retry_in: float) -> None:
+        """Initialize the error."""
+        super().__init__(
+            f"Requests to {host} are suspended after repeated failures, "
+            f"retrying in {retry_in:.0f} s"
+        )
+        self.host = host
+        self.retry_in = retry_in
+
+
+class HostCircuitBreaker:
+    """Circuit breaker for the requests to a single host.
+
+    Consecutive failures open the circuit, and requests then fail without
+    reaching the host. Once the reset timeout has passed, the circuit is
+    half-open and a single probe request is let through, closing the circuit
+    if it succeeds and opening it again if it fails.
+    """
+
+    def __init__(self, host: str, failure_threshold: int, reset_timeout: float) -> None:
+        """Initialize the circuit breaker."""
+        self.host = host
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._probing = False
+
+    @property
+    def state(self) -> CircuitState:
+        """Return the current state of the circuit."""
+        if self._opened_at is None:
+            return CircuitState.CLOSED
+        if time.monotonic() - self._opened_at < self._reset_timeout:
+            return CircuitState.OPEN
+        return CircuitState.HALF_OPEN
+
+    @property
+    def retry_in(self) -> float:
+        """Return the seconds until the circuit is half-open."""
+        if self._opened_at is None:
+            return 0.0
+        return max(0.0, self._opened_at + self._reset_timeout - time.monotonic())
+
+    def acquire(self) -> None:
+        """Let a request through, or raise CircuitOpenError."""
+        match self.state:
+            case CircuitState.OPEN:
+                raise CircuitOpenError(self.host, self.retry_in)
+            case CircuitState.HALF_OPEN:
+                if self._probing:
+                    raise CircuitOpenError(self.host, self.retry_in)
+                _LOGGER.debug("Probing %s", self.host)
+                self._probing = True
+
+    def release(self) -> None:
+        """Release a request that ended without a result, e.g. cancelled."""
+        self._probing = False
+
+    def record_success(self) -> None:
+        """Record a successful request, closing the circuit."""
+        if self._opened_at is not None:
+            _LOGGER.info("Requests to %s are resumed", self.host)
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+
+    def record_failure(self) -> None:
+        """Record a failed request, opening the circuit if failures persist."""
+        self._failures += 1
+        if self._probing or (
+            self._opened_at is None and self._failures >= self._failure_threshold
+        ):
+            _LOGGER.warning(
+                "Suspending requests to %s for %s s after %d failures",
+                self.host,
+                self._reset_timeout,
+                self._failures,
+            )
+            self._opened_at = time.monotonic()
+        self._probing = False
+
+
+def async_get_circuit_breaker(hass: HomeAssistant, host: str) -> HostCircuitBreaker:
+    """Return the circuit breaker shared by all config entries using a host."""
+    breakers: dict[str, HostCircuitBreaker] = hass.data.setdefault(
+        DATA_CIRCUIT_BREAKERS, {}
+    )
+    if (breaker := breakers.get(host)) is None:
+        breaker = breakers[host] = HostCircuitBreaker(
+            host, CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_SECONDS
+        )
+    return breaker
+
+
+def create_circuit_breaker_middleware(
+    breaker: HostCircuitBreaker, metrics: ApiMetrics
+) -> ClientMiddlewareType:
+    """Create a client session middleware with a circuit breaker.
+
+    Connection errors, including timeouts, and server errors count as
+    failures of the host.
+    """
+
+    async def _middleware(
+        request: ClientRequest, handler: ClientHandlerType
+    ) -> ClientResponse:
+        try:
+            breaker.acquire()
+        except CircuitOpenError:
+            metrics.circuit_rejections += 1
+            raise
+
+        try:
+            response = await handler(request)
+        except ClientError:
+            breaker.record_failure()
+            raise
+        except BaseException:
+            breaker.release()
+            raise
+
+        if response.status >= 500:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        return response
+
+    return _middleware
+
+
+def create_deadline_middleware(
+    metrics: ApiMetrics, *, read_timeout: float, write_timeout: float
+) -> ClientMiddlewareType:
+    """Create a client session middleware giving requests deadlines.
+
+    Each request, including reading its response, must complete within the
+    timeout of its kind.
+    """
+
+    async def _middleware(
+        request: ClientRequest, handler: ClientHandlerType
+    ) -> ClientResponse:
+        timeout = (
+            write_timeout
+            if request.url.path.endswith(WRITE_PATH_SUFFIXES)
+            else read_timeout
+        )
+        try:
+            async with asyncio.timeout(timeout):
+                response = await handler(request)
+                await response.read()
+        except TimeoutError as ex:
+            metrics.request_timeouts += 1
+            raise ServerTimeoutError(
+                f"Request to {request.url.path} timed out after {timeout} s"
+            ) from ex
+        return response
+
+    return _middleware
@@ -1,6 +1,7 @@
 """CleverTouch climate entities"""
 
-from typing import Optional
+from collections.abc import Awaitable
+from typing import Any, Optional
 from datetime import timedelta
 
 import voluptuous as vol
@@ -18,6 +19,7 @@ from homeassistant.const import (
 )
 
 from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ServiceValidationError
 from homeassistant.helpers.entity_platform import (
     AddEntitiesCallback,
     async_get_current_platform,
@@ -33,8 +35,9 @@ from .const import (
     TEMP_NATIVE_MAX,
     TEMP_NATIVE_PRECISION,
 )
-from clevertouch.devices import Radiator, HeatMode, TempType
+from clevertouch.devices import Device, Radiator, HeatMode, TempType
 from .coordinator import CleverTouchUpdateCoordinator, CleverTouchEntity
+from .snapshot import temperature_fields
 
 
 async def async_setup_entry(
@@ -43,17 +46,12 @@ async def async_setup_entry(
     """Set up CleverTouch climate entities."""
     coordinator: CleverTouchUpdateCoordinator = hass.data[DOMAIN].get(entry.entry_id)
 
-    entities = [
-        RadiatorEntity(coordinator, device)
-        for home in coordinator.homes.values()
-        for device in home.devices.values()
-        if isinstance(device, Radiator)
-    ]
+    def _create_entities(device: Device) -> list[ClimateEntity]:
+        if isinstance(device, Radiator):
+            return [RadiatorEntity(coordinator, device)]
+        return []
 
-    async_add_entities(
-        entities,
-        update_before_add=True,
-    )
+    coordinator.async_add_device_entities(async_add_entities, _create_entities)
 
     # add platform service to turn_on/activate scene with advanced options
     platform = async_get_current_platform()
@@ -68,6 +66,53 @@ async def async_setup_entry(
     )
 
 
+# Heat modes whose temperature may be set when activating them
+TEMPERATURE_HEAT_MODES = (
+    HeatMode.ECO,
+    HeatMode.FROST,
+    HeatMode.COMFORT,
+    HeatMode.BOOST,
+)
+
+
+def validate_heat_mode_options(
+    mode: str,
+    *,
+    temperature: Optional[float] = None,
+    duration: Optional[timedelta] = None,
+) -> None:
+    """Raise if a temperature or a duration can not be set with a heat mode."""
+    if temperature and mode not in TEMPERATURE_HEAT_MODES:
+        raise ServiceValidationError(f"A temperature can not be set for {mode}")
+    if duration and mode != HeatMode.BOOST:
+        raise ServiceValidationError(
+            f"A duration can only be set for {HeatMode.BOOST}, not for {mode}"
+        )
+
+
+def activate_heat_mode(
+    radiator: Radiator,
+    mode: str,
+    *,
+    temperature: Optional[float] = None,
+    duration: Optional[timedelta] = None,
+) -> tuple[Awaitable[None], dict[str, Any]]:
+    """Return the write activating a heat mode, and the values it changes."""
+    optimistic: dict[str, Any] = {"heat_mode": mode}
+    if temperature:
+        optimistic[f"temp_{TempType.TARGET}"] = temperature
+    if duration:
+        # The remaining boost time counts down, so it is never shown as written
+        optimistic["boost_time"] = int(duration.total_seconds())
+    write = radiator.activate_mode(
+        mode,
+        temp_value=temperature,
+        temp_unit=TEMP_NATIVE_UNIT if temperature else None,
+        boost_time=int(duration.total_seconds()) if duration else None,
+    )
+    return write, optimistic
+
+
 class RadiatorEntity(CleverTouchEntity, ClimateEntity):
     """Representation of a CleverTouch climate entity."""
 
@@ -100,58 +145,67 @@ class RadiatorEntity(CleverTouchEntity, ClimateEntity):
             ClimateEntityFeature.TARGET_TEMPERATURE | ClimateEntityFeature.PRESET_MODE
         )
 
+    def _state_values(self) -> Any:
+        snapshot = self.snapshot
+        return (
+            snapshot.heat_mode,
+            snapshot.active,
+            snapshot.temperatures.get("current"),
+            snapshot.temperatures.get("target"),
+        )
+
     @property
     def hvac_mode(self) -> HVACMode:
         """Return current operation ie. heat, cool, idle."""
-        if self._radiator.heat_mode == HeatMode.OFF:
+        if self.snapshot.heat_mode == HeatMode.OFF:
             return HVACMode.OFF
-        elif self._radiator.heat_mode == HeatMode.PROGRAM:
+        elif self.snapshot.heat_mode == HeatMode.PROGRAM:
             return HVACMode.AUTO
         return HVACMode.HEAT
 
     @property
     def hvac_action(self) -> HVACAction:
-        if self._radiator.heat_mode == HeatMode.OFF:
+        snapshot = self.snapshot
+        if snapshot.heat_mode == HeatMode.OFF:
             return HVACAction.OFF
-        elif self._radiator.active:
+        elif snapshot.active:
             return HVACAction.HEATING
         return HVACAction.IDLE
 
     @property
     def icon(self) -> Optional[str]:
-        if self._radiator.heat_mode == HeatMode.OFF:
+        snapshot = self.snapshot
+        if snapshot.heat_mode == HeatMode.OFF:
             return "mdi:radiator-off"
-        elif self._radiator.active:
+        elif snapshot.active:
             return "mdi:radiator"
         return "mdi:radiator-disabled"
 
     @property
     def current_temperature(self) -> Optional[float]:
         """Return the current temperature."""
-        temp = self._radiator.temperatures["current"].as_unit(TEMP_NATIVE_UNIT)
-        if isinstance(temp, float):
-            temp = round(temp, 1)
-        return temp
+        return self.snapshot.temperatures.get("current")
 
     @property
     def target_temperature(self) -> Optional[float]:
         """Return the temperature we try to reach."""
-        temp = self._radiator.temperatures["target"].as_unit(TEMP_NATIVE_UNIT)
-        if isinstance(temp, float):
-            temp = round(temp, 1)
-        return temp
+        return self.snapshot.temperatures.get("target")
 
     @property
     def preset_mode(self) -> Optional[str]:
         """Return the preset_mode."""
-        return self._radiator.heat_mode
+        return self.snapshot.heat_mode
 
     async def async_set_preset_mode(self, preset_mode):
         """Set preset mode"""
-        if self.preset_mode == preset_mode:
-            return
-        await self._radiator.set_heat_mode(preset_mode)
-        await self.coordinator.async_request_delayed_refresh()
+        await self.coordinator.async_write(
+            self._radiator,
+            "heat_mode",
+            preset_mode,
+            self._radiator.set_heat_mode,
+            reader=lambda snapshot: snapshot.heat_mode,
+            optimistic={"heat_mode": preset_mode},
+        )
 
     async def async_set_temperature(self, **kwargs) -> None:
         if (temperature := kwargs.get(ATTR_TEMPERATURE)) is None:
@@ -160,17 +214,19 @@ class RadiatorEntity(CleverTouchEntity, ClimateEntity):
             return
         if self._radiator.temp_type == TempType.NONE:
             return
-        if (
-            self._radiator.temperatures[self._radiator.temp_type].as_unit(
-                TEMP_NATIVE_UNIT
-            )
-            == temperature
-        ):
-            return
-        await self._radiator.set_temperature(
-            self._radiator.temp_type, temperature, TEMP_NATIVE_UNIT
+        temp_type = self._radiator.temp_type
+
+        async def _set_temperature(value: float) -> None:
+            await self._radiator.set_temperature(temp_type, value, TEMP_NATIVE_UNIT)
+
+        await self.coordinator.async_write(
+            self._radiator,
+            f"temp_{temp_type}",
+            temperature,
+            _set_temperature,
+            reader=lambda snapshot: snapshot.temperatures.get(temp_type),
+            optimistic=temperature_fields(self._radiator, temp_type, temperature),
         )
-        await self.coordinator.async_request_delayed_refresh()
 
     async def _async_activate_heat_mode(
         self,
@@ -179,10 +235,10 @@ class RadiatorEntity(CleverTouchEntity, ClimateEntity):
         temperature: Optional[float] = None,
         duration: Optional[timedelta] = None,
     ):
-        await self._radiator.activate_mode(
-            mode,
-            temp_value=temperature,
-            temp_unit=TEMP_NATIVE_UNIT if temperature else None,
-            boost_time=int(duration.total_seconds()) if duration else None,
+        validate_heat_mode_options(mode, temperature=temperature, duration=duration)
+        write, optimistic = activate_heat_mode(
+            self._radiator, mode, temperature=temperature, duration=duration
+        )
+        await self.coordinator.async_run_write(
+            self._radiator, write, optimistic=optimistic
         )
-        await self.coordinator.async_request_delayed_refresh()
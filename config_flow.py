@@ -12,11 +12,21 @@ from homeassistant.const import (
     CONF_USERNAME,
     CONF_PASSWORD,
     CONF_MODEL,
+    CONF_SCAN_INTERVAL,
+)
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.config_entries import (
+    ConfigEntry,
+    ConfigFlow,
+    ConfigFlowResult,
+    OptionsFlow,
 )
-from homeassistant.core import HomeAssistant
-from homeassistant.config_entries import ConfigFlow, ConfigFlowResult
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers.selector import (
+    BooleanSelector,
+    NumberSelector,
+    NumberSelectorConfig,
+    NumberSelectorMode,
     TextSelector,
     TextSelectorConfig,
     TextSelectorType,
@@ -28,7 +38,35 @@ from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
 from clevertouch import ApiSession, ApiAuthError
 
-from .const import DOMAIN, MODELS, DEFAULT_MODEL_ID
+from .auth import async_store_access_token
+from .const import (
+    DOMAIN,
+    MODELS,
+    DEFAULT_MODEL_ID,
+    CONF_MAX_STALENESS,
+    CONF_MAX_CONCURRENT_REFRESHES,
+    CONF_PER_HOME_UPDATES,
+    CONF_QUICK_SCAN_INTERVAL,
+    CONF_QUICK_SCAN_COUNT,
+    CONF_MIN_BACKOFF,
+    CONF_MAX_BACKOFF,
+    CONF_CONNECT_TIMEOUT,
+    CONF_READ_TIMEOUT,
+    CONF_WRITE_TIMEOUT,
+    CONF_RATE_LIMIT,
+    CONF_RATE_BURST,
+    DEFAULT_SCAN_INTERVAL_SECONDS,
+    QUICK_SCAN_INTERVAL_SECONDS,
+    QUICK_SCAN_COUNT,
+    MIN_BACKOFF_SECONDS,
+    MAX_BACKOFF_SECONDS,
+    MAX_CONCURRENT_HOME_REFRESHES,
+    API_CONNECT_TIMEOUT_SECONDS,
+    API_READ_TIMEOUT_SECONDS,
+    API_WRITE_TIMEOUT_SECONDS,
+    API_RATE_LIMIT_PER_SECOND,
+    API_RATE_LIMIT_BURST,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -54,6 +92,67 @@ STEP_USER_DATA_SCHEMA = vol.Schema(
 )
 
 
+def _number(
+    minimum: float, maximum: float, unit: str | None = "s", step: float = 1
+) -> vol.All:
+    config = NumberSelectorConfig(
+        min=minimum, max=maximum, step=step, mode=NumberSelectorMode.BOX
+    )
+    if unit:
+        config["unit_of_measurement"] = unit
+    return vol.All(NumberSelector(config), vol.Coerce(int if step == 1 else float))
+
+
+OPTIONS_SCHEMA = vol.Schema(
+    {
+        vol.Required(
+            CONF_SCAN_INTERVAL, default=DEFAULT_SCAN_INTERVAL_SECONDS
+        ): _number(30, 3600),
+        vol.Required(
+            CONF_QUICK_SCAN_INTERVAL, default=QUICK_SCAN_INTERVAL_SECONDS
+        ): _number(5, 300),
+        vol.Required(CONF_QUICK_SCAN_COUNT, default=QUICK_SCAN_COUNT): _number(
+            1, 20, None
+        ),
+        vol.Required(CONF_MIN_BACKOFF, default=MIN_BACKOFF_SECONDS): _number(10, 3600),
+        vol.Required(CONF_MAX_BACKOFF, default=MAX_BACKOFF_SECONDS): _number(60, 86400),
+        vol.Required(CONF_MAX_STALENESS, default=0): _number(0, 86400),
+        vol.Required(CONF_PER_HOME_UPDATES, default=False): BooleanSelector(),
+        vol.Required(
+            CONF_MAX_CONCURRENT_REFRESHES, default=MAX_CONCURRENT_HOME_REFRESHES
+        ): _number(1, 16, None),
+        vol.Required(
+            CONF_CONNECT_TIMEOUT, default=API_CONNECT_TIMEOUT_SECONDS
+        ): _number(1, 60),
+        vol.Required(CONF_READ_TIMEOUT, default=API_READ_TIMEOUT_SECONDS): _number(
+            1, 120
+        ),
+        vol.Required(CONF_WRITE_TIMEOUT, default=API_WRITE_TIMEOUT_SECONDS): _number(
+            1, 120
+        ),
+        vol.Required(CONF_RATE_LIMIT, default=API_RATE_LIMIT_PER_SECOND): _number(
+            0.1, 20, "requests/s", 0.1
+        ),
+        vol.Required(CONF_RATE_BURST, default=API_RATE_LIMIT_BURST): _number(
+            1, 100, None
+        ),
+    }
+)
+
+
+def validate_options(options: dict[str, Any]) -> dict[str, str]:
+    """Return errors for options that are valid alone, but not together."""
+    errors = {}
+    if options[CONF_QUICK_SCAN_INTERVAL] >= options[CONF_SCAN_INTERVAL]:
+        errors[CONF_QUICK_SCAN_INTERVAL] = "quick_scan_interval_too_long"
+    if options[CONF_MIN_BACKOFF] > options[CONF_MAX_BACKOFF]:
+        errors[CONF_MAX_BACKOFF] = "max_backoff_too_short"
+    for option in (CONF_READ_TIMEOUT, CONF_WRITE_TIMEOUT):
+        if options[option] < options[CONF_CONNECT_TIMEOUT]:
+            errors[option] = "timeout_shorter_than_connect"
+    return errors
+
+
 async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str, Any]:
     """Validate the user input allows us to connect.
 
@@ -81,6 +180,8 @@ async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str,
         except Exception as ex:
             raise CannotConnect from ex
         token = api.refresh_token
+        # Spare the setup, or the running coordinator, a token exchange
+        async_store_access_token(hass, api)
 
     return {
         "title": model.app,
@@ -95,6 +196,12 @@ class CleverTouchFlowHandler(ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: ConfigEntry) -> OptionsFlow:
+        """Create the options flow."""
+        return CleverTouchOptionsFlow()
+
     def __init__(self) -> None:
         """Initialize the Clever Touch E3 config flow."""
         super().__init__()
@@ -170,7 +277,15 @@ class CleverTouchFlowHandler(ConfigFlow, domain=DOMAIN):
                 _LOGGER.exception("Unexpected exception")
                 errors["base"] = "unknown"
             else:
-                return self.async_update_reload_and_abort(
+                coordinator = self.hass.data.get(DOMAIN, {}).get(entry.entry_id)
+                if coordinator is None:
+                    return self.async_update_reload_and_abort(
+                        entry, title=info["title"], data=info, unique_id=self._username
+                    )
+                # Hand the new token to the running coordinator instead of
+                # reloading, which would rebuild every entity
+                coordinator.async_reauthenticate(info[CONF_TOKEN])
+                return self.async_update_and_abort(
                     entry, title=info["title"], data=info, unique_id=self._username
                 )
 
@@ -189,6 +304,28 @@ class CleverTouchFlowHandler(ConfigFlow, domain=DOMAIN):
         )
 
 
+class CleverTouchOptionsFlow(OptionsFlow):
+    """Handle the options of Clever Touch E3."""
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Manage the polling options."""
+        errors = {}
+        if user_input is not None:
+            errors = validate_options(user_input)
+            if not errors:
+                return self.async_create_entry(data=user_input)
+
+        return self.async_show_form(
+            step_id="init",
+            data_schema=self.add_suggested_values_to_schema(
+                OPTIONS_SCHEMA, user_input or self.config_entry.options
+            ),
+            errors=errors,
+        )
+
+
 class CannotConnect(HomeAssistantError):
     """Error to indicate we cannot connect."""
 
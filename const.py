@@ -5,6 +5,25 @@ from collections import namedtuple
 
 DOMAIN = "clevertouch"
 
+# Option to refresh each home with its own schedule and backoff
+CONF_PER_HOME_UPDATES = "per_home_updates"
+# Option limiting the number of homes refreshed in parallel
+CONF_MAX_CONCURRENT_REFRESHES = "max_concurrent_refreshes"
+# Option to keep serving the last known values for this many seconds on errors
+CONF_MAX_STALENESS = "max_staleness"
+# Options tuning the polling schedule, defaulting to the constants below
+CONF_QUICK_SCAN_INTERVAL = "quick_scan_interval"
+CONF_QUICK_SCAN_COUNT = "quick_scan_count"
+CONF_MIN_BACKOFF = "min_backoff"
+CONF_MAX_BACKOFF = "max_backoff"
+# Options with the deadlines of requests to the cloud API
+CONF_CONNECT_TIMEOUT = "connect_timeout"
+CONF_READ_TIMEOUT = "read_timeout"
+CONF_WRITE_TIMEOUT = "write_timeout"
+# Options with the rate limit of requests to the cloud API
+CONF_RATE_LIMIT = "rate_limit"
+CONF_RATE_BURST = "rate_burst"
+
 TEMP_NATIVE_UNIT = TempUnit.CELSIUS
 TEMP_HA_UNIT = UnitOfTemperature.CELSIUS
 TEMP_NATIVE_STEP = 0.5
@@ -15,6 +34,52 @@ TEMP_NATIVE_PRECISION = 0.1
 DEFAULT_SCAN_INTERVAL_SECONDS = 180
 QUICK_SCAN_INTERVAL_SECONDS = 15
 QUICK_SCAN_COUNT = 3
+# Quick updates continue up to this count while written values are unconfirmed
+QUICK_SCAN_MAX_COUNT = 8
+MIN_BACKOFF_SECONDS = 60
+MAX_BACKOFF_SECONDS = 1800
+
+# The first refresh after restoring the topology is spread over this many seconds
+RESTORED_REFRESH_SPREAD_SECONDS = 5
+
+# Interval at which the homes of the account are discovered again
+DISCOVERY_INTERVAL_SECONDS = 3600
+
+# Interval at which labels, zones and devices of a home are applied again,
+# otherwise only the devices whose data changed are updated on each refresh
+METADATA_REFRESH_INTERVAL_SECONDS = 3600
+
+# Default number of homes refreshed in parallel, 1 refreshes them sequentially
+MAX_CONCURRENT_HOME_REFRESHES = 4
+
+# Applying the data of a home on the event loop for longer than this stalls it,
+# and moves the parsing of the home to an executor for as long as it is loaded
+LOOP_STALL_THRESHOLD_SECONDS = 0.05
+
+# Writes to the same device within this window are merged into one
+WRITE_DEBOUNCE_SECONDS = 1.0
+
+# Fired when a written value is rolled back, as polled data did not confirm it
+EVENT_WRITE_REVERTED = f"{DOMAIN}_write_reverted"
+
+# Access tokens are refreshed in the background this long before they expire
+TOKEN_REFRESH_MARGIN_SECONDS = 60
+# Rotated refresh tokens are saved to the config entry at most this often
+TOKEN_SAVE_DELAY_SECONDS = 60
+
+# Seconds to connect to the API, and to complete a read or write once connected
+API_CONNECT_TIMEOUT_SECONDS = 10
+API_READ_TIMEOUT_SECONDS = 30
+API_WRITE_TIMEOUT_SECONDS = 15
+
+# Consecutive failures opening the circuit to a host, and seconds until a probe
+CIRCUIT_FAILURE_THRESHOLD = 5
+CIRCUIT_RESET_SECONDS = 60
+
+# Default requests per second, and burst size, shared by all entries using the same
+# host, the strictest options of the entries applying
+API_RATE_LIMIT_PER_SECOND = 2.0
+API_RATE_LIMIT_BURST = 10
 
 Model = namedtuple("Model", ["manufacturer", "app", "url", "controller"])
 
@@ -2,132 +2,317 @@
 
 from __future__ import annotations
 
+from abc import ABC, abstractmethod
+import asyncio
 from aiohttp import ClientSession
 from datetime import timedelta, datetime
 import logging
+import time
 from enum import Enum
-from random import randint
+from collections.abc import (
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Collection,
+    Container,
+    Iterable,
+    Mapping,
+    Sequence,
+)
+from contextlib import AbstractContextManager, asynccontextmanager, nullcontext
+from functools import partial
+from random import uniform
+from typing import Any, NamedTuple
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import (
     CONF_TOKEN,
     CONF_USERNAME,
     CONF_MODEL,
+    CONF_SCAN_INTERVAL,
 )
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.entity import DeviceInfo
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers import device_registry
+from homeassistant.helpers.event import async_track_point_in_utc_time
+from homeassistant.util import dt as dt_util
+from homeassistant.helpers.device_registry import DeviceEntryType
+from homeassistant.helpers.entity import DeviceInfo, Entity
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 from homeassistant.helpers.update_coordinator import (
     CoordinatorEntity,
     DataUpdateCoordinator,
     UpdateFailed,
 )
-from homeassistant.exceptions import ConfigEntryAuthFailed
+from homeassistant.exceptions import ConfigEntryAuthFailed, HomeAssistantError
 
 from .const import (
     DOMAIN,
+    CONF_MAX_STALENESS,
+    CONF_MAX_CONCURRENT_REFRESHES,
+    CONF_PER_HOME_UPDATES,
+    CONF_QUICK_SCAN_INTERVAL,
+    CONF_QUICK_SCAN_COUNT,
+    CONF_MIN_BACKOFF,
+    CONF_MAX_BACKOFF,
     DEFAULT_SCAN_INTERVAL_SECONDS,
+    DISCOVERY_INTERVAL_SECONDS,
+    METADATA_REFRESH_INTERVAL_SECONDS,
     QUICK_SCAN_INTERVAL_SECONDS,
     QUICK_SCAN_COUNT,
+    QUICK_SCAN_MAX_COUNT,
+    MIN_BACKOFF_SECONDS,
+    MAX_BACKOFF_SECONDS,
+    MAX_CONCURRENT_HOME_REFRESHES,
+    LOOP_STALL_THRESHOLD_SECONDS,
+    RESTORED_REFRESH_SPREAD_SECONDS,
+    WRITE_DEBOUNCE_SECONDS,
+    EVENT_WRITE_REVERTED,
     MODELS,
     DEFAULT_MODEL_ID,
 )
 from clevertouch import (
     Account,
+    ApiSession,
     Home,
     User,
     ApiAuthError,
     ApiError,
 )
 from clevertouch.devices import Device
+from clevertouch.devices.factory import create_device
+from clevertouch.info import HomeInfo
 
+from .auth import TokenManager, async_restore_access_token
+from .circuit import (
+    CircuitOpenError,
+    CircuitState,
+    HostCircuitBreaker,
+    async_get_circuit_breaker,
+)
+from .metrics import ApiMetrics
+from .optimistic import OptimisticOverlay
+from .profiling import RefreshProfile
+from .recording import TrafficRecorder
+from .snapshot import COUNTDOWN_FIELDS, DeviceSnapshot, SnapshotReader, normalize
+from .store import TopologyStore
+from .writes import DeviceWriteQueue, Reader, Writer
 
-MIN_BACKOFF_SECONDS = 60
-MAX_BACKOFF_SECONDS = 1800
+# Regular updates are spread randomly by up to this share of the interval
+SCAN_INTERVAL_JITTER = 0.1
+ATTR_DATA_UPDATED_AT = "data_updated_at"
 _LOGGER = logging.getLogger(__name__)
 
 type CleverTouchConfigEntry = ConfigEntry[CleverTouchUpdateCoordinator]
 
 
-class CleverTouchUpdateCoordinator(DataUpdateCoordinator[None]):
-    """Class to manage fetching CleverTouch data."""
+def _scan_settings(options: Mapping[str, Any]) -> dict[str, Any]:
+    """Return the settings of the quick updates controller from entry options."""
+    return {
+        "standard_interval": timedelta(
+            seconds=options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL_SECONDS)
+        ),
+        "quick_interval": timedelta(
+            seconds=options.get(CONF_QUICK_SCAN_INTERVAL, QUICK_SCAN_INTERVAL_SECONDS)
+        ),
+        "quick_count": options.get(CONF_QUICK_SCAN_COUNT, QUICK_SCAN_COUNT),
+        "min_backoff": timedelta(
+            seconds=options.get(CONF_MIN_BACKOFF, MIN_BACKOFF_SECONDS)
+        ),
+        "max_backoff": timedelta(
+            seconds=options.get(CONF_MAX_BACKOFF, MAX_BACKOFF_SECONDS)
+        ),
+    }
+
+
+def _max_concurrent_refreshes(options: Mapping[str, Any]) -> int:
+    """Return the number of homes refreshed in parallel from entry options."""
+    return options.get(CONF_MAX_CONCURRENT_REFRESHES, MAX_CONCURRENT_HOME_REFRESHES)
+
+
+class CleverTouchPollingCoordinator(DataUpdateCoordinator[None], ABC):
+    """Base class polling the CleverTouch API with quick updates and backoff."""
 
     config_entry: CleverTouchConfigEntry
 
     def __init__(
-        self, hass: HomeAssistant, *, entry: ConfigEntry, session: ClientSession
+        self,
+        hass: HomeAssistant,
+        *,
+        name: str,
+        entry: ConfigEntry,
+        metrics: ApiMetrics,
     ) -> None:
-        """Initialize data updater."""
-        self._email = entry.data.get(CONF_USERNAME)
-        self.model_id = entry.data.get(CONF_MODEL) or DEFAULT_MODEL_ID
+        """Initialize the coordinator."""
+        settings = _scan_settings(entry.options)
         super().__init__(
             hass,
             _LOGGER,
-            name=f"{DOMAIN}-{self.model_id}-{self._email.lower()}",
-            update_interval=timedelta(seconds=DEFAULT_SCAN_INTERVAL_SECONDS),
+            name=name,
+            update_interval=settings["standard_interval"],
             config_entry=entry,
         )
-        self.model = MODELS[self.model_id]
-        self.host = self.model.url
-        self.account: Account = Account(
-            self._email, entry.data[CONF_TOKEN], host=self.host, session=session
+        self.metrics = metrics
+        self._options = dict(entry.options)
+        # How long the last known values are served after refreshes failed
+        self.max_staleness = timedelta(
+            seconds=entry.options.get(CONF_MAX_STALENESS, 0)
         )
-        self.user: User | None = None
-        self.homes: dict[str, Home] = {}
+        self._unsub_stale: CALLBACK_TYPE | None = None
+        self._queued_refresh: asyncio.Task[None] | None = None
         self._quick_updates = QuickUpdatesController(
-            standard_interval=timedelta(seconds=DEFAULT_SCAN_INTERVAL_SECONDS),
-            quick_interval=timedelta(seconds=QUICK_SCAN_INTERVAL_SECONDS),
-            quick_count=QUICK_SCAN_COUNT,
-            min_backoff=timedelta(seconds=MIN_BACKOFF_SECONDS),
-            max_backoff=timedelta(seconds=MAX_BACKOFF_SECONDS),
+            **settings,
+            max_quick_count=QUICK_SCAN_MAX_COUNT,
+            jitter=SCAN_INTERVAL_JITTER,
         )
 
-    async def _async_update_token(self) -> None:
-        """Handle token updates from the API."""
-        _LOGGER.debug("Checking if token should be updated")
-        old_token = self.config_entry.data[CONF_TOKEN]
-        new_token = self.account.api.refresh_token
-        if old_token != new_token:
-            _LOGGER.debug("Token updated for %s", self._email)
-            new_data = self.config_entry.data.copy()
-            new_data[CONF_TOKEN] = new_token
-            self.hass.config_entries.async_update_entry(
-                self.config_entry, data=new_data
+    @property
+    def scan_interval(self) -> timedelta:
+        """Return the regular interval between updates, without jitter."""
+        return self._quick_updates.standard_interval
+
+    @callback
+    def async_apply_options(self, options: Mapping[str, Any]) -> None:
+        """Apply changed options of the config entry without a reload.
+
+        A new regular interval is used from now on, while quick updates and
+        backoff in progress continue with the new settings.
+        """
+        if dict(options) == self._options:
+            return
+        self._options = dict(options)
+        self.max_staleness = timedelta(seconds=options.get(CONF_MAX_STALENESS, 0))
+        self.update_interval = self._quick_updates.configure(**_scan_settings(options))
+        if self._unsub_refresh:
+            self._schedule_refresh()
+        self._async_schedule_stale_expiry()
+        self.async_update_listeners()
+
+    @property
+    def scheduler_state(self) -> str:
+        """Return the state of the quick updates controller."""
+        return self._quick_updates.state.value
+
+    @property
+    def profile(self) -> RefreshProfile | None:
+        """Return the profile of the refresh being profiled, if any."""
+        return None
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Update all listeners, timing the state writes."""
+        profile = self.profile
+        started_at = time.perf_counter()
+        with profile.phase("state_write") if profile else nullcontext():
+            super().async_update_listeners()
+        duration = time.perf_counter() - started_at
+        self.metrics.state_write_time.record(duration)
+        if duration > LOOP_STALL_THRESHOLD_SECONDS:
+            self.metrics.loop_stalls += 1
+
+    def request_quick_update(
+        self, expected: dict[tuple[str, str], Expectation] | None = None
+    ) -> bool:
+        """Request quick updates, returns True if a refresh should be run."""
+        return self._quick_updates.request_quick_update(expected=expected)
+
+    async def async_refresh(self) -> None:
+        """Refresh data, sharing the refresh with concurrent callers.
+
+        Callers join the queued refresh if there is one, instead of each
+        running their own refresh after the one in progress.
+        """
+        if self._queued_refresh is None:
+            self._queued_refresh = self.config_entry.async_create_background_task(
+                self.hass,
+                self._async_run_queued_refresh(),
+                f"{DOMAIN}-refresh",
+                eager_start=False,
             )
+        await asyncio.shield(self._queued_refresh)
 
-    async def async_request_delayed_refresh(self) -> None:
-        """Request delayed (and quicker) updates after setting a variable."""
-        if self._quick_updates.request_quick_update():
-            await self.async_refresh()
+    async def async_staggered_refresh(self) -> None:
+        """Refresh data after a short random delay.
+
+        Used for the first refresh after restoring the topology, so that
+        entries restarting together do not all poll the API at once, while
+        restored entities still become available within seconds. The regular
+        updates that follow are staggered over the interval as usual.
+        """
+        await asyncio.sleep(uniform(0, RESTORED_REFRESH_SPREAD_SECONDS))
+        await self.async_refresh()
+
+    async def _async_run_queued_refresh(self) -> None:
+        async with self._debounced_refresh.async_lock():
+            # Callers arriving from now on may miss data, and queue a new refresh
+            self._queued_refresh = None
+            await self._async_refresh(log_failures=True)
+
+    async def _async_refresh(self, *args: Any, **kwargs: Any) -> None:
+        await super()._async_refresh(*args, **kwargs)
+        self._async_schedule_stale_expiry()
+
+    async def async_shutdown(self) -> None:
+        """Shut down the coordinator."""
+        await super().async_shutdown()
+        if self._unsub_stale:
+            self._unsub_stale()
+            self._unsub_stale = None
+
+    @abstractmethod
+    def _data_updated_at(self) -> list[datetime]:
+        """Return when the homes refreshed by this coordinator were read."""
+
+    @callback
+    def _async_schedule_stale_expiry(self) -> None:
+        """Notify the entities when served values pass the staleness limit.
+
+        Listeners are not notified of consecutive failures, so the entities
+        would otherwise keep serving stale values until the next success.
+        """
+        if self._unsub_stale:
+            self._unsub_stale()
+            self._unsub_stale = None
+        if self.last_update_success or not self.max_staleness:
+            return
+        now = dt_util.utcnow()
+        expiries = [
+            updated_at + self.max_staleness
+            for updated_at in self._data_updated_at()
+            if updated_at + self.max_staleness > now
+        ]
+        if expiries:
+            self._unsub_stale = async_track_point_in_utc_time(
+                self.hass, self._async_stale_expired, min(expiries)
+            )
+
+    @callback
+    def _async_stale_expired(self, _now: datetime) -> None:
+        self._unsub_stale = None
+        self.async_update_listeners()
+        self._async_schedule_stale_expiry()
 
     async def _async_update_data(self) -> None:
         """Fetch data from CleverTouch."""
         _LOGGER.debug("Updating data from the CleverTouch API")
+        is_quick = self._quick_updates.is_quick
         do_update_now, self.update_interval = self._quick_updates.on_updating()
         if not do_update_now:
             _LOGGER.debug("Update skipped.")
             return
 
+        started_at = time.monotonic()
+        failed = True
         try:
-            if not self.homes:
-                self.user = await self.account.get_user()
-                self.homes = {
-                    home_id: await self.account.get_home(home_id)
-                    for home_id in self.user.homes
-                }
-                _LOGGER.debug(
-                    "Retrieved %d new homes from CleverTouch", len(self.homes)
-                )
-            else:
-                for home in self.homes.values():
-                    await home.refresh()
-                _LOGGER.debug("Refreshed homes from CleverTouch")
-            await self._async_update_token()
-            self.update_interval = self._quick_updates.on_success()
+            refreshed_all = await self._async_fetch(is_quick)
+            self.update_interval = self._quick_updates.on_success(
+                confirm=refreshed_all
+            )
+            failed = False
         except ApiAuthError as ex:
             _LOGGER.error("Authorization failed: %s", ex)
             raise ConfigEntryAuthFailed from ex
-        except ApiError as ex:
+        except (ApiError, CircuitOpenError) as ex:
             _LOGGER.error("API error: %s", ex)
             self.update_interval = self._quick_updates.on_error()
             _LOGGER.info("Backing off %s", self.update_interval)
@@ -137,11 +322,1151 @@ class CleverTouchUpdateCoordinator(DataUpdateCoordinator[None]):
             self.update_interval = self._quick_updates.on_error()
             _LOGGER.info("Backing off %s", self.update_interval)
             raise
+        finally:
+            self.metrics.record_refresh(time.monotonic() - started_at, failed)
+
+    @abstractmethod
+    async def _async_fetch(self, is_quick: bool) -> bool:
+        """Fetch data, returns True if everything was refreshed."""
+
+
+class CleverTouchUpdateCoordinator(CleverTouchPollingCoordinator):
+    """Class to manage fetching CleverTouch data.
+
+    With per-home updates enabled, each home is refreshed by a child
+    coordinator with its own schedule and backoff. The account coordinator
+    then only discovers homes, and shares the session, token and topology.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        *,
+        entry: ConfigEntry,
+        session: ClientSession,
+        metrics: ApiMetrics | None = None,
+        breaker: HostCircuitBreaker | None = None,
+        recorder: TrafficRecorder | None = None,
+    ) -> None:
+        """Initialize data updater."""
+        self._email = entry.data.get(CONF_USERNAME)
+        self.model_id = entry.data.get(CONF_MODEL) or DEFAULT_MODEL_ID
+        super().__init__(
+            hass,
+            name=f"{DOMAIN}-{self.model_id}-{self._email.lower()}",
+            entry=entry,
+            metrics=metrics or ApiMetrics(),
+        )
+        self.model = MODELS[self.model_id]
+        self.host = self.model.url
+        self.breaker = breaker or async_get_circuit_breaker(hass, self.host)
+        self.recorder = recorder or TrafficRecorder(hass, self.model_id, self.host)
+        # Options the client session was created with
+        self.setup_options = dict(entry.options)
+        self.account: Account = Account(
+            self._email, entry.data[CONF_TOKEN], host=self.host, session=session
+        )
+        # Continue with the access token of the config flow when just logged in
+        async_restore_access_token(hass, self.account.api)
+        self.tokens = TokenManager(hass, entry, self.account.api, self.metrics)
+        self.user: User | None = None
+        self.homes: dict[str, Home] = {}
+        # Snapshots shown by entities, and as polled without optimistic values
+        self.snapshots: dict[str, DeviceSnapshot] = {}
+        self._polled_snapshots: dict[str, DeviceSnapshot] = {}
+        self._overlay = OptimisticOverlay()
+        self.per_home_updates: bool = entry.options.get(CONF_PER_HOME_UPDATES, False)
+        self._home_coordinators: dict[str, HomeUpdateCoordinator] = {}
+        # When each home was last read successfully
+        self.home_updated_at: dict[str, datetime] = {}
+        self._metadata_updated_at: dict[str, datetime] = {}
+        # Devices written to since their data was last applied
+        self._written_devices: set[str] = set()
+        self._home_payloads: dict[str, dict[str, Any]] = {}
+        self._store = TopologyStore(hass, entry.entry_id)
+        self._refresh_semaphore = asyncio.Semaphore(
+            _max_concurrent_refreshes(entry.options)
+        )
+        self._write_queues: dict[str, DeviceWriteQueue] = {}
+        self._dirty_homes: set[str] = set()
+        self._last_full_refresh_at: datetime | None = None
+        self._last_discovery_at: datetime | None = None
+        # Incremented whenever devices are added or removed
+        self.topology_version: int = 0
+        self._writes_in_flight: int = 0
+        self._pending_refreshes: set[CleverTouchPollingCoordinator] = set()
+        self._profile: RefreshProfile | None = None
+        # Homes parsed in an executor, as applying their data stalled the loop
+        self.offloaded_homes: set[str] = set()
+
+    async def async_restore_topology(self) -> bool:
+        """Rebuild homes and devices from the topology stored on disk.
+
+        Returns True if any homes were restored. The restored data is not
+        considered current, so entities stay unavailable until the first
+        successful refresh from the cloud.
+        """
+        payloads = await self._store.async_load()
+        for home_id, data in payloads.items():
+            try:
+                home = Home(self.account.api, home_id)
+                self._apply_home_data(home, data)
+            except Exception as ex:  # pylint: disable=broad-except
+                _LOGGER.warning("Could not restore home %s: %s", home_id, ex)
+                continue
+            self.homes[home_id] = home
+            self._home_payloads[home_id] = data
+
+        if not self.homes:
+            return False
+
+        _LOGGER.debug("Restored %d homes from storage", len(self.homes))
+        self._store.set_loaded(self.homes)
+        self.last_update_success = False
+        return True
+
+    def _apply_home_data(self, home: Home, data: dict[str, Any]) -> list[str]:
+        """Update a home and its devices from cloud API data.
+
+        The metadata of a home, i.e. its label, zones and devices, is applied
+        when due or when a change requires it. Otherwise, only the devices
+        whose data changed since the previous refresh are updated.
+
+        Returns the ids of the removed devices.
+        """
+        previous = self._home_payloads.get(home.home_id)
+        if (
+            previous is not None
+            and not self._is_metadata_refresh_due(home.home_id)
+            and self._apply_live_data(home, data, previous)
+        ):
+            return []
+        return self._apply_metadata(home, data)
+
+    def _is_metadata_refresh_due(self, home_id: str) -> bool:
+        """Return True if the metadata of a home should be applied again."""
+        updated_at = self._metadata_updated_at.get(home_id)
+        return updated_at is None or dt_util.utcnow() - updated_at >= timedelta(
+            seconds=METADATA_REFRESH_INTERVAL_SECONDS
+        )
+
+    async def async_refresh_metadata(
+        self, home_ids: Iterable[str] | None = None
+    ) -> None:
+        """Refresh homes, or all homes, applying their metadata right away.
+
+        The homes of the account are discovered again when refreshing all
+        homes. While quick updates are running, the refresh may be skipped,
+        and the metadata is then applied by the next one.
+        """
+        if home_ids is None:
+            home_ids = list(self.homes)
+            self._last_discovery_at = None
+        else:
+            home_ids = list(home_ids)
+        for home_id in home_ids:
+            self._metadata_updated_at.pop(home_id, None)
+        # Refresh all homes, rather than those written to
+        self._last_full_refresh_at = None
+        await self.async_refresh()
+        await asyncio.gather(
+            *(
+                coordinator.async_refresh()
+                for home_id in home_ids
+                if (coordinator := self._home_coordinators.get(home_id))
+            )
+        )
+
+    def _apply_live_data(
+        self, home: Home, data: dict[str, Any], previous: dict[str, Any]
+    ) -> bool:
+        """Update the devices whose data changed since the previous refresh.
+
+        Devices written to are always updated, to replace the values set by
+        the library with the polled ones, as are devices with values not
+        confirmed yet, to reconcile them. Returns False, without updating
+        anything, if devices were added, removed or moved to unknown zones.
+        """
+        if (diff := _diff_devices(home.info, home.devices, data, previous)) is None:
+            return False
+        changed, unchanged = diff
+        for device_data in changed:
+            self._apply_device_data(home, device_data)
+        self._apply_unconfirmed(home, unchanged)
+        return True
+
+    def _apply_device_data(self, home: Home, device_data: dict[str, Any]) -> None:
+        """Update a device of a home from cloud API data."""
+        device = home.devices[Device.get_id(device_data)]
+        device.update(device_data)
+        self._written_devices.discard(device.device_id)
+        self._update_snapshot(device, polled=True)
+
+    def _apply_unconfirmed(
+        self, home: Home, unchanged: Iterable[dict[str, Any]]
+    ) -> None:
+        """Update the devices with unchanged data written to, or not confirmed."""
+        for device_data in unchanged:
+            device_id = Device.get_id(device_data)
+            if device_id in self._written_devices or device_id in self._overlay:
+                self._apply_device_data(home, device_data)
+
+    def _apply_metadata(self, home: Home, data: dict[str, Any]) -> list[str]:
+        """Update a home and all its devices, adding and removing devices.
+
+        Returns the ids of the removed devices.
+        """
+        self._metadata_updated_at[home.home_id] = dt_util.utcnow()
+        home.info.update(data)
+        device_ids: set[str] = set()
+        for device_data in data["devices"]:
+            device_id = Device.get_id(device_data)
+            device_ids.add(device_id)
+            if (device := home.devices.get(device_id)) is None:
+                device = home.devices[device_id] = create_device(
+                    self.account.api, home.info, device_data
+                )
+                self.topology_version += 1
+            else:
+                device.update(device_data)
+            self._written_devices.discard(device_id)
+            self._update_snapshot(device, polled=True)
+        return self._remove_missing_devices(home, device_ids)
+
+    def _remove_missing_devices(
+        self, home: Home, device_ids: Container[str]
+    ) -> list[str]:
+        """Remove the devices of a home no longer in its data.
+
+        Returns the ids of the removed devices.
+        """
+        removed = [
+            device_id for device_id in home.devices if device_id not in device_ids
+        ]
+        for device_id in removed:
+            del home.devices[device_id]
+            self._forget_device(device_id)
+        if removed:
+            self.topology_version += 1
+        return removed
+
+    def _update_snapshot(
+        self,
+        device: Device,
+        *,
+        polled: bool = False,
+        snapshot: DeviceSnapshot | None = None,
+    ) -> None:
+        """Rebuild the snapshot of a device, keeping it if nothing changed.
+
+        Optimistic values are shown on top of the values of the device, and
+        reconciled with them when they were just polled. The snapshot of the
+        values of the device is only built if not given.
+        """
+        device_id = device.device_id
+        if snapshot is None:
+            snapshot = DeviceSnapshot(device)
+        if polled:
+            if self._polled_snapshots.get(device_id) != snapshot:
+                self._polled_snapshots[device_id] = snapshot
+            self._async_reconcile(device, self._polled_snapshots[device_id])
+        if overlay := self._overlay.get(device_id):
+            snapshot = DeviceSnapshot(device, overlay)
+        if self.snapshots.get(device_id) != snapshot:
+            self.snapshots[device_id] = snapshot
+
+    @callback
+    def _async_reconcile(self, device: Device, polled: DeviceSnapshot) -> None:
+        """Roll back optimistic values the cloud did not confirm in time."""
+        rollbacks = self._overlay.reconcile(device.device_id, polled)
+        if not rollbacks:
+            return
+        device_entry_id = self.get_device_entry_id(device)
+        for rollback in rollbacks:
+            _LOGGER.warning(
+                "%s of %s was set to %s, but the cloud still reports %s",
+                rollback.field,
+                device.label,
+                rollback.written,
+                rollback.polled,
+            )
+            self.hass.bus.async_fire(
+                EVENT_WRITE_REVERTED,
+                {
+                    "device_id": device_entry_id,
+                    "field": rollback.field,
+                    "written": rollback.written,
+                    "polled": rollback.polled,
+                },
+            )
+
+    def _forget_device(self, device_id: str) -> None:
+        """Drop the snapshots and optimistic values of a removed device."""
+        self.snapshots.pop(device_id, None)
+        self._polled_snapshots.pop(device_id, None)
+        self._overlay.remove(device_id)
+
+    @callback
+    def _async_show_optimistic(
+        self,
+        device: Device,
+        optimistic: Mapping[str, Any] | None,
+        *,
+        notify: bool = True,
+    ) -> None:
+        """Show values written to a device until polled data confirms them.
+
+        Unconfirmed values are rolled back once quick updates are over.
+        """
+        if not optimistic:
+            return
+        settings = _scan_settings(self._options)
+        window = settings["quick_interval"].total_seconds() * max(
+            settings["quick_count"], QUICK_SCAN_MAX_COUNT
+        )
+        self._overlay.set(device.device_id, optimistic, window)
+        self._update_snapshot(device)
+        if notify:
+            self.async_update_listeners()
+
+    @callback
+    def _async_discard_optimistic(
+        self,
+        device: Device,
+        optimistic: Mapping[str, Any] | None,
+        *,
+        notify: bool = True,
+    ) -> None:
+        """Stop showing values that could not be written."""
+        if not optimistic or device.device_id not in self._overlay:
+            return
+        self._overlay.discard(device.device_id, optimistic)
+        self._update_snapshot(device)
+        if notify:
+            self.async_update_listeners()
+
+    def _read_polled(self, device: Device, reader: SnapshotReader) -> Any:
+        """Read a value as polled, without the optimistic values of the device."""
+        if (snapshot := self._polled_snapshots.get(device.device_id)) is None:
+            snapshot = DeviceSnapshot(device)
+        return reader(snapshot)
+
+    def _async_register_home(self, home: Home) -> None:
+        """Register the device of a home, grouping the devices of the home."""
+        device_registry.async_get(self.hass).async_get_or_create(
+            config_entry_id=self.config_entry.entry_id,
+            identifiers={(DOMAIN, self.get_unique_home_id(home.home_id))},
+            manufacturer=self.model.manufacturer,
+            model=self.model.controller,
+            name=f"{home.info.label} {self.model.controller}",
+            suggested_area=home.info.label,
+            configuration_url=f"https://{self.host}",
+        )
+
+    def async_register_homes(self) -> None:
+        """Register the devices of all homes."""
+        for home in self.homes.values():
+            self._async_register_home(home)
+
+    def _async_remove_devices(self, unique_ids: Iterable[str]) -> None:
+        """Remove devices, and their entities, from the registries."""
+        registry = device_registry.async_get(self.hass)
+        for unique_id in unique_ids:
+            if device := registry.async_get_device(identifiers={(DOMAIN, unique_id)}):
+                _LOGGER.info("Removing device %s, no longer reported", device.name)
+                registry.async_update_device(
+                    device.id, remove_config_entry_id=self.config_entry.entry_id
+                )
+
+    @callback
+    def async_add_device_entities(
+        self,
+        async_add_entities: AddEntitiesCallback,
+        create_entities: Callable[[Device], Iterable[Entity]],
+    ) -> None:
+        """Add the entities of all devices, and of devices discovered later.
+
+        Entities of existing devices are left untouched, and entities of
+        removed devices are removed together with their registry device.
+        """
+        known_ids: set[str] = set()
+        known_version: int | None = None
+
+        @callback
+        def _async_add_new_devices() -> None:
+            nonlocal known_ids, known_version
+            if known_version == self.topology_version:
+                return
+            known_version = self.topology_version
+            devices = {
+                device.device_id: device
+                for home in self.homes.values()
+                for device in home.devices.values()
+            }
+            entities = [
+                entity
+                for device_id, device in devices.items()
+                if device_id not in known_ids
+                for entity in create_entities(device)
+            ]
+            known_ids = set(devices)
+            if entities:
+                async_add_entities(entities)
+
+        _async_add_new_devices()
+        self.config_entry.async_on_unload(
+            self.async_add_listener(_async_add_new_devices)
+        )
+
+    @callback
+    def async_reauthenticate(self, refresh_token: str) -> None:
+        """Continue with the tokens of a new login, without a reload.
+
+        Updates stop on authentication errors, and are resumed in the
+        background for this coordinator and the home coordinators that failed.
+        """
+        api = self.account.api
+        api.refresh_token = refresh_token
+        api.expires_at = 0.0
+        async_restore_access_token(self.hass, api)
+        self.tokens.async_schedule_refresh()
+        self.config_entry.async_create_background_task(
+            self.hass, self._async_resume_updates(), f"{DOMAIN}-reauth-refresh"
+        )
+
+    async def _async_resume_updates(self) -> None:
+        failed = [
+            coordinator
+            for coordinator in self._home_coordinators.values()
+            if coordinator.started and not coordinator.last_update_success
+        ]
+        await self.async_refresh()
+        await asyncio.gather(*(coordinator.async_refresh() for coordinator in failed))
+
+    async def async_write(
+        self,
+        device: Device,
+        field: str,
+        value: Any,
+        writer: Writer,
+        *,
+        reader: SnapshotReader,
+        optimistic: Mapping[str, Any] | None = None,
+    ) -> None:
+        """Write a value to a device after a short debounce window.
+
+        Writes to the same field of a device are merged, so that only the last
+        value is sent, and writes of the value last written are dropped. Quick
+        updates are requested once the writes are done, and run until the
+        reader returns the written value from the polled snapshot of the
+        device.
+
+        The optimistic values, by snapshot field, are shown right away.
+        """
+        self._raise_if_circuit_open()
+        queue = self._write_queues.get(device.device_id)
+        if queue is None:
+            queue = DeviceWriteQueue(
+                self.hass,
+                WRITE_DEBOUNCE_SECONDS,
+                partial(self._async_on_written, device),
+            )
+            self._write_queues[device.device_id] = queue
+
+        async def _recorded_writer(value: Any) -> None:
+            try:
+                async with self._async_track_write(device, field):
+                    await writer(value)
+            except Exception:
+                self._async_discard_optimistic(device, optimistic)
+                raise
+
+        self._async_show_optimistic(device, optimistic)
+        await queue.async_write(
+            field,
+            value,
+            _recorded_writer,
+            current=partial(_read_current, device, reader),
+            reader=partial(self._read_polled, device, reader),
+        )
+
+    async def async_run_write(
+        self,
+        device: Device,
+        write: Awaitable[Any],
+        *,
+        optimistic: Mapping[str, Any] | None = None,
+    ) -> None:
+        """Run a write to a device and request quick updates afterwards.
+
+        Quick updates are requested even if the write failed, as some values
+        may have been written before the failure. The optimistic values, by
+        snapshot field, are shown right away, and quick updates run until
+        they are confirmed.
+        """
+        try:
+            self._raise_if_circuit_open()
+        except HomeAssistantError:
+            if asyncio.iscoroutine(write):
+                write.close()
+            raise
+        self._async_show_optimistic(device, optimistic)
+        try:
+            async with self._async_track_write(device, _write_field(optimistic)):
+                await write
+        except Exception:
+            self._async_discard_optimistic(device, optimistic)
+            raise
+        finally:
+            self._update_snapshot(device)
+            await self.async_request_delayed_refresh(
+                device.home.home_id,
+                expected=self._expect_optimistic(device, optimistic) or None,
+            )
+
+    async def async_run_writes(
+        self,
+        writes: Sequence[tuple[Device, Awaitable[Any], Mapping[str, Any] | None]],
+    ) -> list[BaseException | None]:
+        """Run writes to many devices concurrently, e.g. to a whole home.
+
+        Each write comes with its optimistic values, as for async_run_write.
+        The requests are spaced by the rate limiter of the API host, and quick
+        updates are requested once for all homes written to, when the last
+        write is done. Returns the error of each write, or None on success.
+        """
+        try:
+            self._raise_if_circuit_open()
+        except HomeAssistantError:
+            for _device, write, _optimistic in writes:
+                if asyncio.iscoroutine(write):
+                    write.close()
+            raise
+
+        async def _async_write(
+            device: Device, write: Awaitable[Any], optimistic: Mapping[str, Any] | None
+        ) -> None:
+            try:
+                async with self._async_track_write(device, _write_field(optimistic)):
+                    await write
+            except Exception:
+                self._async_discard_optimistic(device, optimistic, notify=False)
+                raise
+
+        for device, _write, optimistic in writes:
+            self._async_show_optimistic(device, optimistic, notify=False)
+        self.async_update_listeners()
+        try:
+            results = await asyncio.gather(
+                *(_async_write(*write) for write in writes), return_exceptions=True
+            )
+        finally:
+            expected: dict[tuple[str, str], Expectation] = {}
+            for device, _write, optimistic in writes:
+                self._update_snapshot(device)
+                expected.update(self._expect_optimistic(device, optimistic))
+            self.async_update_listeners()
+            await self.async_request_homes_refresh(
+                {device.home.home_id for device, _write, _optimistic in writes},
+                expected=expected or None,
+            )
+        return results
+
+    def _expect_optimistic(
+        self, device: Device, optimistic: Mapping[str, Any] | None
+    ) -> dict[tuple[str, str], Expectation]:
+        """Return the expectations confirming the optimistic values of a write."""
+        return {
+            (device.device_id, field): Expectation(
+                normalize(field, value),
+                partial(self._read_polled_field, device.device_id, field),
+            )
+            for field, value in (optimistic or {}).items()
+            if field not in COUNTDOWN_FIELDS
+        }
+
+    def _read_polled_field(self, device_id: str, field: str) -> Any:
+        """Read a field of the polled snapshot of a device."""
+        if (snapshot := self._polled_snapshots.get(device_id)) is None:
+            return None
+        return snapshot.get(field)
+
+    def _raise_if_circuit_open(self) -> None:
+        """Fail writes fast while the circuit to the API host is open."""
+        if self.breaker.state is CircuitState.OPEN:
+            raise HomeAssistantError(
+                f"The {self.model.app} cloud is not responding, "
+                f"try again in {self.breaker.retry_in:.0f} s"
+            )
+
+    async def _async_check_circuit(self) -> None:
+        """Fail fast while the circuit is open, and probe it when half-open.
+
+        The user data is read as probe, which is much cheaper than the homes.
+        """
+        match self.breaker.state:
+            case CircuitState.OPEN:
+                raise CircuitOpenError(self.host, self.breaker.retry_in)
+            case CircuitState.HALF_OPEN:
+                await self.tokens.async_ensure_valid()
+                await self.account.api.read_user_data()
+
+    @asynccontextmanager
+    async def _async_track_write(
+        self, device: Device, field: str
+    ) -> AsyncIterator[None]:
+        """Track a write to a field of a device in flight, and record it.
+
+        Refreshes requested while writes are in flight are deferred until the
+        last one is done, so that a burst of concurrent writes, e.g. from a
+        scene or a service targeting many entities, shares a single refresh.
+        """
+        self._written_devices.add(device.device_id)
+        self._writes_in_flight += 1
+        try:
+            await self.tokens.async_ensure_valid()
+            yield
+        except Exception:
+            self.metrics.record_write(field, failed=True)
+            raise
+        else:
+            self.metrics.record_write(field, failed=False)
+        finally:
+            self._writes_in_flight -= 1
+            if not self._writes_in_flight:
+                for coordinator in self._pending_refreshes:
+                    self.config_entry.async_create_background_task(
+                        self.hass, coordinator.async_refresh(), f"{DOMAIN}-write-refresh"
+                    )
+                self._pending_refreshes.clear()
+
+    async def _async_on_written(
+        self, device: Device, written: dict[str, tuple[Any, Reader]]
+    ) -> None:
+        """Request quick updates until written values are confirmed."""
+        # Show the values written to the device until they are polled
+        self._update_snapshot(device)
+        await self.async_request_delayed_refresh(
+            device.home.home_id,
+            expected={
+                (device.device_id, field): Expectation(value, reader)
+                for field, (value, reader) in written.items()
+            },
+        )
+
+    async def async_shutdown(self) -> None:
+        """Shut down the coordinators and write any pending values."""
+        await super().async_shutdown()
+        for coordinator in self._home_coordinators.values():
+            await coordinator.async_shutdown()
+        for queue in self._write_queues.values():
+            await queue.async_flush()
+        self.tokens.async_shutdown()
+        await self.recorder.async_stop()
+
+    async def async_request_delayed_refresh(
+        self,
+        home_id: str | None = None,
+        *,
+        expected: dict[tuple[str, str], Expectation] | None = None,
+    ) -> None:
+        """Request delayed (and quicker) updates after setting a variable.
+
+        Quick updates only refresh the homes that have been written to, or all
+        homes if no home is given. If the expected values are given, quick
+        updates end as soon as they have all been confirmed.
+        """
+        await self.async_request_homes_refresh(
+            self.homes if home_id is None else [home_id], expected=expected
+        )
+
+    async def async_request_homes_refresh(
+        self,
+        home_ids: Iterable[str],
+        *,
+        expected: dict[tuple[str, str], Expectation] | None = None,
+    ) -> None:
+        """Request delayed (and quicker) updates of the homes written to.
+
+        The homes share a single refresh, unless they have own coordinators.
+        """
+        if self._home_coordinators:
+            coordinators = [self.get_home_coordinator(home_id) for home_id in home_ids]
+        else:
+            self._dirty_homes.update(home_ids)
+            coordinators = [self]
+
+        coordinators = [
+            coordinator
+            for coordinator in coordinators
+            if coordinator.request_quick_update(expected)
+        ]
+        if self._writes_in_flight:
+            self._pending_refreshes.update(coordinators)
+        elif coordinators:
+            await asyncio.gather(
+                *(coordinator.async_refresh() for coordinator in coordinators)
+            )
+
+    async def _async_fetch(self, is_quick: bool) -> bool:
+        """Discover homes, and refresh them unless they have own coordinators."""
+        full_refresh = self._is_full_refresh_due(is_quick)
+        with self._phase("auth"):
+            await self._async_check_circuit()
+            await self.tokens.async_ensure_valid()
+        with self._phase("discovery"):
+            if self.user is None:
+                self.user = await self.account.get_user()
+                self._last_discovery_at = datetime.now()
+            elif full_refresh and self._is_discovery_due():
+                await self.user.refresh()
+                self._last_discovery_at = datetime.now()
+
+        if self.per_home_updates:
+            await self._async_update_home_coordinators()
+            self.tokens.async_schedule_save()
+            return True
+
+        home_ids = list(self.user.homes)
+        if not full_refresh:
+            home_ids = [home_id for home_id in home_ids if home_id in self._dirty_homes]
+            _LOGGER.debug("Quick update of %d dirty homes", len(home_ids))
+        refreshed_all = await self._async_refresh_homes(home_ids)
+        if full_refresh:
+            self._last_full_refresh_at = datetime.now()
+        if not self._quick_updates.is_quick:
+            self._dirty_homes.clear()
+        self.tokens.async_schedule_save()
+        return refreshed_all
+
+    def _data_updated_at(self) -> list[datetime]:
+        if self.per_home_updates:
+            return []
+        return list(self.home_updated_at.values())
+
+    def is_serving_stale(self, home_id: str) -> bool:
+        """Return True if the last values of a home may still be served."""
+        updated_at = self.home_updated_at.get(home_id)
+        return (
+            bool(self.max_staleness)
+            and updated_at is not None
+            and dt_util.utcnow() - updated_at <= self.max_staleness
+        )
+
+    @callback
+    def async_apply_options(self, options: Mapping[str, Any]) -> None:
+        """Apply changed options to this coordinator and those of the homes.
+
+        Refreshes of homes in progress keep the previous concurrency limit.
+        """
+        limit = _max_concurrent_refreshes(options)
+        if limit != _max_concurrent_refreshes(self._options):
+            self._refresh_semaphore = asyncio.Semaphore(limit)
+        super().async_apply_options(options)
+        for coordinator in self._home_coordinators.values():
+            coordinator.async_apply_options(options)
+
+    def get_home_coordinator(self, home_id: str) -> CleverTouchPollingCoordinator:
+        """Return the coordinator refreshing a home."""
+        if not self.per_home_updates:
+            return self
+        if (coordinator := self._home_coordinators.get(home_id)) is None:
+            coordinator = HomeUpdateCoordinator(self.hass, self, home_id)
+            self._home_coordinators[home_id] = coordinator
+        return coordinator
+
+    async def _async_update_home_coordinators(self) -> None:
+        """Start coordinators of new homes, and stop those of removed homes."""
+        for home_id in list(self._home_coordinators):
+            if home_id not in self.user.homes:
+                await self._home_coordinators.pop(home_id).async_shutdown()
+        self._async_remove_stale_homes()
+
+        started = [
+            coordinator.async_start()
+            for home_id in self.user.homes
+            if not (coordinator := self.get_home_coordinator(home_id)).started
+        ]
+        if started:
+            await asyncio.gather(*started)
+
+    async def async_refresh_home(self, home_id: str) -> bool:
+        """Refresh a single home for its coordinator."""
+        topology_version = self.topology_version
+        refreshed = await self._async_refresh_homes([home_id])
+        self.tokens.async_schedule_save()
+        if self.topology_version != topology_version:
+            # Let the platforms add the entities of new devices
+            self.async_update_listeners()
+        return refreshed
+
+    @property
+    def profile(self) -> RefreshProfile | None:
+        """Return the profile of the refresh being profiled, if any."""
+        return self._profile
+
+    def _phase(
+        self, name: str, home_id: str | None = None
+    ) -> AbstractContextManager[None]:
+        """Time a phase of the refresh when profiled."""
+        if self._profile is None:
+            return nullcontext()
+        return self._profile.phase(name, home_id)
+
+    async def async_profile_refresh(self, profile: RefreshProfile) -> None:
+        """Refresh all homes, and update the entities, timing the phases.
+
+        Refreshes are run as usual, so that profiling is safe at any time.
+        Raises if homes were not fetched, as quick updates skip refreshes
+        requested too early after a change.
+        """
+        self._profile = profile
+        try:
+            # Refresh all homes, rather than those written to
+            self._last_full_refresh_at = None
+            await self.async_refresh()
+            await asyncio.gather(
+                *(
+                    coordinator.async_refresh()
+                    for coordinator in self._home_coordinators.values()
+                )
+            )
+        finally:
+            self._profile = None
+        skipped = [home_id for home_id in self.homes if home_id not in profile.homes]
+        if skipped:
+            raise HomeAssistantError(
+                f"The refresh of homes {', '.join(skipped)} was skipped, as quick "
+                "updates after a change are running, try again in a minute"
+            )
+
+    def _is_full_refresh_due(self, is_quick: bool) -> bool:
+        """Return True if all homes should be refreshed.
+
+        Quick updates only refresh the homes that have been written to, unless
+        the last full refresh is older than the standard interval.
+        """
+        if not is_quick or not self._dirty_homes or not self._last_full_refresh_at:
+            return True
+        return datetime.now() - self._last_full_refresh_at >= self.scan_interval
+
+    def _is_discovery_due(self) -> bool:
+        """Return True if the homes of the account should be discovered again."""
+        return self._last_discovery_at is None or datetime.now() - (
+            self._last_discovery_at
+        ) >= timedelta(seconds=DISCOVERY_INTERVAL_SECONDS)
+
+    async def _async_refresh_homes(self, home_ids: list[str]) -> bool:
+        """Fetch new homes and refresh known homes concurrently.
+
+        Homes that fail are logged and left as they were, without discarding
+        the results of the homes that were refreshed successfully. An error is
+        only raised if no home could be refreshed, or on authorization errors.
+
+        Returns True if all homes were refreshed.
+        """
+
+        removed_devices: list[str] = []
+        loop_time: list[float] = []
+
+        async def _refresh(home_id: str) -> Home:
+            async with self._refresh_semaphore:
+                with self._phase("fetch", home_id):
+                    data = await self.account.api.read_home_data(home_id)
+            home = self.homes.get(home_id) or Home(self.account.api, home_id)
+            with self._phase("parse", home_id):
+                removed, blocked = await self._async_apply_home_data(home, data)
+            removed_devices.extend(removed)
+            loop_time.append(blocked)
+            self._home_payloads[home_id] = data
+            self.home_updated_at[home_id] = dt_util.utcnow()
+            return home
+
+        with self._phase("auth"):
+            await self._async_check_circuit()
+            # Make sure concurrent requests do not race to exchange the token
+            await self.tokens.async_ensure_valid()
+
+        results = await asyncio.gather(
+            *(_refresh(home_id) for home_id in home_ids), return_exceptions=True
+        )
+        if loop_time:
+            self.metrics.apply_loop_time.record(sum(loop_time))
+
+        errors: list[BaseException] = []
+        new_homes = 0
+        for home_id, result in zip(home_ids, results):
+            if isinstance(result, BaseException):
+                _LOGGER.warning("Failed to refresh home %s: %s", home_id, result)
+                errors.append(result)
+                continue
+            if home_id not in self.homes:
+                new_homes += 1
+                self.homes[home_id] = result
+                self._async_register_home(result)
+                self.topology_version += 1
+
+        self._async_remove_devices(
+            self.get_unique_device_id(device_id) for device_id in removed_devices
+        )
+        self._async_remove_stale_homes()
+
+        for error in errors:
+            if isinstance(error, ApiAuthError):
+                raise error
+        if errors and len(errors) == len(home_ids):
+            raise errors[0]
+
+        self._store.async_save_if_changed(self.homes, self._home_payloads)
+
+        _LOGGER.debug(
+            "Refreshed %d homes from CleverTouch (%d new, %d failed)",
+            len(home_ids) - len(errors),
+            new_homes,
+            len(errors),
+        )
+        return not errors
+
+    async def _async_apply_home_data(
+        self, home: Home, data: dict[str, Any]
+    ) -> tuple[list[str], float]:
+        """Apply the data of a home, parsing it in an executor if it is slow.
+
+        Once applying the data of a home stalled the event loop, its devices
+        are parsed into new models in an executor from then on, which are
+        merged into the home on the event loop, with no await in between.
+
+        Returns the ids of the removed devices, and the time the event loop
+        was blocked.
+        """
+        home_id = home.home_id
+        if home_id not in self.offloaded_homes:
+            started_at = time.perf_counter()
+            removed = self._apply_home_data(home, data)
+            blocked = time.perf_counter() - started_at
+            if blocked > LOOP_STALL_THRESHOLD_SECONDS:
+                self.metrics.loop_stalls += 1
+                self.offloaded_homes.add(home_id)
+                _LOGGER.info(
+                    "Applying the data of home %s blocked the event loop for "
+                    "%.3f s, parsing it in an executor from now on",
+                    home_id,
+                    blocked,
+                )
+            return removed, blocked
+
+        previous = None
+        if not self._is_metadata_refresh_due(home_id):
+            previous = self._home_payloads.get(home_id)
+        device_ids = frozenset(home.devices)
+        staged = await self.hass.async_add_executor_job(
+            _stage_home_data, self.account.api, home.info, device_ids, data, previous
+        )
+        self.metrics.offloaded_parses += 1
+
+        started_at = time.perf_counter()
+        if home.devices.keys() == device_ids:
+            removed = self._merge_staged_home(home, staged)
+        else:
+            # Devices were added or removed meanwhile, the models may not fit
+            removed = self._apply_home_data(home, data)
+        blocked = time.perf_counter() - started_at
+        if blocked > LOOP_STALL_THRESHOLD_SECONDS:
+            self.metrics.loop_stalls += 1
+        return removed, blocked
+
+    def _merge_staged_home(self, home: Home, staged: StagedHome) -> list[str]:
+        """Merge the models parsed in an executor into a home.
+
+        Devices keep their identity, as entities hold on to them, so the
+        parsed values are moved over to them. Returns the ids of the removed
+        devices.
+        """
+        if staged.info is not None:
+            self._metadata_updated_at[home.home_id] = dt_util.utcnow()
+            vars(home.info).update(vars(staged.info))
+        self._apply_unconfirmed(home, staged.unchanged)
+        for device_id, (parsed, snapshot) in staged.devices.items():
+            parsed.home = home.info
+            if (device := home.devices.get(device_id)) is None:
+                device = home.devices[device_id] = parsed
+                self.topology_version += 1
+            else:
+                vars(device).update(vars(parsed))
+            self._written_devices.discard(device_id)
+            self._update_snapshot(device, polled=True, snapshot=snapshot)
+        if staged.info is None:
+            return []
+        return self._remove_missing_devices(home, staged.devices)
+
+    def _async_remove_stale_homes(self) -> None:
+        """Remove the homes no longer listed for the account.
+
+        Removed homes are only known after discovery.
+        """
+        removed_homes = [
+            home_id for home_id in self.homes if home_id not in self.user.homes
+        ]
+        removed_devices: list[str] = []
+        for home_id in removed_homes:
+            home = self.homes.pop(home_id)
+            removed_devices.extend(home.devices)
+            for device_id in home.devices:
+                self._forget_device(device_id)
+            self._home_payloads.pop(home_id, None)
+            self.home_updated_at.pop(home_id, None)
+            self.offloaded_homes.discard(home_id)
+            self.topology_version += 1
+        self._async_remove_devices(
+            [self.get_unique_device_id(device_id) for device_id in removed_devices]
+            + [self.get_unique_home_id(home_id) for home_id in removed_homes]
+        )
 
     def get_unique_home_id(self, home_id) -> str:
         """Return the unique id for a home."""
         return f"{self.model_id}_{home_id}"
 
+    def get_device_entry_id(self, device: Device) -> str | None:
+        """Return the id of the device registry entry of a device, if any."""
+        entry = device_registry.async_get(self.hass).async_get_device(
+            identifiers={(DOMAIN, self.get_unique_device_id(device.device_id))}
+        )
+        return entry.id if entry else None
+
+    def get_unique_device_id(self, device_id) -> str:
+        """Return the unique id for a device."""
+        return f"{self.model_id}_{device_id}"
+
+    def get_unique_account_id(self) -> str:
+        """Return the unique id for the account."""
+        return f"{self.model_id}_{self.config_entry.entry_id}"
+
+
+class StagedHome(NamedTuple):
+    """Models of a home parsed in an executor, to be merged on the event loop."""
+
+    # New info of the home, when its metadata is applied
+    info: HomeInfo | None
+    # Parsed models and their snapshots, of the devices whose data changed
+    devices: dict[str, tuple[Device, DeviceSnapshot]]
+    # Data of the devices that did not change
+    unchanged: list[dict[str, Any]]
+
+
+def _write_field(optimistic: Mapping[str, Any] | None) -> str:
+    """Return the field a write is recorded as, the first it changes."""
+    return next(iter(optimistic or {}), "unknown")
+
+
+def _read_current(device: Device, reader: SnapshotReader) -> Any:
+    """Read a value as last written to a device, or else as polled.
+
+    The library sets the values of a device when writing them, and polled data
+    replaces them, so the device holds the values the cloud was last sent.
+    """
+    return reader(DeviceSnapshot(device))
+
+
+def _diff_devices(
+    info: HomeInfo,
+    device_ids: Collection[str],
+    data: dict[str, Any],
+    previous: dict[str, Any],
+) -> tuple[list[dict[str, Any]], list[dict[str, Any]]] | None:
+    """Split the data of the devices of a home into changed and unchanged.
+
+    Returns None if devices were added, removed or moved to unknown zones.
+    """
+    if len(data["devices"]) != len(device_ids):
+        return None
+    previous_devices = {
+        Device.get_id(device_data): device_data for device_data in previous["devices"]
+    }
+    changed: list[dict[str, Any]] = []
+    unchanged: list[dict[str, Any]] = []
+    for device_data in data["devices"]:
+        device_id = Device.get_id(device_data)
+        if device_id not in device_ids:
+            return None
+        if device_data.get("num_zone") not in info.zones:
+            return None
+        if previous_devices.get(device_id) != device_data:
+            changed.append(device_data)
+        else:
+            unchanged.append(device_data)
+    return changed, unchanged
+
+
+def _stage_home_data(
+    api: ApiSession,
+    info: HomeInfo,
+    device_ids: frozenset[str],
+    data: dict[str, Any],
+    previous: dict[str, Any] | None,
+) -> StagedHome:
+    """Parse the devices of a home whose data changed into new models.
+
+    Runs in an executor, so nothing shared is modified. All devices are
+    parsed, with new info of the home, when there is no previous data or
+    devices were added, removed or moved to unknown zones.
+    """
+    if (
+        previous is not None
+        and (diff := _diff_devices(info, device_ids, data, previous)) is not None
+    ):
+        changed, unchanged = diff
+        staged_info = None
+    else:
+        changed, unchanged = data["devices"], []
+        info = staged_info = HomeInfo(data=data)
+    devices: dict[str, tuple[Device, DeviceSnapshot]] = {}
+    for device_data in changed:
+        device = create_device(api, info, device_data)
+        devices[device.device_id] = (device, DeviceSnapshot(device))
+    return StagedHome(staged_info, devices, unchanged)
+
+
+class HomeUpdateCoordinator(CleverTouchPollingCoordinator):
+    """Class to manage fetching the data of a single home.
+
+    Failures only affect the entities of the home, and back off the updates
+    of the home alone.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, parent: CleverTouchUpdateCoordinator, home_id: str
+    ) -> None:
+        """Initialize the home coordinator."""
+        super().__init__(
+            hass,
+            name=f"{parent.name}-{home_id}",
+            entry=parent.config_entry,
+            metrics=parent.metrics,
+        )
+        self.parent = parent
+        self.home_id = home_id
+        self.started: bool = False
+        # Entities stay unavailable until the home has been refreshed
+        self.last_update_success = False
+
+    async def async_start(self) -> None:
+        """Run the first refresh of the home."""
+        self.started = True
+        await self.async_refresh()
+
+    async def _async_fetch(self, is_quick: bool) -> bool:
+        """Refresh the home through the account coordinator."""
+        return await self.parent.async_refresh_home(self.home_id)
+
+    @property
+    def profile(self) -> RefreshProfile | None:
+        """Return the profile of the refresh being profiled, if any."""
+        return self.parent.profile
+
+    def _data_updated_at(self) -> list[datetime]:
+        updated_at = self.parent.home_updated_at.get(self.home_id)
+        return [updated_at] if updated_at else []
+
 
 class CleverTouchEntity(CoordinatorEntity[CleverTouchUpdateCoordinator]):
     """Base class for a CleverTouch entity.
@@ -155,9 +1480,15 @@ class CleverTouchEntity(CoordinatorEntity[CleverTouchUpdateCoordinator]):
         """Initialize the entity."""
         super().__init__(coordinator)
         self.device: Device = device
+        self._home_coordinator = coordinator.get_home_coordinator(
+            device.home.home_id
+        )
+        self._written_snapshot: DeviceSnapshot | None = None
+        self._written_availability: tuple[bool, bool] | None = None
+        self._written_values: Any = None
 
         self._attr_device_info = DeviceInfo(
-            identifiers={(DOMAIN, f"{coordinator.model_id}_{device.device_id}")},
+            identifiers={(DOMAIN, coordinator.get_unique_device_id(device.device_id))},
             manufacturer=coordinator.model.manufacturer,
             model=f"{device.device_type}",
             name=f"{device.zone.label} {device.label}",
@@ -171,6 +1502,114 @@ class CleverTouchEntity(CoordinatorEntity[CleverTouchUpdateCoordinator]):
 
         return f"{self.coordinator.model_id}_{self.device.device_id}_{self.entity_description.key}"
 
+    @property
+    def snapshot(self) -> DeviceSnapshot:
+        """Return the values of the device as of its last update."""
+        if (snapshot := self.coordinator.snapshots.get(self.device.device_id)) is None:
+            snapshot = DeviceSnapshot(self.device)
+        return snapshot
+
+    def _state_values(self) -> Any:
+        """Return the values of the snapshot shown by the entity."""
+        return self.snapshot
+
+    @property
+    def available(self) -> bool:
+        """Return True if the home of the device was refreshed.
+
+        After failed refreshes, the last known values remain available up to
+        the staleness limit.
+        """
+        return self._home_coordinator.last_update_success or (
+            self.coordinator.is_serving_stale(self.device.home.home_id)
+        )
+
+    @property
+    def _availability(self) -> tuple[bool, bool]:
+        """Return whether the entity is available, and serving stale values."""
+        return self.available, not self._home_coordinator.last_update_success
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return when the values were read, while serving stale values.
+
+        A timestamp is used rather than an age, so that it remains correct
+        without writing the state again.
+        """
+        if self._home_coordinator.last_update_success:
+            return None
+        updated_at = self.coordinator.home_updated_at.get(self.device.home.home_id)
+        return {ATTR_DATA_UPDATED_AT: updated_at.isoformat() if updated_at else None}
+
+    async def async_added_to_hass(self) -> None:
+        """Remember the state written when the entity is added."""
+        await super().async_added_to_hass()
+        if self._home_coordinator is not self.coordinator:
+            self.async_on_remove(
+                self._home_coordinator.async_add_listener(
+                    self._handle_coordinator_update
+                )
+            )
+        self._written_snapshot = self.snapshot
+        self._written_availability = self._availability
+        self._written_values = self._state_values()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state only if the values shown by the entity changed.
+
+        Snapshots are kept by the coordinator as long as the device does not
+        change, so unchanged devices are skipped without comparing values.
+        """
+        snapshot = self.snapshot
+        availability = self._availability
+        if availability == self._written_availability:
+            if snapshot is self._written_snapshot:
+                return
+            self._written_snapshot = snapshot
+            values = self._state_values()
+            if values == self._written_values:
+                return
+        else:
+            values = self._state_values()
+        self._written_snapshot = snapshot
+        self._written_availability = availability
+        self._written_values = values
+        self.async_write_ha_state()
+
+
+class Expectation(NamedTuple):
+    """A written value, and a reader returning the value from polled data."""
+
+    value: Any
+    reader: Reader
+
+
+class CleverTouchAccountEntity(CoordinatorEntity[CleverTouchUpdateCoordinator]):
+    """Base class for a CleverTouch entity describing the account itself.
+
+    Used for diagnostics of the integration, grouped by a service device.
+    """
+
+    def __init__(self, coordinator: CleverTouchUpdateCoordinator) -> None:
+        """Initialize the entity."""
+        super().__init__(coordinator)
+
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, coordinator.get_unique_account_id())},
+            manufacturer=coordinator.model.manufacturer,
+            model=coordinator.model.app,
+            name=f"{coordinator.model.app} account",
+            entry_type=DeviceEntryType.SERVICE,
+            configuration_url=f"https://{coordinator.host}",
+        )
+
+    @property
+    def unique_id(self) -> str | None:
+        """Return a unique ID to use for this entity."""
+
+        return f"{self.coordinator.get_unique_account_id()}_{self.entity_description.key}"
+
 
 class QuickUpdatesController:
     """Class to manipulate the frequency of updates in the data coordinator."""
@@ -187,6 +1626,15 @@ class QuickUpdatesController:
     # Instead of trying to change the behaviour of the DataCoordinator on a more
     # fundamental level, we just tuck on this stateful class that help us modifying
     # the scan interval to increase the frequency of updates on requested.
+    #
+    # When the written values are known, they are kept as expectations. Quick
+    # updates stop as soon as every expectation has been confirmed by polled
+    # data, and are extended up to a maximum count while any is still unmet.
+    #
+    # To avoid all entries polling the API at the same moment, e.g. after a
+    # restart or an outage, the first regular update is run at a random phase
+    # of the interval, each following interval is slightly jittered, and the
+    # backoff uses decorrelated jitter.
 
     class State(Enum):
         """Internal state of the quick updates controller."""
@@ -200,19 +1648,28 @@ class QuickUpdatesController:
         standard_interval: timedelta,
         quick_interval: timedelta,
         quick_count: int,
+        max_quick_count: int,
         min_backoff: timedelta,
         max_backoff: timedelta,
+        jitter: float = 0.0,
     ) -> None:
         """Initialize the quick updates controller."""
 
         self._standard_interval: timedelta = standard_interval
         self._quick_interval: timedelta = quick_interval
         self._quick_count: int = quick_count
+        self._max_quick_count_limit: int = max_quick_count
+        self._max_quick_count: int = max(quick_count, max_quick_count)
         self._min_backoff: timedelta = min_backoff
         self._max_backoff: timedelta = max_backoff
+        self._jitter: float = jitter
 
         self._state = self.State.STANDARD
 
+        # The current regular interval, staggered over the full interval at first
+        self._stagger: bool = True
+        self._current_interval: timedelta = standard_interval
+
         # Until we know better, set the internal state to trigger an
         # immediate update when requested
         now = datetime.now()
@@ -220,38 +1677,130 @@ class QuickUpdatesController:
         self._last_run_at: datetime = now
         self._next_expected_at: datetime = now
         self._last_expected_at: datetime = now
+        self._max_expected_at: datetime = now
+
+        # Expected values, and whether every request came with expectations
+        self._expectations: dict[Any, Expectation] = {}
+        self._confirmable: bool = True
+
+    @property
+    def state(self) -> State:
+        """Return the current state."""
+        return self._state
+
+    @property
+    def is_quick(self) -> bool:
+        """Return True if quick updates are active."""
+        return self._state == self.State.QUICK
+
+    @property
+    def standard_interval(self) -> timedelta:
+        """Return the regular interval, without jitter."""
+        return self._standard_interval
+
+    def configure(
+        self,
+        standard_interval: timedelta,
+        quick_interval: timedelta,
+        quick_count: int,
+        min_backoff: timedelta,
+        max_backoff: timedelta,
+    ) -> timedelta:
+        """Change the intervals and counts, returns the interval to use now."""
+        if standard_interval != self._standard_interval:
+            self._standard_interval = standard_interval
+            self._current_interval = self._next_standard_interval()
+        self._quick_interval = quick_interval
+        self._quick_count = quick_count
+        self._max_quick_count = max(quick_count, self._max_quick_count_limit)
+        self._min_backoff = min_backoff
+        self._max_backoff = max_backoff
+        if self._current_backoff is not None:
+            self._current_backoff = min(
+                max_backoff, max(min_backoff, self._current_backoff)
+            )
+        return self._get_current_interval()
 
     def on_error(self) -> timedelta:
         """Handle an error."""
         if self._state == self.State.BACKING_OFF:
-            self._current_backoff = min(self._current_backoff * 2, self._max_backoff)
+            self._current_backoff = self._next_backoff(self._current_backoff)
         else:
+            self._end_quick_updates()
             self._state = self.State.BACKING_OFF
-            self._current_backoff = self._min_backoff
+            self._current_backoff = self._next_backoff(self._min_backoff)
         return self._get_current_interval()
 
-    def on_success(self) -> timedelta:
-        """Handle a successful update."""
+    def _next_backoff(self, previous: timedelta) -> timedelta:
+        """Return a backoff with decorrelated jitter, within the limits."""
+        backoff = uniform(
+            self._min_backoff.total_seconds(), 3 * previous.total_seconds()
+        )
+        return min(self._max_backoff, timedelta(seconds=backoff))
+
+    def _next_standard_interval(self) -> timedelta:
+        """Return a jittered regular interval, or a random phase if staggering."""
+        if self._stagger:
+            self._stagger = False
+            return max(self._quick_interval, self._standard_interval * uniform(0, 1))
+        return self._standard_interval * uniform(1 - self._jitter, 1 + self._jitter)
+
+    def on_success(self, *, confirm: bool = False) -> timedelta:
+        """Handle a successful update.
+
+        If 'confirm' is true, the polled data is checked against the
+        expectations and quick updates end once all are confirmed.
+        """
         if self._state == self.State.BACKING_OFF:
+            # Entries recovering from the same outage are spread out again
             self._state = self.State.STANDARD
             self._current_backoff = None
+            self._stagger = True
+            self._current_interval = self._next_standard_interval()
+        elif self._state == self.State.QUICK and confirm and self._expectations:
+            self._expectations = {
+                key: expectation
+                for key, expectation in self._expectations.items()
+                if expectation.reader() != expectation.value
+            }
+            if not self._expectations and self._confirmable:
+                self._end_quick_updates()
+                _LOGGER.debug(
+                    "All changes confirmed, going back to regular interval: %s",
+                    self._current_interval,
+                )
         return self._get_current_interval()
 
+    def _end_quick_updates(self) -> None:
+        if self._state != self.State.STANDARD:
+            self._current_interval = self._next_standard_interval()
+        self._state = self.State.STANDARD
+        self._expectations = {}
+        self._confirmable = True
+
     def _get_current_interval(self) -> timedelta:
         match self._state:
             case self.State.STANDARD:
-                return self._standard_interval
+                return self._current_interval
             case self.State.QUICK:
                 return self._quick_interval
             case self.State.BACKING_OFF:
                 return self._current_backoff
 
-    def request_quick_update(self, *, count: int | None = None) -> bool:
+    def request_quick_update(
+        self,
+        *,
+        count: int | None = None,
+        expected: dict[Any, Expectation] | None = None,
+    ) -> bool:
         """Request quick update(s).
 
         This method should be called when one (or more) update(s) should
         be run at a higher frequency than normal, but with a delay.
 
+        The expected values, if known, allow quick updates to end as soon as
+        they are confirmed. Without them, all quick updates are run.
+
         If the method returns True, an update should be requested immediately
         by the caller, e.g:
 
@@ -266,9 +1815,11 @@ class QuickUpdatesController:
         # Valid values if this was the only request to take into account
         next_expected_at = now + interval * 0.9
         last_expected_at = now + interval * (count - 0.1)
+        max_expected_at = now + interval * (self._max_quick_count - 0.1)
 
         # Update time of the last expected quick update if later than before
         self._last_expected_at = max(self._last_expected_at, last_expected_at)
+        self._max_expected_at = max(self._max_expected_at, max_expected_at)
 
         # Always push the update forward, regardless if it was requested already
         self._next_expected_at = next_expected_at
@@ -277,14 +1828,22 @@ class QuickUpdatesController:
             case self.State.STANDARD:
                 _LOGGER.debug("Quick updates were requested")
                 self._state = self.State.QUICK
+                self._add_expectations(expected)
                 return True
             case self.State.QUICK:
                 _LOGGER.debug("Quick updates were requested (already active)")
+                self._add_expectations(expected)
                 return False
             case self.State.BACKING_OFF:
                 _LOGGER.debug("Quick updates were requested, but backing off")
                 return False
 
+    def _add_expectations(self, expected: dict[Any, Expectation] | None) -> None:
+        if expected is None:
+            self._confirmable = False
+        else:
+            self._expectations.update(expected)
+
     def on_updating(self) -> tuple[bool, timedelta | None]:
         """Determine action and next interval when updating.
 
@@ -303,8 +1862,9 @@ class QuickUpdatesController:
 
         match self._state:
             case self.State.STANDARD:
-                self._next_expected_at = now + self._standard_interval * 0.9
-                return True, self._standard_interval
+                self._current_interval = self._next_standard_interval()
+                self._next_expected_at = now + self._current_interval * 0.9
+                return True, self._current_interval
 
             case self.State.QUICK:
                 if now < self._next_expected_at:  # An extra refresh
@@ -321,12 +1881,20 @@ class QuickUpdatesController:
                     )
                     return True, self._quick_interval
 
-                self._state = self.State.STANDARD
+                if self._expectations and now < self._max_expected_at:
+                    _LOGGER.debug(
+                        "Running quick update - %d changes not confirmed - then waiting %s",
+                        len(self._expectations),
+                        self._quick_interval,
+                    )
+                    return True, self._quick_interval
+
+                self._end_quick_updates()
                 _LOGGER.debug(
                     "Final quick update, going back to regular interval: %s",
-                    self._standard_interval,
+                    self._current_interval,
                 )
-                return True, self._standard_interval
+                return True, self._current_interval
 
             case self.State.BACKING_OFF:
                 _LOGGER.debug(
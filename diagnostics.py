@@ -0,0 +1,53 @@
+"""Diagnostics support for CleverTouch."""
+
+from __future__ import annotations
+
+from collections import Counter
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_TOKEN, CONF_USERNAME
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+from .coordinator import CleverTouchUpdateCoordinator
+
+TO_REDACT = {CONF_TOKEN, CONF_USERNAME, "unique_id", "title"}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator: CleverTouchUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+
+    return {
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "scheduler": {
+            "state": coordinator.scheduler_state,
+            "update_interval": (
+                coordinator.update_interval.total_seconds()
+                if coordinator.update_interval
+                else None
+            ),
+            "last_update_success": coordinator.last_update_success,
+            "last_exception": repr(coordinator.last_exception),
+        },
+        "circuit": {
+            "state": coordinator.breaker.state.value,
+            "retry_in": round(coordinator.breaker.retry_in, 1),
+        },
+        "metrics": coordinator.metrics.as_dict(),
+        "homes": {
+            home_id: {
+                "devices": dict(
+                    Counter(str(device.device_type) for device in home.devices.values())
+                ),
+                "zones": len(home.info.zones),
+                "scheduler": coordinator.get_home_coordinator(home_id).scheduler_state,
+                "offloaded": home_id in coordinator.offloaded_homes,
+            }
+            for home_id, home in coordinator.homes.items()
+        },
+    }
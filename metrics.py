@@ -0,0 +1,222 @@
+"""Instrumentation of the CleverTouch API usage."""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections import Counter
+import time
+from types import SimpleNamespace
+from typing import Any
+
+from aiohttp import (
+    ClientSession,
+    TraceConfig,
+    TraceRequestEndParams,
+    TraceRequestExceptionParams,
+    TraceRequestStartParams,
+)
+
+# Upper bounds in seconds of the latency histogram buckets
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float("inf"))
+
+API_PATH_PREFIX = "/api/v0.1/"
+TOKEN_PATH_SUFFIX = "/openid-connect/token"
+
+
+class LatencyHistogram:
+    """Count durations into fixed buckets."""
+
+    def __init__(self) -> None:
+        """Initialize an empty histogram."""
+        self.buckets: list[int] = [0] * len(LATENCY_BUCKETS)
+        self.count: int = 0
+        self.total: float = 0.0
+        self.max: float = 0.0
+        self.last: float | None = None
+
+    def record(self, duration: float) -> None:
+        """Record a duration in seconds."""
+        self.buckets[bisect_left(LATENCY_BUCKETS, duration)] += 1
+        self.count += 1
+        self.total += duration
+        self.max = max(self.max, duration)
+        self.last = duration
+
+    @property
+    def mean(self) -> float | None:
+        """Return the mean duration in seconds."""
+        return self.total / self.count if self.count else None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the histogram as a dict."""
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "max": self.max,
+            "last": self.last,
+            "buckets": {
+                f"le_{bound}": count
+                for bound, count in zip(LATENCY_BUCKETS, self.buckets)
+            },
+        }
+
+
+class EndpointMetrics:
+    """Requests and errors of a single API endpoint."""
+
+    def __init__(self) -> None:
+        """Initialize the endpoint metrics."""
+        self.errors: int = 0
+        self.latency = LatencyHistogram()
+
+    @property
+    def requests(self) -> int:
+        """Return the number of requests."""
+        return self.latency.count
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the metrics as a dict."""
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "latency": self.latency.as_dict(),
+        }
+
+
+class ApiMetrics:
+    """Collect metrics of the requests, refreshes and writes of an account.
+
+    Requests are measured by a trace config on the client session, which
+    covers every call made by the library, including token refreshes.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the metrics."""
+        self.endpoints: dict[str, EndpointMetrics] = {}
+        self.refreshes = LatencyHistogram()
+        self.refresh_errors: int = 0
+        self.token_updates: int = 0
+        self.writes: Counter[str] = Counter()
+        self.write_errors: int = 0
+        self.rate_limit_waits = LatencyHistogram()
+        self.request_timeouts: int = 0
+        self.circuit_rejections: int = 0
+        # Time blocking the event loop per refresh, applying data and writing states
+        self.apply_loop_time = LatencyHistogram()
+        self.state_write_time = LatencyHistogram()
+        self.loop_stalls: int = 0
+        self.offloaded_parses: int = 0
+
+    @property
+    def requests(self) -> int:
+        """Return the total number of requests."""
+        return sum(endpoint.requests for endpoint in self.endpoints.values())
+
+    @property
+    def request_errors(self) -> int:
+        """Return the total number of failed requests."""
+        return sum(endpoint.errors for endpoint in self.endpoints.values())
+
+    @property
+    def token_refreshes(self) -> int:
+        """Return the number of requests for new tokens."""
+        if (endpoint := self.endpoints.get("token")) is None:
+            return 0
+        return endpoint.requests
+
+    @property
+    def mean_latency(self) -> float | None:
+        """Return the mean request latency in seconds."""
+        count = self.requests
+        if not count:
+            return None
+        total = sum(endpoint.latency.total for endpoint in self.endpoints.values())
+        return total / count
+
+    def record_request(self, endpoint: str, duration: float, failed: bool) -> None:
+        """Record a request to an endpoint."""
+        if (metrics := self.endpoints.get(endpoint)) is None:
+            metrics = self.endpoints[endpoint] = EndpointMetrics()
+        metrics.latency.record(duration)
+        if failed:
+            metrics.errors += 1
+
+    def record_refresh(self, duration: float, failed: bool) -> None:
+        """Record a refresh of the coordinator."""
+        self.refreshes.record(duration)
+        if failed:
+            self.refresh_errors += 1
+
+    def record_write(self, field: str, failed: bool) -> None:
+        """Record a write to a device field."""
+        self.writes[field] += 1
+        if failed:
+            self.write_errors += 1
+
+    def create_trace_config(self) -> TraceConfig:
+        """Create a trace config recording the requests of a client session."""
+        trace_config = TraceConfig()
+
+        async def _on_request_start(
+            session: ClientSession,
+            context: SimpleNamespace,
+            params: TraceRequestStartParams,
+        ) -> None:
+            context.start = time.monotonic()
+
+        async def _on_request_end(
+            session: ClientSession,
+            context: SimpleNamespace,
+            params: TraceRequestEndParams,
+        ) -> None:
+            self.record_request(
+                _endpoint(params.url.path),
+                time.monotonic() - context.start,
+                params.response.status >= 400,
+            )
+
+        async def _on_request_exception(
+            session: ClientSession,
+            context: SimpleNamespace,
+            params: TraceRequestExceptionParams,
+        ) -> None:
+            self.record_request(
+                _endpoint(params.url.path), time.monotonic() - context.start, True
+            )
+
+        trace_config.on_request_start.append(_on_request_start)
+        trace_config.on_request_end.append(_on_request_end)
+        trace_config.on_request_exception.append(_on_request_exception)
+        return trace_config
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return all metrics as a dict."""
+        return {
+            "requests": self.requests,
+            "request_errors": self.request_errors,
+            "endpoints": {
+                name: endpoint.as_dict() for name, endpoint in self.endpoints.items()
+            },
+            "refreshes": self.refreshes.as_dict(),
+            "refresh_errors": self.refresh_errors,
+            "token_refreshes": self.token_refreshes,
+            "token_updates": self.token_updates,
+            "writes": dict(self.writes),
+            "write_errors": self.write_errors,
+            "rate_limit_waits": self.rate_limit_waits.as_dict(),
+            "request_timeouts": self.request_timeouts,
+            "circuit_rejections": self.circuit_rejections,
+            "apply_loop_time": self.apply_loop_time.as_dict(),
+            "state_write_time": self.state_write_time.as_dict(),
+            "loop_stalls": self.loop_stalls,
+            "offloaded_parses": self.offloaded_parses,
+        }
+
+
+def _endpoint(path: str) -> str:
+    """Return a short endpoint name from a request path."""
+    if path.endswith(TOKEN_PATH_SUFFIX):
+        return "token"
+    if path.startswith(API_PATH_PREFIX):
+        return path[len(API_PATH_PREFIX) :].strip("/").removeprefix("human/")
+    return path
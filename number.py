@@ -15,7 +15,6 @@ from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 from clevertouch.devices import Radiator, Device
-from clevertouch.devices.radiator import Temperature
 
 from .const import (
     DOMAIN,
@@ -26,6 +25,7 @@ from .const import (
     TEMP_NATIVE_MAX,
 )
 from .coordinator import CleverTouchUpdateCoordinator, CleverTouchEntity
+from .snapshot import DeviceSnapshot, temperature_fields
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -36,30 +36,28 @@ async def async_setup_entry(
     """Set up CleverTouch number entities."""
     coordinator: CleverTouchUpdateCoordinator = hass.data[DOMAIN].get(entry.entry_id)
 
-    entities: list[NumberEntity] = []
-
-    entities.extend(
-        [
-            TemperatureNumberEntity(coordinator, device, temp.name)
-            for home in coordinator.homes.values()
-            for device in home.devices.values()
-            if isinstance(device, Radiator)
-            for temp in device.temperatures.values()
-            if temp.is_writable and temp.name
-        ]
-    )
-
-    def _get_boost_time(dev: Device) -> Optional[int]:
+    def _get_boost_time(snapshot: DeviceSnapshot) -> Optional[int]:
         return (
-            ceil(dev.boost_time / (60.0 * 60.0)) if isinstance(dev, Radiator) else None
+            ceil(snapshot.boost_time / (60.0 * 60.0))
+            if snapshot.boost_time is not None
+            else None
         )
 
     async def _set_boost_time(dev: Device, value: int) -> None:
         if isinstance(dev, Radiator):
             await dev.set_boost_time(value * 60 * 60)
 
-    entities.extend(
-        [
+    def _create_entities(device: Device) -> list[NumberEntity]:
+        if not isinstance(device, Radiator):
+            return []
+
+        entities: list[NumberEntity] = [
+            TemperatureNumberEntity(coordinator, device, temp.name)
+            for temp in device.temperatures.values()
+            if temp.is_writable and temp.name
+        ]
+
+        entities.append(
             CleverNumberEntity(
                 coordinator,
                 device,
@@ -72,14 +70,12 @@ async def async_setup_entry(
                 ),
                 _get_boost_time,
                 _set_boost_time,
+                lambda value: {"boost_time": value * 60 * 60},
             )
-            for home in coordinator.homes.values()
-            for device in home.devices.values()
-            if isinstance(device, Radiator)
-        ]
-    )
+        )
+        return entities
 
-    async_add_entities(entities)
+    coordinator.async_add_device_entities(async_add_entities, _create_entities)
 
 
 class TemperatureNumberEntity(CleverTouchEntity, NumberEntity):
@@ -109,24 +105,27 @@ class TemperatureNumberEntity(CleverTouchEntity, NumberEntity):
             native_min_value=TEMP_NATIVE_MIN,
         )
 
+    def _state_values(self) -> Any:
+        return self.native_value
+
     @property
     def native_value(self) -> Optional[float]:
-        temp = self._radiator.temperatures[self._temp_name].as_unit(TEMP_NATIVE_UNIT)
-        if isinstance(temp, float):
-            temp = round(temp, 1)
-        return temp
+        return self.snapshot.temperatures.get(self._temp_name)
 
     async def async_set_native_value(self, value: float) -> None:
-        if value == self.native_value:
-            return
-        await self._radiator.set_temperature(self._temp_name, value, TEMP_NATIVE_UNIT)
-        self._radiator.temperatures[self._temp_name] = Temperature(
+        async def _set_temperature(value: float) -> None:
+            await self._radiator.set_temperature(
+                self._temp_name, value, TEMP_NATIVE_UNIT
+            )
+
+        await self.coordinator.async_write(
+            self._radiator,
+            f"temp_{self._temp_name}",
             value,
-            TEMP_NATIVE_UNIT,
-            is_writable=True,
-            name=self._temp_name,
+            _set_temperature,
+            reader=lambda snapshot: snapshot.temperatures.get(self._temp_name),
+            optimistic=temperature_fields(self._radiator, self._temp_name, value),
         )
-        await self.coordinator.async_request_delayed_refresh()
 
 
 class CleverNumberEntity(CleverTouchEntity, NumberEntity):
@@ -139,20 +138,32 @@ class CleverNumberEntity(CleverTouchEntity, NumberEntity):
         coordinator: CleverTouchUpdateCoordinator,
         device: Device,
         description: NumberEntityDescription,
-        getter: Callable[[Device], Any],
+        getter: Callable[[DeviceSnapshot], Any],
         setter: Callable[[Device, Any], Awaitable[None]],
+        optimistic: Optional[Callable[[Any], dict[str, Any]]] = None,
     ) -> None:
         super().__init__(coordinator, device)
         self._get_value = getter
         self._set_value = setter
+        self._optimistic = optimistic
         self.entity_description = description
 
+    def _state_values(self) -> Any:
+        return self.native_value
+
     @property
     def native_value(self) -> Any:
-        return self._get_value(self.device)
+        return self._get_value(self.snapshot)
 
     async def async_set_native_value(self, value: Any) -> None:
-        if value == self.native_value:
-            return
-        await self._set_value(self.device, value)
-        await self.coordinator.async_request_delayed_refresh()
+        async def _set_value(value: Any) -> None:
+            await self._set_value(self.device, value)
+
+        await self.coordinator.async_write(
+            self.device,
+            self.entity_description.key,
+            value,
+            _set_value,
+            reader=self._get_value,
+            optimistic=self._optimistic(value) if self._optimistic else None,
+        )
@@ -0,0 +1,102 @@
+"""Optimistic values of CleverTouch devices, shown until they are confirmed."""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+import time
+from typing import Any, NamedTuple
+
+from .snapshot import COUNTDOWN_FIELDS, DeviceSnapshot, normalize
+
+
+class PendingValue(NamedTuple):
+    """Value written to a field, and when it must have been confirmed."""
+
+    value: Any
+    expires_at: float
+
+
+class Rollback(NamedTuple):
+    """Written value of a field that the polled data did not confirm in time."""
+
+    field: str
+    written: Any
+    polled: Any
+
+
+class OptimisticOverlay:
+    """Values written to devices, shown in place of their polled values.
+
+    Written values are shown as soon as the write is requested, instead of
+    after the write and the refresh confirming it. Every polled update of a
+    device reconciles its values: values confirmed by the polled data are
+    dropped, and values still contradicted by it after the confirmation
+    window are rolled back to the polled ones.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the overlay."""
+        self._pending: dict[str, dict[str, PendingValue]] = {}
+
+    def __contains__(self, device_id: object) -> bool:
+        return device_id in self._pending
+
+    def get(self, device_id: str) -> dict[str, Any] | None:
+        """Return the values of a device not confirmed yet, by field."""
+        if (pending := self._pending.get(device_id)) is None:
+            return None
+        return {field: value.value for field, value in pending.items()}
+
+    def set(self, device_id: str, values: Mapping[str, Any], window: float) -> None:
+        """Show written values of a device until confirmed, or the window ends.
+
+        Countdown fields are left out, as they could never be confirmed.
+        """
+        values = {
+            field: value
+            for field, value in values.items()
+            if field not in COUNTDOWN_FIELDS
+        }
+        if not values:
+            return
+        expires_at = time.monotonic() + window
+        pending = self._pending.setdefault(device_id, {})
+        for field, value in values.items():
+            pending[field] = PendingValue(normalize(field, value), expires_at)
+
+    def discard(self, device_id: str, values: Mapping[str, Any]) -> None:
+        """Stop showing written values of a device, e.g. when the write failed.
+
+        Fields set again to other values since are kept.
+        """
+        if (pending := self._pending.get(device_id)) is None:
+            return
+        for field, value in values.items():
+            if field in pending and pending[field].value == normalize(field, value):
+                del pending[field]
+        if not pending:
+            del self._pending[device_id]
+
+    def remove(self, device_id: str) -> None:
+        """Forget all values of a removed device."""
+        self._pending.pop(device_id, None)
+
+    def reconcile(self, device_id: str, polled: DeviceSnapshot) -> list[Rollback]:
+        """Reconcile the values of a device with its polled snapshot.
+
+        Returns the values rolled back.
+        """
+        if (pending := self._pending.get(device_id)) is None:
+            return []
+        now = time.monotonic()
+        rollbacks: list[Rollback] = []
+        for field, (value, expires_at) in list(pending.items()):
+            polled_value = polled.get(field)
+            if polled_value == value:
+                del pending[field]
+            elif now >= expires_at:
+                del pending[field]
+                rollbacks.append(Rollback(field, value, polled_value))
+        if not pending:
+            del self._pending[device_id]
+        return rollbacks
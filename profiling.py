@@ -0,0 +1,120 @@
+"""Profiling of the refreshes of the CleverTouch integration."""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from collections.abc import Iterator
+from contextlib import contextmanager
+import cProfile
+import logging
+from pathlib import Path
+import pstats
+import time
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+
+if TYPE_CHECKING:
+    from .coordinator import CleverTouchUpdateCoordinator
+
+PROFILES_DIR = f"{DOMAIN}_profiles"
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class RefreshProfile:
+    """Wall-clock time spent in the phases of a refresh.
+
+    Homes are refreshed concurrently, so the time of a phase summed over the
+    homes may exceed the duration of the refresh.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty profile."""
+        self.phases: defaultdict[str, float] = defaultdict(float)
+        self.homes: defaultdict[str, defaultdict[str, float]] = defaultdict(
+            lambda: defaultdict(float)
+        )
+
+    @contextmanager
+    def phase(self, name: str, home_id: str | None = None) -> Iterator[None]:
+        """Add the time spent in the block to a phase, and to a home if given."""
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - started_at
+            self.phases[name] += duration
+            if home_id is not None:
+                self.homes[home_id][name] += duration
+
+
+async def async_profile_refresh(
+    coordinator: CleverTouchUpdateCoordinator,
+) -> dict[str, Any]:
+    """Run a full refresh of an account under the profiler.
+
+    The statistics are written to the profiles directory of the configuration,
+    for pstats or snakeviz, and a summary of the phases is returned.
+    """
+    hass = coordinator.hass
+    if coordinator.profile is not None:
+        raise HomeAssistantError("A refresh is already being profiled")
+
+    profile = RefreshProfile()
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError as ex:
+        # Only one profiler can be active at a time, e.g. the profiler integration
+        raise HomeAssistantError(f"Could not start the profiler: {ex}") from ex
+    started_at = time.perf_counter()
+    try:
+        await coordinator.async_profile_refresh(profile)
+    finally:
+        duration = time.perf_counter() - started_at
+        profiler.disable()
+
+    path = Path(
+        hass.config.path(
+            PROFILES_DIR,
+            f"refresh-{coordinator.model_id}-"
+            f"{dt_util.now().strftime('%Y%m%d-%H%M%S')}.prof",
+        )
+    )
+    json_seconds = await hass.async_add_executor_job(_write_stats, profiler, path)
+    summary = {
+        "file": str(path),
+        "duration": round(duration, 4),
+        "phases": {
+            **{name: round(seconds, 4) for name, seconds in profile.phases.items()},
+            "json_decode": round(json_seconds, 4),
+        },
+        "homes": {
+            home_id: {name: round(seconds, 4) for name, seconds in phases.items()}
+            for home_id, phases in profile.homes.items()
+        },
+    }
+    _LOGGER.info("Profiled refresh of %s: %s", coordinator.name, summary)
+    return summary
+
+
+def _write_stats(profiler: cProfile.Profile, path: Path) -> float:
+    """Write the statistics of a profile, returns the time decoding JSON."""
+    path.parent.mkdir(exist_ok=True)
+    profiler.dump_stats(path)
+    stats = pstats.Stats(profiler)
+    return sum(
+        cumulative
+        for (filename, _line, function), (
+            _calls,
+            _primitive,
+            _total,
+            cumulative,
+            _callers,
+        ) in stats.stats.items()  # type: ignore[attr-defined]
+        if function.endswith(("loads", "loads>")) and "json" in filename + function
+    )
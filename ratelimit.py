@@ -0,0 +1,150 @@
+"""Rate limiting of requests to the CleverTouch cloud API."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from enum import IntEnum
+import logging
+import time
+
+from aiohttp import ClientHandlerType, ClientMiddlewareType, ClientRequest
+from aiohttp import ClientResponse
+
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN, API_RATE_LIMIT_PER_SECOND, API_RATE_LIMIT_BURST
+from .metrics import ApiMetrics
+
+DATA_RATE_LIMITERS = f"{DOMAIN}_rate_limiters"
+
+WRITE_PATH_SUFFIXES = ("/query/push/", "/openid-connect/token")
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class Priority(IntEnum):
+    """Priority of a request, lower values are served first."""
+
+    WRITE = 0
+    READ = 1
+
+
+class HostRateLimiter:
+    """Token bucket limiting the requests to a single host.
+
+    Tokens are added at a steady rate up to a maximum burst. Requests that
+    can not be served immediately are queued, and when tokens become
+    available, queued writes are always served before queued reads.
+    """
+
+    def __init__(self, host: str, rate: float, burst: int) -> None:
+        """Initialize the rate limiter."""
+        self.host = host
+        self._rate = rate
+        self._burst = burst
+        self._tokens = float(burst)
+        self._updated_at = time.monotonic()
+        self._waiters: dict[Priority, deque[asyncio.Future[None]]] = {
+            priority: deque() for priority in Priority
+        }
+        self._timer: asyncio.TimerHandle | None = None
+
+    async def async_acquire(self, priority: Priority) -> None:
+        """Wait until a request to the host may be made."""
+        self._refill()
+        if self._tokens >= 1 and not self._has_waiters():
+            self._tokens -= 1
+            return
+
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._waiters[priority].append(future)
+        self._schedule_release()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The token was handed over just as we were cancelled
+                self._tokens += 1
+            raise
+
+    def configure(self, rate: float, burst: int) -> None:
+        """Change the rate and burst size, keeping the tokens available."""
+        if rate == self._rate and burst == self._burst:
+            return
+        self._refill()
+        self._rate = rate
+        self._burst = burst
+        self._tokens = min(self._tokens, burst)
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+            self._schedule_release()
+
+    def _has_waiters(self) -> bool:
+        return any(self._waiters.values())
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(
+            self._burst, self._tokens + (now - self._updated_at) * self._rate
+        )
+        self._updated_at = now
+
+    def _schedule_release(self) -> None:
+        if self._timer is not None:
+            return
+        delay = max(0.0, (1 - self._tokens) / self._rate)
+        self._timer = asyncio.get_running_loop().call_later(
+            delay, self._release_waiters
+        )
+
+    def _release_waiters(self) -> None:
+        self._timer = None
+        self._refill()
+        for priority in Priority:
+            waiters = self._waiters[priority]
+            while waiters and self._tokens >= 1:
+                future = waiters.popleft()
+                if future.done():
+                    continue
+                future.set_result(None)
+                self._tokens -= 1
+        if self._has_waiters():
+            self._schedule_release()
+
+
+def async_get_rate_limiter(hass: HomeAssistant, host: str) -> HostRateLimiter:
+    """Return the rate limiter shared by all config entries using a host."""
+    limiters: dict[str, HostRateLimiter] = hass.data.setdefault(DATA_RATE_LIMITERS, {})
+    if (limiter := limiters.get(host)) is None:
+        limiter = limiters[host] = HostRateLimiter(
+            host, API_RATE_LIMIT_PER_SECOND, API_RATE_LIMIT_BURST
+        )
+    return limiter
+
+
+def create_rate_limit_middleware(
+    limiter: HostRateLimiter, metrics: ApiMetrics
+) -> ClientMiddlewareType:
+    """Create a client session middleware passing requests through a limiter.
+
+    Writes and token requests are prioritized over reads.
+    """
+
+    async def _middleware(
+        request: ClientRequest, handler: ClientHandlerType
+    ) -> ClientResponse:
+        priority = (
+            Priority.WRITE
+            if request.url.path.endswith(WRITE_PATH_SUFFIXES)
+            else Priority.READ
+        )
+        started_at = time.monotonic()
+        await limiter.async_acquire(priority)
+        if (waited := time.monotonic() - started_at) > 0.001:
+            _LOGGER.debug("Request to %s delayed %.3f s", limiter.host, waited)
+        metrics.rate_limit_waits.record(waited)
+        return await handler(request)
+
+    return _middleware
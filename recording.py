@@ -0,0 +1,202 @@
+"""Recording of the traffic to the CleverTouch cloud API.
+
+Recordings are gzip-compressed JSON lines: a header with the model and host,
+followed by one line per request with the form sent and the response
+received. Tokens, passwords and email addresses are scrubbed before anything
+is written, so recordings can be shared to reproduce issues, and be replayed
+by the benchmarks against the payloads of a real installation.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+import gzip
+import json
+import logging
+from pathlib import Path
+import re
+import time
+from typing import Any
+from urllib.parse import parse_qsl
+
+from aiohttp import (
+    ClientHandlerType,
+    ClientMiddlewareType,
+    ClientRequest,
+    ClientResponse,
+)
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+
+RECORDING_FORMAT_VERSION = 1
+RECORDINGS_DIR = f"{DOMAIN}_recordings"
+
+# Values of these keys are replaced, wherever they appear
+SCRUBBED_KEYS = frozenset(
+    {
+        "access_token",
+        "refresh_token",
+        "id_token",
+        "session_state",
+        "password",
+        "username",
+        "email",
+        "client_secret",
+        "token",
+    }
+)
+SCRUBBED = "**REDACTED**"
+SCRUBBED_EMAIL = "user@example.com"
+
+_EMAIL = re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+")
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def scrub(value: Any) -> Any:
+    """Return a copy of a payload without tokens, passwords and emails."""
+    if isinstance(value, dict):
+        return {
+            key: SCRUBBED if key in SCRUBBED_KEYS and item else scrub(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [scrub(item) for item in value]
+    if isinstance(value, str):
+        return _EMAIL.sub(SCRUBBED_EMAIL, value)
+    return value
+
+
+class TrafficRecorder:
+    """Record the requests of a client session to a file, when started.
+
+    Requests are kept in memory while recording, and written to the file
+    when the recording stops.
+    """
+
+    def __init__(self, hass: HomeAssistant, model_id: str, host: str) -> None:
+        """Initialize the recorder."""
+        self._hass = hass
+        self._model_id = model_id
+        self._host = host
+        self._records: list[dict[str, Any]] | None = None
+        self._started_at = 0.0
+        self._path = Path()
+        self._unsub_stop: CALLBACK_TYPE | None = None
+
+    @property
+    def is_recording(self) -> bool:
+        """Return True while requests are recorded."""
+        return self._records is not None
+
+    @callback
+    def async_start(self, duration: float) -> Path:
+        """Start recording for a duration, returns the file to be written."""
+        if self._records is None:
+            self._records = []
+            self._started_at = time.monotonic()
+            now = dt_util.now()
+            self._path = Path(
+                self._hass.config.path(
+                    RECORDINGS_DIR,
+                    f"{self._model_id}-{now.strftime('%Y%m%d-%H%M%S')}.jsonl.gz",
+                )
+            )
+            _LOGGER.info("Recording API traffic to %s", self._path)
+        if self._unsub_stop:
+            self._unsub_stop()
+        self._unsub_stop = async_call_later(self._hass, duration, self._async_stop_due)
+        return self._path
+
+    @callback
+    def _async_stop_due(self, _now: datetime) -> None:
+        self._unsub_stop = None
+        self._hass.async_create_background_task(
+            self.async_stop(), f"{DOMAIN}-recording-stop"
+        )
+
+    async def async_stop(self) -> Path | None:
+        """Stop recording and write the requests recorded, if any."""
+        if self._unsub_stop:
+            self._unsub_stop()
+            self._unsub_stop = None
+        if (records := self._records) is None:
+            return None
+        path = self._path
+        self._records = None
+        header = {
+            "version": RECORDING_FORMAT_VERSION,
+            "model": self._model_id,
+            "host": self._host,
+        }
+        await self._hass.async_add_executor_job(_write, path, [header, *records])
+        _LOGGER.info("Recorded %d API requests to %s", len(records), path)
+        return path
+
+    def record(
+        self,
+        request: ClientRequest,
+        response: ClientResponse,
+        body: bytes,
+        started_at: float,
+    ) -> None:
+        """Record a request and its response."""
+        if self._records is None:
+            return
+        form: dict[str, Any] = {}
+        if request.body:
+            form = dict(parse_qsl(request.body.decode()))
+        try:
+            content: Any = json.loads(body)
+        except ValueError:
+            content = body.decode(errors="replace")
+        self._records.append(
+            {
+                "t": round(started_at - self._started_at, 3),
+                "duration": round(time.monotonic() - started_at, 3),
+                "method": request.method,
+                "host": request.url.host,
+                "path": request.url.path,
+                "form": scrub(form),
+                "status": response.status,
+                "body": scrub(content),
+            }
+        )
+
+
+def _write(path: Path, lines: list[dict[str, Any]]) -> None:
+    path.parent.mkdir(exist_ok=True)
+    with gzip.open(path, "wt", encoding="utf-8") as file:
+        for line in lines:
+            file.write(json.dumps(line, separators=(",", ":")) + "\n")
+
+
+def read_recording(path: Path) -> tuple[dict[str, Any], list[dict[str, Any]]]:
+    """Read the header and the requests of a recording."""
+    with gzip.open(path, "rt", encoding="utf-8") as file:
+        header, *records = (json.loads(line) for line in file if line.strip())
+    if header.get("version") != RECORDING_FORMAT_VERSION:
+        raise ValueError(f"Unsupported recording version {header.get('version')}")
+    return header, records
+
+
+def create_recording_middleware(
+    recorder: TrafficRecorder,
+) -> ClientMiddlewareType:
+    """Create a client session middleware recording requests when started."""
+
+    async def _middleware(
+        request: ClientRequest, handler: ClientHandlerType
+    ) -> ClientResponse:
+        if not recorder.is_recording:
+            return await handler(request)
+        started_at = time.monotonic()
+        response = await handler(request)
+        recorder.record(request, response, await response.read(), started_at)
+        return response
+
+    return _middleware
@@ -9,6 +9,7 @@ from homeassistant.components.sensor import (
     SensorStateClass,
 )
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EntityCategory, UnitOfTime
 
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
@@ -16,10 +17,15 @@ from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from .const import (
     DOMAIN,
     TEMP_HA_UNIT,
-    TEMP_NATIVE_UNIT,
 )
 from clevertouch.devices import Device, Radiator
-from .coordinator import CleverTouchUpdateCoordinator, CleverTouchEntity
+from .coordinator import (
+    CleverTouchUpdateCoordinator,
+    CleverTouchEntity,
+    CleverTouchAccountEntity,
+    QuickUpdatesController,
+)
+from .snapshot import DeviceSnapshot
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -30,31 +36,23 @@ async def async_setup_entry(
     """Set up CleverTouch sensor entities."""
     coordinator: CleverTouchUpdateCoordinator = hass.data[DOMAIN].get(entry.entry_id)
 
-    entities: list[SensorEntity] = []
+    def _get_boost_time_remaining(snapshot: DeviceSnapshot) -> Optional[int]:
+        if snapshot.boost_remaining and snapshot.boost_remaining > 0:
+            return snapshot.boost_remaining
+        else:
+            return None
+
+    def _create_entities(device: Device) -> list[SensorEntity]:
+        if not isinstance(device, Radiator):
+            return []
 
-    entities.extend(
-        [
+        entities: list[SensorEntity] = [
             TemperatureSensorEntity(coordinator, device, temp.name)
-            for home in coordinator.homes.values()
-            for device in home.devices.values()
-            if isinstance(device, Radiator)
             for temp in device.temperatures.values()
             if not temp.is_writable and temp.name
         ]
-    )
 
-    def _get_boost_time_remaining(dev: Device) -> Optional[int]:
-        if (
-            isinstance(dev, Radiator)
-            and dev.boost_remaining
-            and dev.boost_remaining > 0
-        ):
-            return dev.boost_remaining
-        else:
-            return None
-
-    entities.extend(
-        [
+        entities.append(
             CleverSensorEntity(
                 coordinator,
                 device,
@@ -67,13 +65,144 @@ async def async_setup_entry(
                 ),
                 _get_boost_time_remaining,
             )
-            for home in coordinator.homes.values()
-            for device in home.devices.values()
-            if isinstance(device, Radiator)
-        ]
+        )
+        return entities
+
+    async_add_entities(
+        CleverAccountSensorEntity(coordinator, description, getter, attributes)
+        for description, getter, attributes in ACCOUNT_SENSORS
     )
 
-    async_add_entities(entities)
+    coordinator.async_add_device_entities(async_add_entities, _create_entities)
+
+
+def _round_ms(seconds: Optional[float]) -> Optional[float]:
+    return round(seconds * 1000, 1) if seconds is not None else None
+
+
+def _round_s(seconds: Optional[float]) -> Optional[float]:
+    return round(seconds, 2) if seconds is not None else None
+
+
+ACCOUNT_SENSORS: list[
+    tuple[
+        SensorEntityDescription,
+        Callable[[CleverTouchUpdateCoordinator], Any],
+        Optional[Callable[[CleverTouchUpdateCoordinator], dict[str, Any]]],
+    ]
+] = [
+    (
+        SensorEntityDescription(
+            name="API requests",
+            key="api_requests",
+            icon="mdi:api",
+            entity_category=EntityCategory.DIAGNOSTIC,
+            state_class=SensorStateClass.TOTAL_INCREASING,
+        ),
+        lambda coordinator: coordinator.metrics.requests,
+        lambda coordinator: {
+            "errors": coordinator.metrics.request_errors,
+            **{
+                f"{name.replace('/', '_')}_requests": endpoint.requests
+                for name, endpoint in coordinator.metrics.endpoints.items()
+            },
+        },
+    ),
+    (
+        SensorEntityDescription(
+            name="API latency",
+            key="api_latency",
+            icon="mdi:timer-outline",
+            entity_category=EntityCategory.DIAGNOSTIC,
+            device_class=SensorDeviceClass.DURATION,
+            state_class=SensorStateClass.MEASUREMENT,
+            native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        ),
+        lambda coordinator: _round_ms(coordinator.metrics.mean_latency),
+        lambda coordinator: {
+            f"{name.replace('/', '_')}_max_ms": _round_ms(endpoint.latency.max)
+            for name, endpoint in coordinator.metrics.endpoints.items()
+        },
+    ),
+    (
+        SensorEntityDescription(
+            name="Refresh duration",
+            key="refresh_duration",
+            icon="mdi:timer-sync-outline",
+            entity_category=EntityCategory.DIAGNOSTIC,
+            device_class=SensorDeviceClass.DURATION,
+            state_class=SensorStateClass.MEASUREMENT,
+            native_unit_of_measurement=UnitOfTime.SECONDS,
+        ),
+        lambda coordinator: _round_s(coordinator.metrics.refreshes.last),
+        lambda coordinator: {
+            "mean": _round_s(coordinator.metrics.refreshes.mean),
+            "max": _round_s(coordinator.metrics.refreshes.max),
+            "refreshes": coordinator.metrics.refreshes.count,
+            "errors": coordinator.metrics.refresh_errors,
+        },
+    ),
+    (
+        SensorEntityDescription(
+            name="Event loop time",
+            key="event_loop_time",
+            icon="mdi:timer-alert-outline",
+            entity_category=EntityCategory.DIAGNOSTIC,
+            device_class=SensorDeviceClass.DURATION,
+            state_class=SensorStateClass.MEASUREMENT,
+            native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        ),
+        lambda coordinator: _round_ms(coordinator.metrics.apply_loop_time.last),
+        lambda coordinator: {
+            "mean_ms": _round_ms(coordinator.metrics.apply_loop_time.mean),
+            "max_ms": _round_ms(coordinator.metrics.apply_loop_time.max),
+            "state_write_ms": _round_ms(coordinator.metrics.state_write_time.last),
+            "state_write_max_ms": _round_ms(coordinator.metrics.state_write_time.max),
+            "stalls": coordinator.metrics.loop_stalls,
+            "offloaded_parses": coordinator.metrics.offloaded_parses,
+            "offloaded_homes": len(coordinator.offloaded_homes),
+        },
+    ),
+    (
+        SensorEntityDescription(
+            name="Token refreshes",
+            key="token_refreshes",
+            icon="mdi:key-change",
+            entity_category=EntityCategory.DIAGNOSTIC,
+            state_class=SensorStateClass.TOTAL_INCREASING,
+        ),
+        lambda coordinator: coordinator.metrics.token_refreshes,
+        lambda coordinator: {"token_updates": coordinator.metrics.token_updates},
+    ),
+    (
+        SensorEntityDescription(
+            name="Update state",
+            key="update_state",
+            icon="mdi:update",
+            entity_category=EntityCategory.DIAGNOSTIC,
+            device_class=SensorDeviceClass.ENUM,
+            options=[state.value for state in QuickUpdatesController.State],
+        ),
+        lambda coordinator: coordinator.scheduler_state,
+        None,
+    ),
+    (
+        SensorEntityDescription(
+            name="Update interval",
+            key="update_interval",
+            icon="mdi:timer-cog-outline",
+            entity_category=EntityCategory.DIAGNOSTIC,
+            device_class=SensorDeviceClass.DURATION,
+            native_unit_of_measurement=UnitOfTime.SECONDS,
+        ),
+        lambda coordinator: (
+            coordinator.update_interval.total_seconds()
+            if coordinator.update_interval
+            else None
+        ),
+        None,
+    ),
+]
 
 
 class TemperatureSensorEntity(CleverTouchEntity, SensorEntity):
@@ -100,12 +229,12 @@ class TemperatureSensorEntity(CleverTouchEntity, SensorEntity):
             native_unit_of_measurement=TEMP_HA_UNIT,
         )
 
+    def _state_values(self) -> Any:
+        return self.native_value
+
     @property
     def native_value(self) -> Optional[float]:
-        temp = self._radiator.temperatures[self._temp_name].as_unit(TEMP_NATIVE_UNIT)
-        if isinstance(temp, float):
-            temp = round(temp, 1)
-        return temp
+        return self.snapshot.temperatures.get(self._temp_name)
 
 
 class CleverSensorEntity(CleverTouchEntity, SensorEntity):
@@ -118,12 +247,48 @@ class CleverSensorEntity(CleverTouchEntity, SensorEntity):
         coordinator: CleverTouchUpdateCoordinator,
         device: Device,
         description: SensorEntityDescription,
-        getter: Callable[[Device], Any],
+        getter: Callable[[DeviceSnapshot], Any],
     ) -> None:
         super().__init__(coordinator, device)
         self._get_value = getter
         self.entity_description = description
 
+    def _state_values(self) -> Any:
+        return self.native_value
+
     @property
     def native_value(self) -> Any:
-        return self._get_value(self.device)
+        return self._get_value(self.snapshot)
+
+
+class CleverAccountSensorEntity(CleverTouchAccountEntity, SensorEntity):
+    """Representation of a CleverTouch diagnostic sensor of the account."""
+
+    _attr_has_entity_name = True
+
+    def __init__(
+        self,
+        coordinator: CleverTouchUpdateCoordinator,
+        description: SensorEntityDescription,
+        getter: Callable[[CleverTouchUpdateCoordinator], Any],
+        attributes: Optional[Callable[[CleverTouchUpdateCoordinator], dict[str, Any]]],
+    ) -> None:
+        super().__init__(coordinator)
+        self._get_value = getter
+        self._get_attributes = attributes
+        self.entity_description = description
+
+    @property
+    def available(self) -> bool:
+        """Diagnostics remain available when the API is not."""
+        return True
+
+    @property
+    def native_value(self) -> Any:
+        return self._get_value(self.coordinator)
+
+    @property
+    def extra_state_attributes(self) -> Optional[dict[str, Any]]:
+        if self._get_attributes is None:
+            return None
+        return self._get_attributes(self.coordinator)
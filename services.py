@@ -0,0 +1,358 @@
+"""Services of the CleverTouch integration."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable, Mapping
+from datetime import timedelta
+from typing import Any
+
+import voluptuous as vol
+
+from clevertouch.devices import HeatMode, Radiator, TempType
+
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+import homeassistant.helpers.config_validation as cv
+from homeassistant.helpers.service import async_register_admin_service
+
+from .climate import activate_heat_mode, validate_heat_mode_options
+from .const import DOMAIN, TEMP_NATIVE_MAX, TEMP_NATIVE_MIN, TEMP_NATIVE_UNIT
+from .coordinator import CleverTouchUpdateCoordinator
+from .profiling import async_profile_refresh
+from .snapshot import temperature_fields
+
+SERVICE_ACTIVATE_HOME_HEAT_MODE = "activate_home_heat_mode"
+SERVICE_SET_HOME_TEMPERATURES = "set_home_temperatures"
+SERVICE_RECORD_API_TRAFFIC = "record_api_traffic"
+SERVICE_PROFILE_REFRESH = "profile_refresh"
+SERVICE_REFRESH_METADATA = "refresh_metadata"
+
+ATTR_HOME = "home"
+ATTR_ZONE = "zone"
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+ATTR_BOOST_TIME = "boost_time"
+
+# Temperatures that may be set on radiators, by temperature type
+WRITABLE_TEMP_TYPES = [
+    temp_type.value
+    for temp_type in (TempType.COMFORT, TempType.ECO, TempType.FROST, TempType.BOOST)
+]
+
+ACTIVATE_HOME_HEAT_MODE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_HOME): cv.string,
+        vol.Optional(ATTR_ZONE): cv.string,
+        vol.Required("mode"): vol.In([mode.value for mode in HeatMode]),
+        vol.Optional("temperature"): cv.positive_float,
+        vol.Optional("duration"): cv.time_period,
+    }
+)
+
+SET_HOME_TEMPERATURES_SCHEMA = vol.All(
+    vol.Schema(
+        {
+            vol.Optional(ATTR_HOME): cv.string,
+            vol.Optional(ATTR_ZONE): cv.string,
+            **{
+                vol.Optional(temp_type): vol.All(
+                    vol.Coerce(float),
+                    vol.Range(min=TEMP_NATIVE_MIN, max=TEMP_NATIVE_MAX),
+                )
+                for temp_type in WRITABLE_TEMP_TYPES
+            },
+            vol.Optional(ATTR_BOOST_TIME): vol.All(
+                cv.time_period, cv.positive_timedelta
+            ),
+        }
+    ),
+    cv.has_at_least_one_key(*WRITABLE_TEMP_TYPES, ATTR_BOOST_TIME),
+)
+
+RECORD_API_TRAFFIC_SCHEMA = vol.Schema(
+    {
+        vol.Optional("duration", default=timedelta(minutes=10)): vol.All(
+            cv.time_period, cv.positive_timedelta
+        ),
+    }
+)
+
+PROFILE_REFRESH_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+    }
+)
+
+REFRESH_METADATA_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_HOME): cv.string,
+    }
+)
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the services of the integration."""
+
+    async def _async_activate_home_heat_mode(call: ServiceCall) -> ServiceResponse:
+        """Activate a heat mode on all radiators of a home, or of a zone."""
+        validate_heat_mode_options(
+            call.data["mode"],
+            temperature=call.data.get("temperature"),
+            duration=call.data.get("duration"),
+        )
+        return await _async_write_radiators(
+            hass,
+            call,
+            lambda radiator: activate_heat_mode(
+                radiator,
+                call.data["mode"],
+                temperature=call.data.get("temperature"),
+                duration=call.data.get("duration"),
+            ),
+            f"activate {call.data['mode']}",
+        )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_ACTIVATE_HOME_HEAT_MODE,
+        _async_activate_home_heat_mode,
+        schema=ACTIVATE_HOME_HEAT_MODE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    async def _async_set_home_temperatures(call: ServiceCall) -> ServiceResponse:
+        """Set temperatures and the boost time of all radiators of a home or zone."""
+        temperatures = {
+            temp_type: call.data[temp_type]
+            for temp_type in WRITABLE_TEMP_TYPES
+            if temp_type in call.data
+        }
+        return await _async_write_radiators(
+            hass,
+            call,
+            lambda radiator: set_temperatures(
+                radiator, temperatures, boost_time=call.data.get(ATTR_BOOST_TIME)
+            ),
+            "set temperatures",
+        )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SET_HOME_TEMPERATURES,
+        _async_set_home_temperatures,
+        schema=SET_HOME_TEMPERATURES_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    async def _async_record_api_traffic(call: ServiceCall) -> ServiceResponse:
+        """Record the API traffic of all accounts for a while."""
+        coordinators: dict[str, CleverTouchUpdateCoordinator] = hass.data.get(
+            DOMAIN, {}
+        )
+        duration: timedelta = call.data["duration"]
+        files = [
+            str(coordinator.recorder.async_start(duration.total_seconds()))
+            for coordinator in coordinators.values()
+        ]
+        return {"files": files} if call.return_response else None
+
+    async_register_admin_service(
+        hass,
+        DOMAIN,
+        SERVICE_RECORD_API_TRAFFIC,
+        _async_record_api_traffic,
+        schema=RECORD_API_TRAFFIC_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    async def _async_profile_refresh(call: ServiceCall) -> ServiceResponse:
+        """Profile a full refresh of an account, or of each account in turn."""
+        coordinators = _get_coordinators(hass, call.data.get(ATTR_CONFIG_ENTRY_ID))
+        # Only one profiler may run at a time
+        profiles = {
+            entry_id: await async_profile_refresh(coordinator)
+            for entry_id, coordinator in coordinators.items()
+        }
+        return {"profiles": profiles} if call.return_response else None
+
+    async_register_admin_service(
+        hass,
+        DOMAIN,
+        SERVICE_PROFILE_REFRESH,
+        _async_profile_refresh,
+        schema=PROFILE_REFRESH_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    async def _async_refresh_metadata(call: ServiceCall) -> None:
+        """Refresh the homes of an account, or of all accounts, with metadata."""
+        coordinators = _get_coordinators(hass, call.data.get(ATTR_CONFIG_ENTRY_ID))
+        if (home := call.data.get(ATTR_HOME)) is None:
+            await asyncio.gather(
+                *(
+                    coordinator.async_refresh_metadata()
+                    for coordinator in coordinators.values()
+                )
+            )
+            return
+        targets = [
+            (coordinator, home_ids)
+            for coordinator in coordinators.values()
+            if (home_ids := _find_home_ids(coordinator, home))
+        ]
+        if not targets:
+            raise ServiceValidationError(f"No home found with id or name {home}")
+        await asyncio.gather(
+            *(
+                coordinator.async_refresh_metadata(home_ids)
+                for coordinator, home_ids in targets
+            )
+        )
+
+    async_register_admin_service(
+        hass,
+        DOMAIN,
+        SERVICE_REFRESH_METADATA,
+        _async_refresh_metadata,
+        schema=REFRESH_METADATA_SCHEMA,
+    )
+
+
+async def _async_write_radiators(
+    hass: HomeAssistant,
+    call: ServiceCall,
+    write: Callable[[Radiator], tuple[Awaitable[None], dict[str, Any]]],
+    action: str,
+) -> ServiceResponse:
+    """Write to all radiators of a home, or of a zone, of all accounts.
+
+    The writes of each account are run concurrently, followed by a single
+    update of the homes written to. Returns the result of each radiator if
+    requested, otherwise raises if any write failed.
+    """
+    home: str | None = call.data.get(ATTR_HOME)
+    zone: str | None = call.data.get(ATTR_ZONE)
+    coordinators: dict[str, CleverTouchUpdateCoordinator] = hass.data.get(DOMAIN, {})
+    targets = [
+        (coordinator, radiators)
+        for coordinator in coordinators.values()
+        if (radiators := _find_radiators(coordinator, home, zone))
+    ]
+    if not targets:
+        raise ServiceValidationError(
+            f"No radiators found in home {home or '(any)'}, zone {zone or '(any)'}"
+        )
+
+    results = await asyncio.gather(
+        *(
+            coordinator.async_run_writes(
+                [(radiator, *write(radiator)) for radiator in radiators]
+            )
+            for coordinator, radiators in targets
+        ),
+        return_exceptions=True,
+    )
+
+    devices: list[dict[str, str | bool | None]] = []
+    failed: list[str] = []
+    for (coordinator, radiators), errors in zip(targets, results):
+        if isinstance(errors, BaseException):
+            if not isinstance(errors, Exception):
+                raise errors
+            # Nothing was written to the account, e.g. as its circuit is open
+            errors = [errors] * len(radiators)
+        for radiator, error in zip(radiators, errors):
+            name = f"{radiator.zone.label} {radiator.label}"
+            devices.append(
+                {
+                    "device_id": coordinator.get_device_entry_id(radiator),
+                    "name": name,
+                    "home": radiator.home.label,
+                    "zone": radiator.zone.label,
+                    "success": error is None,
+                    "error": str(error) if error else None,
+                }
+            )
+            if error:
+                failed.append(f"{name}: {error}")
+
+    if call.return_response:
+        return {"devices": devices}
+    if failed:
+        raise HomeAssistantError(
+            f"Could not {action} on {len(failed)} of {len(devices)} radiators: "
+            f"{'; '.join(failed)}"
+        )
+    return None
+
+
+def set_temperatures(
+    radiator: Radiator,
+    temperatures: Mapping[str, float],
+    *,
+    boost_time: timedelta | None = None,
+) -> tuple[Awaitable[None], dict[str, Any]]:
+    """Return the write setting temperatures of a radiator, and the values it changes.
+
+    The heat mode is left as it is. Each temperature, and the boost time, is
+    sent in a request of its own.
+    """
+    optimistic: dict[str, Any] = {}
+    for temp_type, value in temperatures.items():
+        optimistic.update(temperature_fields(radiator, temp_type, value))
+    if boost_time is not None:
+        optimistic["boost_time"] = int(boost_time.total_seconds())
+
+    async def _write() -> None:
+        for temp_type, value in temperatures.items():
+            await radiator.set_temperature(temp_type, value, TEMP_NATIVE_UNIT)
+        if boost_time is not None:
+            await radiator.set_boost_time(int(boost_time.total_seconds()))
+
+    return _write(), optimistic
+
+
+def _get_coordinators(
+    hass: HomeAssistant, entry_id: str | None
+) -> dict[str, CleverTouchUpdateCoordinator]:
+    """Return the coordinator of a loaded account, or of all accounts, by entry."""
+    coordinators: dict[str, CleverTouchUpdateCoordinator] = hass.data.get(DOMAIN, {})
+    if entry_id is None:
+        return coordinators
+    if entry_id not in coordinators:
+        raise ServiceValidationError(f"No loaded account with id {entry_id}")
+    return {entry_id: coordinators[entry_id]}
+
+
+def _find_home_ids(
+    coordinator: CleverTouchUpdateCoordinator, home: str | None
+) -> list[str]:
+    """Return the ids of the homes of an account, or of a home by id or label."""
+    return [
+        home_id
+        for home_id, account_home in coordinator.homes.items()
+        if home is None
+        or home == home_id
+        or home.casefold() == account_home.info.label.casefold()
+    ]
+
+
+def _find_radiators(
+    coordinator: CleverTouchUpdateCoordinator, home: str | None, zone: str | None
+) -> list[Radiator]:
+    """Return the radiators of a home, by id or label, and zone, by label."""
+    return [
+        device
+        for home_id in _find_home_ids(coordinator, home)
+        for device in coordinator.homes[home_id].devices.values()
+        if isinstance(device, Radiator)
+        and (zone is None or device.zone.label.casefold() == zone.casefold())
+    ]
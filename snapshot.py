@@ -0,0 +1,136 @@
+"""Snapshots of the values of CleverTouch devices."""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Mapping
+from types import MappingProxyType
+from typing import Any, NoReturn, Optional
+
+from clevertouch.devices import Device, OnOffDevice, Radiator
+from clevertouch.devices.radiator import TempType
+
+from .const import TEMP_NATIVE_UNIT
+
+# Fields of temperatures are named after the temperature, e.g. temp_comfort
+TEMP_FIELD_PREFIX = "temp_"
+
+# Fields counting down in the cloud, which polled data never reports as written
+COUNTDOWN_FIELDS = frozenset({"boost_remaining"})
+
+_EMPTY: Mapping[str, Optional[float]] = MappingProxyType({})
+
+
+class DeviceSnapshot:
+    """Immutable values of a device, as shown by its entities.
+
+    Snapshots are built once per update of a device, so that entities do not
+    convert and round the values of the library again on every state write.
+    Snapshots with the same values compare equal, to detect unchanged devices.
+    """
+
+    __slots__ = (
+        "heat_mode",
+        "active",
+        "temperatures",
+        "boost_time",
+        "boost_remaining",
+        "is_on",
+    )
+
+    heat_mode: Optional[str]
+    active: Optional[bool]
+    temperatures: Mapping[str, Optional[float]]
+    boost_time: Optional[int]
+    boost_remaining: Optional[int]
+    is_on: Optional[bool]
+
+    def __init__(
+        self, device: Device, overlay: Optional[Mapping[str, Any]] = None
+    ) -> None:
+        """Initialize the snapshot from the current values of a device.
+
+        Values of the overlay, by field, replace those of the device.
+        """
+        values: dict[str, Any] = dict.fromkeys(self.__slots__)
+        values["temperatures"] = _EMPTY
+        if isinstance(device, Radiator):
+            values["heat_mode"] = device.heat_mode
+            values["active"] = device.active
+            values["temperatures"] = MappingProxyType(
+                {
+                    name: _round(temp.as_unit(TEMP_NATIVE_UNIT))
+                    for name, temp in device.temperatures.items()
+                }
+            )
+            values["boost_time"] = device.boost_time
+            values["boost_remaining"] = device.boost_remaining
+        elif isinstance(device, OnOffDevice):
+            values["is_on"] = device.is_on
+
+        if overlay:
+            temperatures = dict(values["temperatures"])
+            for field, value in overlay.items():
+                if field.startswith(TEMP_FIELD_PREFIX):
+                    temperatures[field.removeprefix(TEMP_FIELD_PREFIX)] = _round(value)
+                else:
+                    values[field] = value
+            values["temperatures"] = MappingProxyType(temperatures)
+
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+
+    def get(self, field: str) -> Any:
+        """Return the value of a field, e.g. heat_mode or temp_comfort."""
+        if field.startswith(TEMP_FIELD_PREFIX):
+            return self.temperatures.get(field.removeprefix(TEMP_FIELD_PREFIX))
+        return getattr(self, field)
+
+    def _values(self) -> tuple[Any, ...]:
+        return tuple(
+            (
+                tuple(self.temperatures.items())
+                if name == "temperatures"
+                else getattr(self, name)
+            )
+            for name in self.__slots__
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, DeviceSnapshot):
+            return NotImplemented
+        return self._values() == other._values()
+
+    def __hash__(self) -> int:
+        return hash(self._values())
+
+    def __setattr__(self, name: str, value: Any) -> NoReturn:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name: str) -> NoReturn:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+
+# Reads the value of a field from a snapshot, e.g. to compare it to a written value
+type SnapshotReader = Callable[[DeviceSnapshot], Any]
+
+
+def _round(temp: Optional[float]) -> Optional[float]:
+    return round(temp, 1) if isinstance(temp, float) else temp
+
+
+def normalize(field: str, value: Any) -> Any:
+    """Return a value of a field as held by snapshots."""
+    return _round(value) if field.startswith(TEMP_FIELD_PREFIX) else value
+
+
+def temperature_fields(
+    radiator: Radiator, temp_name: str, value: float
+) -> dict[str, float]:
+    """Return the fields changed by setting a temperature of a radiator.
+
+    The target temperature follows the temperature of the current heat mode.
+    """
+    fields = {f"{TEMP_FIELD_PREFIX}{temp_name}": value}
+    if temp_name == radiator.temp_type:
+        fields[f"{TEMP_FIELD_PREFIX}{TempType.TARGET}"] = value
+    return fields
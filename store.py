@@ -0,0 +1,92 @@
+"""Persistent storage of the CleverTouch home and device topology."""
+
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from clevertouch import Home
+
+from .const import DOMAIN
+
+STORAGE_VERSION = 1
+SAVE_DELAY_SECONDS = 10
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def topology_signature(homes: dict[str, Home]) -> tuple:
+    """Return a hashable summary of the homes, zones and devices.
+
+    Only the parts that affect which devices and entities are created are
+    included, so that changing temperatures or modes do not alter it.
+    """
+    return tuple(
+        (
+            home_id,
+            home.info.label,
+            tuple(
+                sorted(
+                    (
+                        device.device_id,
+                        device.device_type,
+                        device.label,
+                        device.zone.label,
+                    )
+                    for device in home.devices.values()
+                )
+            ),
+        )
+        for home_id, home in sorted(homes.items())
+    )
+
+
+class TopologyStore:
+    """Store the last known home payloads of a config entry on disk.
+
+    The payloads are saved in the same shape as returned by the cloud API,
+    which allows the homes and devices to be rebuilt by the library itself
+    when Home Assistant starts, without waiting for the cloud.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the store."""
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}"
+        )
+        self._signature: tuple | None = None
+
+    async def async_load(self) -> dict[str, dict[str, Any]]:
+        """Load the stored home payloads, keyed by home id."""
+        try:
+            data = await self._store.async_load()
+        except Exception as ex:  # pylint: disable=broad-except
+            _LOGGER.warning("Could not load stored topology: %s", ex)
+            return {}
+        if not data:
+            return {}
+        return data.get("homes") or {}
+
+    def async_save_if_changed(
+        self, homes: dict[str, Home], payloads: dict[str, dict[str, Any]]
+    ) -> None:
+        """Schedule a save of the payloads if the topology has changed."""
+        signature = topology_signature(homes)
+        if signature == self._signature:
+            return
+        _LOGGER.debug("Topology changed, saving %d homes", len(payloads))
+        self._signature = signature
+        self._store.async_delay_save(
+            lambda: {"homes": dict(payloads)}, SAVE_DELAY_SECONDS
+        )
+
+    def set_loaded(self, homes: dict[str, Home]) -> None:
+        """Register the topology that was just restored from disk."""
+        self._signature = topology_signature(homes)
+
+    async def async_remove(self) -> None:
+        """Remove the stored topology."""
+        await self._store.async_remove()
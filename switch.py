@@ -14,7 +14,7 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from clevertouch.devices import OnOffDevice, DeviceType
+from clevertouch.devices import Device, OnOffDevice, DeviceType
 
 from .const import (
     DOMAIN,
@@ -30,14 +30,12 @@ async def async_setup_entry(
     """Set up CleverTouch number entities."""
     coordinator: CleverTouchUpdateCoordinator = hass.data[DOMAIN].get(entry.entry_id)
 
-    entities = [
-        CleverTouchSwitchEntity(coordinator, device)
-        for home in coordinator.homes.values()
-        for device in home.devices.values()
-        if isinstance(device, OnOffDevice)
-    ]
+    def _create_entities(device: Device) -> list[SwitchEntity]:
+        if isinstance(device, OnOffDevice):
+            return [CleverTouchSwitchEntity(coordinator, device)]
+        return []
 
-    async_add_entities(entities)
+    coordinator.async_add_device_entities(async_add_entities, _create_entities)
 
 
 class CleverTouchSwitchEntity(CleverTouchEntity, SwitchEntity):
@@ -63,18 +61,27 @@ class CleverTouchSwitchEntity(CleverTouchEntity, SwitchEntity):
             key=device_class,
         )
 
+    def _state_values(self) -> Any:
+        return self.snapshot.is_on
+
     @property
     def is_on(self) -> Optional[bool]:
-        return self._switch.is_on
+        return self.snapshot.is_on
 
     async def async_turn_on(self, **kwargs: Any) -> None:
         if self.is_on:
             return
-        await self._switch.set_onoff_state(True)
-        await self.coordinator.async_request_delayed_refresh()
+        await self.coordinator.async_run_write(
+            self._switch,
+            self._switch.set_onoff_state(True),
+            optimistic={"is_on": True},
+        )
 
     async def async_turn_off(self, **kwargs: Any) -> None:
         if not self.is_on:
             return
-        await self._switch.set_onoff_state(False)
-        await self.coordinator.async_request_delayed_refresh()
+        await self.coordinator.async_run_write(
+            self._switch,
+            self._switch.set_onoff_state(False),
+            optimistic={"is_on": False},
+        )
@@ -0,0 +1,115 @@
+"""Helpers running the CleverTouch integration against the fake cloud."""
+
+from __future__ import annotations
+
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any
+from unittest.mock import patch
+
+from homeassistant import auth, bootstrap, config_entries, core, loader
+from homeassistant.const import CONF_MODEL, CONF_TOKEN, CONF_USERNAME
+from homeassistant.helpers import entity_registry
+
+from custom_components.clevertouch.benchmarks.fake_cloud import (
+    FakeCloud,
+    FakeCloudConfig,
+)
+from custom_components.clevertouch.const import DOMAIN
+from custom_components.clevertouch.coordinator import CleverTouchUpdateCoordinator
+
+MODEL_ID = "purmo"
+
+
+@dataclass
+class Integration:
+    """The integration set up against the fake cloud."""
+
+    hass: core.HomeAssistant
+    entry: config_entries.ConfigEntry
+    cloud: FakeCloud
+
+    @property
+    def coordinator(self) -> CleverTouchUpdateCoordinator:
+        """Return the coordinator of the config entry."""
+        return self.hass.data[DOMAIN][self.entry.entry_id]
+
+    def entity_id(self, platform: str, device_id: str, key: str) -> str:
+        """Return the id of the entity of a device."""
+        entity_id = entity_registry.async_get(self.hass).async_get_entity_id(
+            platform, DOMAIN, f"{MODEL_ID}_{device_id}_{key}"
+        )
+        assert entity_id is not None
+        return entity_id
+
+    def cloud_device(self, device_id: str, home_id: str = "home0") -> dict[str, Any]:
+        """Return the data of a device held by the fake cloud."""
+        return next(
+            device
+            for device in self.cloud.homes[home_id]["devices"]
+            if device["id"] == device_id
+        )
+
+    async def async_reload(self) -> None:
+        """Reload the config entry, restoring the stored topology."""
+        await self.hass.config_entries.async_reload(self.entry.entry_id)
+        await self.hass.async_block_till_done()
+
+
+@asynccontextmanager
+async def async_run_integration(
+    config_dir: str,
+    cloud_config: FakeCloudConfig | None = None,
+    options: dict[str, Any] | None = None,
+) -> AsyncIterator[Integration]:
+    """Set up Home Assistant and the integration against a fake cloud.
+
+    The fake cloud answers instantly and its devices do not drift, unless
+    configured otherwise. The config directory must contain the integration
+    below custom_components.
+    """
+    cloud = FakeCloud(
+        cloud_config
+        or FakeCloudConfig(
+            radiators=2, outlets=1, latency=0.0, jitter=0.0, change_rate=0.0
+        )
+    )
+    await cloud.async_start()
+
+    hass = core.HomeAssistant(config_dir)
+    loader.async_setup(hass)
+    hass.config_entries = config_entries.ConfigEntries(hass, {})
+    await bootstrap.async_load_base_functionality(hass)
+    hass.auth = await auth.auth_manager_from_config(hass, [], [])
+    await hass.async_start()
+
+    entry = config_entries.ConfigEntry(
+        data={
+            CONF_USERNAME: "test@example.com",
+            CONF_TOKEN: "test-refresh-token",
+            CONF_MODEL: MODEL_ID,
+        },
+        discovery_keys=MappingProxyType({}),
+        domain=DOMAIN,
+        minor_version=1,
+        options=options or {},
+        source=config_entries.SOURCE_USER,
+        subentries_data=None,
+        title="Test",
+        unique_id="test@example.com",
+        version=1,
+    )
+    try:
+        with patch(
+            "custom_components.clevertouch.async_create_clientsession",
+            side_effect=lambda hass, **kwargs: cloud.create_session(**kwargs),
+        ):
+            await hass.config_entries.async_add(entry)
+            await hass.async_block_till_done()
+            yield Integration(hass, entry, cloud)
+            await hass.config_entries.async_unload(entry.entry_id)
+    finally:
+        await hass.async_stop(force=True)
+        await cloud.async_stop()
@@ -0,0 +1,91 @@
+"""Fixtures for the tests of the CleverTouch integration.
+
+The integration is linked into a temporary directory as a custom component,
+like the benchmarks do, so that its relative imports resolve. Coroutine tests
+are run in an event loop of their own.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+import inspect
+import json
+from pathlib import Path
+import sys
+import tempfile
+from typing import Any
+
+from clevertouch.devices import Radiator
+from clevertouch.info import HomeInfo
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+DOMAIN = json.loads((ROOT / "manifest.json").read_text())["domain"]
+
+_config_dir = tempfile.TemporaryDirectory()
+_components = Path(_config_dir.name) / "custom_components"
+_components.mkdir()
+(_components / DOMAIN).symlink_to(ROOT, target_is_directory=True)
+sys.path.insert(0, _config_dir.name)
+
+
+def pytest_unconfigure(config: pytest.Config) -> None:
+    """Remove the temporary custom components directory."""
+    _config_dir.cleanup()
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_pyfunc_call(pyfuncitem: pytest.Function) -> bool | None:
+    """Run coroutine tests in a new event loop."""
+    if not inspect.iscoroutinefunction(pyfuncitem.obj):
+        return None
+    arguments = {
+        name: pyfuncitem.funcargs[name] for name in pyfuncitem._fixtureinfo.argnames
+    }
+    asyncio.run(pyfuncitem.obj(**arguments))
+    return True
+
+
+@pytest.fixture
+def config_dir(tmp_path: Path) -> str:
+    """Return a Home Assistant config directory holding the integration."""
+    (tmp_path / "custom_components").symlink_to(_components, target_is_directory=True)
+    return str(tmp_path)
+
+
+@pytest.fixture
+def make_radiator() -> Callable[..., Radiator]:
+    """Return a factory of radiators, from API data overriding the defaults."""
+
+    def _make_radiator(**data: Any) -> Radiator:
+        return Radiator(
+            None,
+            HomeInfo(
+                data={
+                    "smarthome_id": "home0",
+                    "label": "Home 0",
+                    "zones": [{"num_zone": "1", "zone_label": "Zone 1"}],
+                }
+            ),
+            {
+                "id": "0-C0",
+                "id_device": "C000",
+                "label_interface": "Radiator 0",
+                "num_zone": "1",
+                "gv_mode": "0",
+                "nv_mode": "0",
+                "heating_up": "0",
+                "consigne_confort": "698",
+                "consigne_eco": "644",
+                "consigne_hg": "446",
+                "consigne_boost": "752",
+                "consigne_manuel": "698",
+                "temperature_air": "680",
+                "time_boost": "3600",
+                "time_boost_format_chrono": {"d": "0", "h": "0", "m": "0", "s": "0"},
+            }
+            | data,
+        )
+
+    return _make_radiator
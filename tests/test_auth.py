@@ -0,0 +1,47 @@
+"""Tests of the token handling for the CleverTouch cloud API."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from unittest.mock import patch
+
+from homeassistant.const import CONF_TOKEN
+
+from custom_components.clevertouch.const import TOKEN_REFRESH_MARGIN_SECONDS
+
+from common import async_run_integration
+
+
+async def test_concurrent_callers_share_a_token_refresh(config_dir: str) -> None:
+    """Requests waiting for a new access token share a single exchange."""
+    async with async_run_integration(config_dir) as integration:
+        coordinator = integration.coordinator
+        coordinator.account.api.expires_at = time.time()
+        integration.cloud.stats.reset()
+
+        await asyncio.gather(
+            *(coordinator.tokens.async_ensure_valid() for _ in range(5))
+        )
+        assert integration.cloud.stats.requests["token"] == 1
+        assert coordinator.tokens.expires_in > TOKEN_REFRESH_MARGIN_SECONDS
+
+
+async def test_token_is_refreshed_ahead_of_expiry(config_dir: str) -> None:
+    """The access token is refreshed in the background, and saved once rotated."""
+    with patch("custom_components.clevertouch.auth.TOKEN_SAVE_DELAY_SECONDS", 0):
+        async with async_run_integration(config_dir) as integration:
+            hass = integration.hass
+            tokens = integration.coordinator.tokens
+            api = integration.coordinator.account.api
+            refresh_token = api.refresh_token
+            api.expires_at = time.time() + 0.5
+            tokens.async_schedule_refresh()
+            integration.cloud.stats.reset()
+
+            await asyncio.sleep(0.5)
+            await hass.async_block_till_done()
+            assert integration.cloud.stats.requests["token"] == 1
+            assert tokens.expires_in > TOKEN_REFRESH_MARGIN_SECONDS
+            assert api.refresh_token != refresh_token
+            assert integration.entry.data[CONF_TOKEN] == api.refresh_token
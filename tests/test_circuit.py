@@ -0,0 +1,108 @@
+"""Tests of the circuit breaking of requests to the CleverTouch cloud API."""
+
+from __future__ import annotations
+
+from clevertouch import ApiConnectError
+import pytest
+
+from custom_components.clevertouch import circuit
+from custom_components.clevertouch.circuit import (
+    DATA_CIRCUIT_BREAKERS,
+    CircuitOpenError,
+    CircuitState,
+    HostCircuitBreaker,
+)
+from custom_components.clevertouch.const import CIRCUIT_FAILURE_THRESHOLD, MODELS
+
+from common import async_run_integration
+
+HOST = "e3.extranet.test"
+
+
+class FakeClock:
+    """Monotonic clock advanced by the tests."""
+
+    def __init__(self) -> None:
+        """Initialize the clock."""
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        """Return the current time."""
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> FakeClock:
+    """Replace the clock of the circuit breakers."""
+    clock = FakeClock()
+    monkeypatch.setattr(circuit, "time", clock)
+    return clock
+
+
+def test_opens_after_consecutive_failures(clock: FakeClock) -> None:
+    """Only consecutive failures up to the threshold open the circuit."""
+    breaker = HostCircuitBreaker(HOST, failure_threshold=3, reset_timeout=60)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state is CircuitState.CLOSED
+    breaker.acquire()
+
+    breaker.record_failure()
+    assert breaker.state is CircuitState.OPEN
+    clock.now += 20
+    assert breaker.retry_in == 40
+    with pytest.raises(CircuitOpenError):
+        breaker.acquire()
+
+
+def test_half_open_lets_a_single_probe_through(clock: FakeClock) -> None:
+    """Once the reset timeout has passed, one probe decides the state."""
+    breaker = HostCircuitBreaker(HOST, failure_threshold=1, reset_timeout=60)
+    breaker.record_failure()
+    clock.now += 60
+    assert breaker.state is CircuitState.HALF_OPEN
+
+    breaker.acquire()
+    with pytest.raises(CircuitOpenError):
+        breaker.acquire()
+
+    breaker.release()
+    breaker.acquire()
+    breaker.record_success()
+    assert breaker.state is CircuitState.CLOSED
+    assert breaker.retry_in == 0
+
+
+def test_failed_probe_opens_the_circuit_again(clock: FakeClock) -> None:
+    """A failed probe opens the circuit, regardless of the threshold."""
+    breaker = HostCircuitBreaker(HOST, failure_threshold=3, reset_timeout=60)
+    for _ in range(3):
+        breaker.record_failure()
+    clock.now += 60
+    breaker.acquire()
+
+    breaker.record_failure()
+    assert breaker.state is CircuitState.OPEN
+    assert breaker.retry_in == 60
+
+
+async def test_rejected_requests_spend_no_tokens(config_dir: str) -> None:
+    """Requests rejected by the open circuit do not reach the rate limiter."""
+    async with async_run_integration(config_dir) as integration:
+        coordinator = integration.coordinator
+        metrics = coordinator.metrics
+        breaker = integration.hass.data[DATA_CIRCUIT_BREAKERS][MODELS["purmo"].url]
+        for _ in range(CIRCUIT_FAILURE_THRESHOLD):
+            breaker.record_failure()
+        assert breaker.state is CircuitState.OPEN
+
+        integration.cloud.stats.reset()
+        waits = metrics.rate_limit_waits.count
+        with pytest.raises(ApiConnectError):
+            await coordinator.account.api.read_user_data()
+        assert metrics.circuit_rejections == 1
+        assert metrics.rate_limit_waits.count == waits
+        assert integration.cloud.stats.total == 0
@@ -0,0 +1,50 @@
+"""Tests of the config flow of the CleverTouch integration."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.const import CONF_SCAN_INTERVAL
+import pytest
+
+from custom_components.clevertouch.config_flow import OPTIONS_SCHEMA, validate_options
+from custom_components.clevertouch.const import (
+    CONF_CONNECT_TIMEOUT,
+    CONF_MAX_BACKOFF,
+    CONF_MIN_BACKOFF,
+    CONF_QUICK_SCAN_INTERVAL,
+    CONF_READ_TIMEOUT,
+    CONF_WRITE_TIMEOUT,
+)
+
+
+def test_default_options_are_valid() -> None:
+    """The default options are valid together."""
+    assert validate_options(OPTIONS_SCHEMA({})) == {}
+
+
+@pytest.mark.parametrize(
+    ("changes", "errors"),
+    [
+        (
+            {CONF_SCAN_INTERVAL: 60, CONF_QUICK_SCAN_INTERVAL: 60},
+            {CONF_QUICK_SCAN_INTERVAL: "quick_scan_interval_too_long"},
+        ),
+        (
+            {CONF_MIN_BACKOFF: 600, CONF_MAX_BACKOFF: 300},
+            {CONF_MAX_BACKOFF: "max_backoff_too_short"},
+        ),
+        (
+            {CONF_CONNECT_TIMEOUT: 20, CONF_READ_TIMEOUT: 10},
+            {
+                CONF_READ_TIMEOUT: "timeout_shorter_than_connect",
+                CONF_WRITE_TIMEOUT: "timeout_shorter_than_connect",
+            },
+        ),
+        ({CONF_MIN_BACKOFF: 300, CONF_MAX_BACKOFF: 300}, {}),
+        ({CONF_CONNECT_TIMEOUT: 15, CONF_WRITE_TIMEOUT: 15}, {}),
+    ],
+)
+def test_inconsistent_options(changes: dict[str, Any], errors: dict[str, str]) -> None:
+    """Options valid alone but not together are reported."""
+    assert validate_options(OPTIONS_SCHEMA(changes)) == errors
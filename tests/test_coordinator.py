@@ -0,0 +1,206 @@
+"""Tests of the refreshes of the CleverTouch coordinator."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+from unittest.mock import patch
+
+from clevertouch import ApiConnectError
+from homeassistant.const import STATE_UNAVAILABLE
+import pytest
+
+from custom_components.clevertouch.benchmarks.fake_cloud import FakeCloudConfig
+from custom_components.clevertouch.const import (
+    CONF_MAX_CONCURRENT_REFRESHES,
+    CONF_PER_HOME_UPDATES,
+    CONF_QUICK_SCAN_COUNT,
+    CONF_QUICK_SCAN_INTERVAL,
+)
+from custom_components.clevertouch.coordinator import CleverTouchUpdateCoordinator
+
+from common import Integration, async_run_integration
+
+QUICK_SCAN_INTERVAL = 0.05
+
+
+@pytest.fixture(autouse=True)
+def short_debounce():
+    """Flush writes right away."""
+    with patch(
+        "custom_components.clevertouch.coordinator.WRITE_DEBOUNCE_SECONDS", 0.01
+    ):
+        yield
+
+
+def _record_home_reads(coordinator: CleverTouchUpdateCoordinator) -> list[str]:
+    """Return the list the ids of the homes read from now on are added to."""
+    api = coordinator.account.api
+    read_home_data = api.read_home_data
+    home_ids: list[str] = []
+
+    async def _read_home_data(home_id: str) -> dict[str, Any]:
+        home_ids.append(home_id)
+        return await read_home_data(home_id)
+
+    api.read_home_data = _read_home_data
+    return home_ids
+
+
+async def _async_set_preset_mode(
+    integration: Integration, device_id: str, preset_mode: str
+) -> None:
+    await integration.hass.services.async_call(
+        "climate",
+        "set_preset_mode",
+        {
+            "entity_id": integration.entity_id("climate", device_id, "radiator"),
+            "preset_mode": preset_mode,
+        },
+        blocking=True,
+    )
+
+
+async def _async_wait_for_quick_updates(
+    coordinator: CleverTouchUpdateCoordinator,
+) -> None:
+    """Wait until the coordinator goes back to regular updates."""
+    async with asyncio.timeout(5):
+        while coordinator.scheduler_state == "quick":
+            await asyncio.sleep(0.01)
+
+
+async def test_concurrent_home_refreshes(config_dir: str) -> None:
+    """Homes are fetched in parallel, up to the configured number."""
+    async with async_run_integration(
+        config_dir,
+        FakeCloudConfig(homes=4, radiators=1, outlets=0, latency=0.02, jitter=0.0),
+        options={CONF_MAX_CONCURRENT_REFRESHES: 1},
+    ) as integration:
+        coordinator = integration.coordinator
+        api = coordinator.account.api
+        read_home_data = api.read_home_data
+        running = 0
+        most_running = 0
+
+        async def _read_home_data(home_id: str) -> dict[str, Any]:
+            nonlocal running, most_running
+            running += 1
+            most_running = max(most_running, running)
+            try:
+                return await read_home_data(home_id)
+            finally:
+                running -= 1
+
+        api.read_home_data = _read_home_data
+        await coordinator.async_refresh()
+        assert most_running == 1
+
+        integration.hass.config_entries.async_update_entry(
+            integration.entry, options={CONF_MAX_CONCURRENT_REFRESHES: 3}
+        )
+        await integration.hass.async_block_till_done()
+        assert integration.coordinator is coordinator
+
+        most_running = 0
+        await coordinator.async_refresh()
+        assert most_running == 3
+        assert coordinator.last_update_success
+
+
+async def test_quick_updates_refresh_written_homes(config_dir: str) -> None:
+    """Quick updates only read the homes written to, regular updates all."""
+    async with async_run_integration(
+        config_dir,
+        FakeCloudConfig(homes=3, radiators=1, outlets=0, latency=0.0, jitter=0.0),
+        options={CONF_QUICK_SCAN_INTERVAL: QUICK_SCAN_INTERVAL},
+    ) as integration:
+        coordinator = integration.coordinator
+        home_ids = _record_home_reads(coordinator)
+
+        await _async_set_preset_mode(integration, "1-C0", "Eco")
+        await _async_wait_for_quick_updates(coordinator)
+        assert home_ids == ["home1"]
+
+        home_ids.clear()
+        await coordinator.async_refresh()
+        assert sorted(home_ids) == ["home0", "home1", "home2"]
+
+
+async def test_quick_updates_end_once_confirmed(config_dir: str) -> None:
+    """Quick updates end with the first update confirming the write."""
+    async with async_run_integration(
+        config_dir,
+        options={
+            CONF_QUICK_SCAN_INTERVAL: QUICK_SCAN_INTERVAL,
+            CONF_QUICK_SCAN_COUNT: 5,
+        },
+    ) as integration:
+        integration.cloud.stats.reset()
+        await _async_set_preset_mode(integration, "0-C0", "Eco")
+        await _async_wait_for_quick_updates(integration.coordinator)
+        assert integration.cloud.stats.requests["smarthome/read"] == 1
+
+
+async def test_home_coordinators_isolate_failures(config_dir: str) -> None:
+    """A home failing to refresh only affects its own entities and schedule."""
+    async with async_run_integration(
+        config_dir,
+        FakeCloudConfig(homes=2, radiators=1, outlets=0, latency=0.0, jitter=0.0),
+        options={CONF_PER_HOME_UPDATES: True},
+    ) as integration:
+        hass = integration.hass
+        coordinator = integration.coordinator
+        api = coordinator.account.api
+        read_home_data = api.read_home_data
+
+        async def _read_home_data(home_id: str) -> dict[str, Any]:
+            if home_id == "home1":
+                raise ApiConnectError("Connection reset")
+            return await read_home_data(home_id)
+
+        api.read_home_data = _read_home_data
+        for home_id in ("home0", "home1"):
+            await coordinator.get_home_coordinator(home_id).async_refresh()
+        await hass.async_block_till_done()
+
+        home0 = coordinator.get_home_coordinator("home0")
+        home1 = coordinator.get_home_coordinator("home1")
+        assert coordinator.last_update_success
+        assert home0.last_update_success
+        assert home0.scheduler_state == "standard"
+        assert not home1.last_update_success
+        assert home1.scheduler_state == "backing_off"
+
+        state = hass.states.get(integration.entity_id("climate", "0-C0", "radiator"))
+        assert state.state != STATE_UNAVAILABLE
+        state = hass.states.get(integration.entity_id("climate", "1-C0", "radiator"))
+        assert state.state == STATE_UNAVAILABLE
+
+
+async def test_slow_homes_are_parsed_in_an_executor(config_dir: str) -> None:
+    """Homes stalling the event loop are parsed in an executor from then on."""
+    with patch(
+        "custom_components.clevertouch.coordinator.LOOP_STALL_THRESHOLD_SECONDS", 0
+    ):
+        async with async_run_integration(config_dir) as integration:
+            hass = integration.hass
+            coordinator = integration.coordinator
+            assert coordinator.offloaded_homes == {"home0"}
+            assert coordinator.metrics.offloaded_parses == 0
+            device = coordinator.homes["home0"].devices["0-C0"]
+
+            cloud_device = integration.cloud_device("0-C0")
+            cloud_device["gv_mode"] = "3"
+            cloud_device["temperature_air"] = "680"
+            await coordinator.async_refresh()
+            await hass.async_block_till_done()
+
+            assert coordinator.metrics.offloaded_parses == 1
+            # Entities hold on to the devices, which are updated in place
+            assert coordinator.homes["home0"].devices["0-C0"] is device
+            state = hass.states.get(
+                integration.entity_id("climate", "0-C0", "radiator")
+            )
+            assert state.attributes["preset_mode"] == "Eco"
+            assert state.attributes["current_temperature"] == 20.0
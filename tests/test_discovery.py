@@ -0,0 +1,74 @@
+"""Tests of the discovery of CleverTouch homes and devices."""
+
+from __future__ import annotations
+
+import copy
+from unittest.mock import patch
+
+from homeassistant.helpers import device_registry, entity_registry
+
+from custom_components.clevertouch.const import DOMAIN
+
+from common import Integration, async_run_integration
+
+
+def _registered_device_ids(integration: Integration) -> set[str]:
+    """Return the ids of the devices with entities in the entity registry."""
+    entries = entity_registry.async_entries_for_config_entry(
+        entity_registry.async_get(integration.hass), integration.entry.entry_id
+    )
+    # Entities of devices, rather than of the account, e.g. purmo_0-C0_radiator
+    return {
+        device_id
+        for entry in entries
+        if "-" in (device_id := entry.unique_id.split("_")[1])
+    }
+
+
+async def test_devices_are_added_and_removed(config_dir: str) -> None:
+    """Devices added or removed on the controller are picked up by a refresh."""
+    async with async_run_integration(config_dir) as integration:
+        hass = integration.hass
+        entity_id = integration.entity_id("climate", "0-C0", "radiator")
+        state = hass.states.get(entity_id)
+        assert _registered_device_ids(integration) == {"0-C0", "0-C1", "0-O0"}
+
+        devices = integration.cloud.homes["home0"]["devices"]
+        radiator = copy.deepcopy(integration.cloud_device("0-C1"))
+        radiator.update(id="0-C2", id_device="C002", label_interface="Radiator 2")
+        devices.append(radiator)
+        devices.remove(integration.cloud_device("0-O0"))
+
+        await integration.coordinator.async_refresh()
+        await hass.async_block_till_done()
+
+        assert _registered_device_ids(integration) == {"0-C0", "0-C1", "0-C2"}
+        assert hass.states.get(integration.entity_id("climate", "0-C2", "radiator"))
+        assert not device_registry.async_get(hass).async_get_device(
+            identifiers={(DOMAIN, integration.coordinator.get_unique_device_id("0-O0"))}
+        )
+        # Entities of the other devices keep running
+        assert hass.states.get(entity_id).last_updated == state.last_updated
+
+
+async def test_homes_are_added_and_removed(config_dir: str) -> None:
+    """Homes added to or removed from the account are picked up by discovery."""
+    with patch(
+        "custom_components.clevertouch.coordinator.DISCOVERY_INTERVAL_SECONDS", 0
+    ):
+        async with async_run_integration(config_dir) as integration:
+            hass = integration.hass
+            cloud = integration.cloud
+            coordinator = integration.coordinator
+
+            cloud.homes["home1"] = cloud._make_home(1)  # noqa: SLF001
+            await coordinator.async_refresh()
+            await hass.async_block_till_done()
+            assert "home1" in coordinator.homes
+            assert "1-C0" in _registered_device_ids(integration)
+
+            del cloud.homes["home0"]
+            await coordinator.async_refresh()
+            await hass.async_block_till_done()
+            assert list(coordinator.homes) == ["home1"]
+            assert _registered_device_ids(integration) == {"1-C0", "1-C1", "1-O0"}
@@ -0,0 +1,94 @@
+"""Tests of the entities of CleverTouch devices."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime
+
+from homeassistant.const import STATE_UNAVAILABLE
+from homeassistant.helpers import entity_registry
+import pytest
+
+from custom_components.clevertouch.const import CONF_MAX_STALENESS
+from custom_components.clevertouch.coordinator import ATTR_DATA_UPDATED_AT
+
+from common import Integration, async_run_integration
+
+STALENESS_SECONDS = 1.0
+
+
+def _last_reported(integration: Integration, device_id: str) -> dict[str, datetime]:
+    """Return when the state of each entity of a device was last written."""
+    entries = entity_registry.async_entries_for_config_entry(
+        entity_registry.async_get(integration.hass), integration.entry.entry_id
+    )
+    return {
+        entry.entity_id: integration.hass.states.get(entry.entity_id).last_reported
+        for entry in entries
+        if entry.unique_id.startswith(f"purmo_{device_id}_")
+    }
+
+
+async def test_states_are_written_for_changed_devices(config_dir: str) -> None:
+    """Refreshes only write the states of the entities whose values changed."""
+    async with async_run_integration(config_dir) as integration:
+        hass = integration.hass
+        coordinator = integration.coordinator
+        device_ids = ("0-C0", "0-C1", "0-O0")
+        written = {
+            device_id: _last_reported(integration, device_id)
+            for device_id in device_ids
+        }
+        assert all(written.values())
+
+        await coordinator.async_refresh()
+        await hass.async_block_till_done()
+        for device_id in device_ids:
+            assert _last_reported(integration, device_id) == written[device_id]
+
+        device = integration.cloud_device("0-C0")
+        device["temperature_air"] = str(int(device["temperature_air"]) + 18)
+        await coordinator.async_refresh()
+        await hass.async_block_till_done()
+
+        climate_id = integration.entity_id("climate", "0-C0", "radiator")
+        assert (
+            _last_reported(integration, "0-C0")[climate_id]
+            > written["0-C0"][climate_id]
+        )
+        for device_id in ("0-C1", "0-O0"):
+            assert _last_reported(integration, device_id) == written[device_id]
+
+
+@pytest.mark.parametrize(
+    ("max_staleness", "available"), [(0, False), (STALENESS_SECONDS, True)]
+)
+async def test_last_values_are_served_on_errors(
+    config_dir: str, max_staleness: float, available: bool
+) -> None:
+    """Entities keep their values after failed refreshes, up to a limit."""
+    async with async_run_integration(
+        config_dir, options={CONF_MAX_STALENESS: max_staleness}
+    ) as integration:
+        hass = integration.hass
+        coordinator = integration.coordinator
+        entity_id = integration.entity_id("climate", "0-C0", "radiator")
+        temperature = hass.states.get(entity_id).attributes["current_temperature"]
+
+        integration.cloud.config.error_rate = 1.0
+        await coordinator.async_refresh()
+        await hass.async_block_till_done()
+        assert not coordinator.last_update_success
+
+        state = hass.states.get(entity_id)
+        assert (state.state != STATE_UNAVAILABLE) is available
+        if available:
+            assert state.attributes["current_temperature"] == temperature
+            assert state.attributes[ATTR_DATA_UPDATED_AT] == (
+                coordinator.home_updated_at["home0"].isoformat()
+            )
+
+            # The entities are notified once the limit has passed
+            await asyncio.sleep(STALENESS_SECONDS + 0.1)
+            await hass.async_block_till_done()
+            assert hass.states.get(entity_id).state == STATE_UNAVAILABLE
@@ -0,0 +1,43 @@
+"""Tests of the setup of the CleverTouch integration."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import timedelta
+from unittest.mock import patch
+
+from homeassistant.const import STATE_UNAVAILABLE
+
+from common import async_run_integration
+
+
+async def test_restored_topology_is_refreshed_soon(config_dir: str) -> None:
+    """Restored entities are available within seconds, polls stay staggered."""
+    with (
+        patch("custom_components.clevertouch.store.SAVE_DELAY_SECONDS", 0),
+        patch(
+            "custom_components.clevertouch.coordinator.RESTORED_REFRESH_SPREAD_SECONDS",
+            0.1,
+        ),
+    ):
+        async with async_run_integration(config_dir) as integration:
+            hass = integration.hass
+            entity_id = integration.entity_id("climate", "0-C0", "radiator")
+            await hass.async_block_till_done()
+
+            integration.cloud.stats.reset()
+            await integration.async_reload()
+            assert integration.cloud.stats.total == 0
+            assert hass.states.get(entity_id).state == STATE_UNAVAILABLE
+
+            await asyncio.sleep(0.2)
+            await hass.async_block_till_done()
+            assert hass.states.get(entity_id).state != STATE_UNAVAILABLE
+            assert integration.cloud.stats.requests["smarthome/read"] == 1
+
+            coordinator = integration.coordinator
+            assert (
+                timedelta(seconds=15)
+                <= coordinator.update_interval
+                <= coordinator.scan_interval
+            )
@@ -0,0 +1,65 @@
+"""Tests of the optimistic values of CleverTouch devices."""
+
+from __future__ import annotations
+
+from custom_components.clevertouch.optimistic import OptimisticOverlay, Rollback
+from custom_components.clevertouch.snapshot import DeviceSnapshot
+
+DEVICE_ID = "0-C0"
+
+
+def test_confirmed_values_are_dropped(make_radiator) -> None:
+    """Values confirmed by polled data are no longer shown."""
+    overlay = OptimisticOverlay()
+    overlay.set(DEVICE_ID, {"heat_mode": "Eco", "temp_comfort": 21.04}, 60)
+    assert overlay.get(DEVICE_ID) == {"heat_mode": "Eco", "temp_comfort": 21.0}
+
+    assert overlay.reconcile(DEVICE_ID, DeviceSnapshot(make_radiator())) == []
+    assert overlay.get(DEVICE_ID) == {"heat_mode": "Eco"}
+
+    polled = DeviceSnapshot(make_radiator(gv_mode="3"))
+    assert overlay.reconcile(DEVICE_ID, polled) == []
+    assert DEVICE_ID not in overlay
+
+
+def test_contradicted_values_are_rolled_back(make_radiator) -> None:
+    """Values contradicted by polled data are kept until the window ends."""
+    overlay = OptimisticOverlay()
+    polled = DeviceSnapshot(make_radiator())
+
+    overlay.set(DEVICE_ID, {"heat_mode": "Eco"}, 60)
+    assert overlay.reconcile(DEVICE_ID, polled) == []
+    assert overlay.get(DEVICE_ID) == {"heat_mode": "Eco"}
+
+    overlay.set(DEVICE_ID, {"heat_mode": "Frost"}, 0)
+    assert overlay.reconcile(DEVICE_ID, polled) == [
+        Rollback("heat_mode", "Frost", "Comfort")
+    ]
+    assert DEVICE_ID not in overlay
+
+
+def test_countdown_fields_are_not_shown(make_radiator) -> None:
+    """Countdown fields are never confirmed, so they are left out."""
+    overlay = OptimisticOverlay()
+    overlay.set(DEVICE_ID, {"boost_remaining": 3600}, 0)
+    assert DEVICE_ID not in overlay
+
+    overlay.set(DEVICE_ID, {"heat_mode": "Boost", "boost_remaining": 3600}, 0)
+    assert overlay.get(DEVICE_ID) == {"heat_mode": "Boost"}
+
+    polled = DeviceSnapshot(make_radiator(gv_mode="4"))
+    assert overlay.reconcile(DEVICE_ID, polled) == []
+    assert DEVICE_ID not in overlay
+
+
+def test_discard_keeps_values_set_again() -> None:
+    """Discarding failed values keeps the fields written again since."""
+    overlay = OptimisticOverlay()
+    overlay.set(DEVICE_ID, {"heat_mode": "Eco", "temp_eco": 17.0}, 60)
+    overlay.set(DEVICE_ID, {"heat_mode": "Frost"}, 60)
+
+    overlay.discard(DEVICE_ID, {"heat_mode": "Eco", "temp_eco": 17.0})
+    assert overlay.get(DEVICE_ID) == {"heat_mode": "Frost"}
+
+    overlay.discard(DEVICE_ID, {"heat_mode": "Frost"})
+    assert DEVICE_ID not in overlay
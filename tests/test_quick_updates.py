@@ -0,0 +1,146 @@
+"""Tests of the frequency of updates of the data coordinator."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Any
+
+import pytest
+
+from custom_components.clevertouch import coordinator
+from custom_components.clevertouch.coordinator import (
+    Expectation,
+    QuickUpdatesController,
+)
+
+STANDARD = timedelta(seconds=180)
+QUICK = timedelta(seconds=15)
+MIN_BACKOFF = timedelta(seconds=60)
+MAX_BACKOFF = timedelta(seconds=1800)
+
+
+class FakeDatetime:
+    """Datetime class whose current time is advanced by the tests."""
+
+    current = datetime(2024, 1, 1)
+
+    @classmethod
+    def now(cls) -> datetime:
+        """Return the current time."""
+        return cls.current
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> type[FakeDatetime]:
+    """Replace the clock of the quick updates controller."""
+    monkeypatch.setattr(FakeDatetime, "current", datetime(2024, 1, 1))
+    monkeypatch.setattr(coordinator, "datetime", FakeDatetime)
+    return FakeDatetime
+
+
+def _controller() -> QuickUpdatesController:
+    return QuickUpdatesController(STANDARD, QUICK, 3, 10, MIN_BACKOFF, MAX_BACKOFF)
+
+
+def test_configure_standard_interval() -> None:
+    """A new regular interval is used from now on."""
+    controller = _controller()
+    assert controller.configure(STANDARD, QUICK, 3, MIN_BACKOFF, MAX_BACKOFF) == (
+        STANDARD
+    )
+
+    interval = timedelta(seconds=600)
+    configured = controller.configure(interval, QUICK, 3, MIN_BACKOFF, MAX_BACKOFF)
+    assert QUICK <= configured <= interval
+    assert controller.standard_interval == interval
+
+
+def test_configure_quick_interval() -> None:
+    """A new quick interval applies to the quick updates in progress."""
+    controller = _controller()
+    assert controller.request_quick_update()
+    assert controller.is_quick
+
+    quick = timedelta(seconds=5)
+    assert controller.configure(STANDARD, quick, 3, MIN_BACKOFF, MAX_BACKOFF) == quick
+    assert controller.is_quick
+
+
+def test_configure_clamps_backoff() -> None:
+    """The backoff in progress is kept within the new limits."""
+    controller = _controller()
+    controller.on_error()
+    assert controller.state is QuickUpdatesController.State.BACKING_OFF
+
+    max_backoff = timedelta(seconds=30)
+    min_backoff = timedelta(seconds=10)
+    assert controller.configure(STANDARD, QUICK, 3, min_backoff, max_backoff) == (
+        max_backoff
+    )
+
+    min_backoff = timedelta(seconds=3600)
+    max_backoff = timedelta(seconds=7200)
+    assert controller.configure(STANDARD, QUICK, 3, min_backoff, max_backoff) == (
+        min_backoff
+    )
+
+
+def _expect(polled: dict[str, Any], value: Any) -> dict[Any, Expectation]:
+    return {("0-C0", "heat_mode"): Expectation(value, lambda: polled["heat_mode"])}
+
+
+def test_quick_updates_end_once_confirmed(clock: type[FakeDatetime]) -> None:
+    """Quick updates end with the first update polling the written values."""
+    polled = {"heat_mode": "Comfort"}
+    controller = _controller()
+    assert controller.request_quick_update(expected=_expect(polled, "Eco"))
+
+    clock.current += QUICK
+    assert controller.on_updating() == (True, QUICK)
+    assert controller.on_success(confirm=True) == QUICK
+
+    clock.current += QUICK
+    assert controller.on_updating() == (True, QUICK)
+    polled["heat_mode"] = "Eco"
+    assert QUICK <= controller.on_success(confirm=True) <= STANDARD
+    assert not controller.is_quick
+
+
+def test_quick_updates_are_extended_until_confirmed(
+    clock: type[FakeDatetime],
+) -> None:
+    """Quick updates continue past their count while a write is not polled."""
+    polled = {"heat_mode": "Comfort"}
+    controller = _controller()
+    assert controller.request_quick_update(expected=_expect(polled, "Eco"))
+
+    # Up to the maximum count of 10 quick updates, instead of 3
+    for _ in range(9):
+        clock.current += QUICK
+        assert controller.on_updating() == (True, QUICK)
+        controller.on_success(confirm=True)
+        assert controller.is_quick
+
+    clock.current += QUICK
+    do_update, interval = controller.on_updating()
+    assert do_update and QUICK <= interval <= STANDARD
+    assert not controller.is_quick
+
+
+def test_quick_updates_without_expectations_run_all(
+    clock: type[FakeDatetime],
+) -> None:
+    """Writes of unknown values always get all their quick updates."""
+    controller = _controller()
+    assert controller.request_quick_update()
+
+    for _ in range(2):
+        clock.current += QUICK
+        assert controller.on_updating() == (True, QUICK)
+        controller.on_success(confirm=True)
+        assert controller.is_quick
+
+    clock.current += QUICK
+    do_update, interval = controller.on_updating()
+    assert do_update and QUICK <= interval <= STANDARD
+    assert not controller.is_quick
@@ -0,0 +1,52 @@
+"""Tests of the rate limiting of requests to the CleverTouch cloud API."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+from custom_components.clevertouch.const import (
+    CONF_RATE_BURST,
+    CONF_RATE_LIMIT,
+    MODELS,
+)
+from custom_components.clevertouch.ratelimit import (
+    DATA_RATE_LIMITERS,
+    HostRateLimiter,
+    Priority,
+)
+
+from common import async_run_integration
+
+HOST = "e3.extranet.test"
+
+
+async def test_configure_applies_to_queued_requests() -> None:
+    """A higher rate releases the requests already waiting sooner."""
+    limiter = HostRateLimiter(HOST, rate=0.1, burst=1)
+    await limiter.async_acquire(Priority.READ)
+
+    started_at = time.monotonic()
+    waiter = asyncio.ensure_future(limiter.async_acquire(Priority.READ))
+    await asyncio.sleep(0)
+    limiter.configure(rate=100.0, burst=1)
+    await asyncio.wait_for(waiter, 1)
+    assert time.monotonic() - started_at < 1
+
+
+async def test_options_set_the_shared_limiter(config_dir: str) -> None:
+    """Rate limit options apply to the limiter of the host without a reload."""
+    async with async_run_integration(
+        config_dir, options={CONF_RATE_LIMIT: 5.0, CONF_RATE_BURST: 3}
+    ) as integration:
+        hass = integration.hass
+        limiter = hass.data[DATA_RATE_LIMITERS][MODELS["purmo"].url]
+        assert (limiter._rate, limiter._burst) == (5.0, 3)
+
+        coordinator = integration.coordinator
+        hass.config_entries.async_update_entry(
+            integration.entry, options={CONF_RATE_LIMIT: 1.5, CONF_RATE_BURST: 20}
+        )
+        await hass.async_block_till_done()
+        assert integration.coordinator is coordinator
+        assert (limiter._rate, limiter._burst) == (1.5, 20)
@@ -0,0 +1,179 @@
+"""Tests of the services of the CleverTouch integration."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from clevertouch import ApiConnectError
+import pytest
+import voluptuous as vol
+
+from homeassistant.auth.const import GROUP_ID_ADMIN, GROUP_ID_USER
+from homeassistant.core import Context
+from homeassistant.exceptions import (
+    HomeAssistantError,
+    ServiceValidationError,
+    Unauthorized,
+)
+
+from custom_components.clevertouch.benchmarks.fake_cloud import FakeCloudConfig
+from custom_components.clevertouch.const import DOMAIN
+
+from common import async_run_integration
+
+
+@pytest.mark.parametrize(
+    "service", ["record_api_traffic", "profile_refresh", "refresh_metadata"]
+)
+async def test_admin_services(config_dir: str, service: str) -> None:
+    """Services writing files to the configuration directory need an admin."""
+    async with async_run_integration(config_dir) as integration:
+        hass = integration.hass
+        # The first user created is the owner
+        admin = await hass.auth.async_create_user("Admin", group_ids=[GROUP_ID_ADMIN])
+        user = await hass.auth.async_create_user("User", group_ids=[GROUP_ID_USER])
+
+        with pytest.raises(Unauthorized):
+            await hass.services.async_call(
+                DOMAIN, service, {}, blocking=True, context=Context(user_id=user.id)
+            )
+        await hass.services.async_call(
+            DOMAIN, service, {}, blocking=True, context=Context(user_id=admin.id)
+        )
+
+
+async def test_refresh_metadata(config_dir: str) -> None:
+    """Metadata is applied hourly, or right away when requested."""
+    async with async_run_integration(config_dir) as integration:
+        hass = integration.hass
+        coordinator = integration.coordinator
+        integration.cloud.homes["home0"]["zones"][0]["zone_label"] = "Living room"
+        integration.cloud.homes["home0"]["label"] = "Summer house"
+
+        await coordinator.async_refresh()
+        home = coordinator.homes["home0"]
+        assert home.info.label == "Home 0"
+
+        await hass.services.async_call(
+            DOMAIN, "refresh_metadata", {"home": "Home 0"}, blocking=True
+        )
+        assert home.info.label == "Summer house"
+        assert home.info.zones["1"].label == "Living room"
+
+        with pytest.raises(ServiceValidationError):
+            await hass.services.async_call(
+                DOMAIN, "refresh_metadata", {"home": "Home 0"}, blocking=True
+            )
+
+
+async def test_set_home_temperatures(config_dir: str) -> None:
+    """Temperatures are set on all radiators of a zone, leaving the heat mode."""
+    async with async_run_integration(
+        config_dir,
+        FakeCloudConfig(
+            radiators=4, outlets=0, zones=2, latency=0.0, jitter=0.0, change_rate=0.0
+        ),
+    ) as integration:
+        hass = integration.hass
+        integration.cloud.stats.reset()
+
+        response = await hass.services.async_call(
+            DOMAIN,
+            "set_home_temperatures",
+            {"zone": "Zone 1", "eco": 16, "boost_time": {"hours": 2}},
+            blocking=True,
+            return_response=True,
+        )
+
+        assert [device["success"] for device in response["devices"]] == [True, True]
+        assert integration.cloud.stats.requests["query/push"] == 4
+        for device_id, eco in (("0-C0", "608"), ("0-C1", "644"), ("0-C2", "608")):
+            device = integration.cloud_device(device_id)
+            assert device["consigne_eco"] == eco
+            assert device["gv_mode"] == "0"
+        state = hass.states.get(integration.entity_id("number", "0-C0", "temp_eco"))
+        assert float(state.state) == 16
+
+
+async def test_set_home_temperatures_needs_a_value(config_dir: str) -> None:
+    """At least one temperature, or the boost time, must be given."""
+    async with async_run_integration(config_dir) as integration:
+        with pytest.raises(vol.Invalid):
+            await integration.hass.services.async_call(
+                DOMAIN, "set_home_temperatures", {"home": "Home 0"}, blocking=True
+            )
+
+
+async def test_activate_home_heat_mode(config_dir: str) -> None:
+    """A heat mode is activated on all radiators of a home, with one update."""
+    async with async_run_integration(
+        config_dir,
+        FakeCloudConfig(
+            radiators=3, outlets=1, latency=0.0, jitter=0.0, change_rate=0.0
+        ),
+    ) as integration:
+        hass = integration.hass
+        coordinator = integration.coordinator
+        refresh_requests: list[set[str]] = []
+        request_homes_refresh = coordinator.async_request_homes_refresh
+
+        async def _request_homes_refresh(home_ids, **kwargs: Any) -> None:
+            refresh_requests.append(set(home_ids))
+            await request_homes_refresh(home_ids, **kwargs)
+
+        coordinator.async_request_homes_refresh = _request_homes_refresh
+
+        async def _fail(*args: Any, **kwargs: Any) -> None:
+            raise ApiConnectError("Connection reset")
+
+        coordinator.homes["home0"].devices["0-C2"].activate_mode = _fail
+
+        response = await hass.services.async_call(
+            DOMAIN,
+            "activate_home_heat_mode",
+            {"home": "Home 0", "mode": "Eco"},
+            blocking=True,
+            return_response=True,
+        )
+
+        assert [
+            (device["name"], device["success"]) for device in response["devices"]
+        ] == [
+            ("Zone 1 Radiator 0", True),
+            ("Zone 2 Radiator 1", True),
+            ("Zone 3 Radiator 2", False),
+        ]
+        assert refresh_requests == [{"home0"}]
+        for device_id, gv_mode in (("0-C0", "3"), ("0-C1", "3"), ("0-C2", "0")):
+            assert integration.cloud_device(device_id)["gv_mode"] == gv_mode
+        state = hass.states.get(integration.entity_id("climate", "0-C0", "radiator"))
+        assert state.attributes["preset_mode"] == "Eco"
+
+        with pytest.raises(HomeAssistantError, match="1 of 3 radiators"):
+            await hass.services.async_call(
+                DOMAIN,
+                "activate_home_heat_mode",
+                {"home": "Home 0", "mode": "Comfort"},
+                blocking=True,
+            )
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        {"home": "Home 1", "mode": "Eco"},
+        {"mode": "Eco", "duration": {"hours": 1}},
+        {"mode": "Off", "temperature": 20},
+    ],
+)
+async def test_activate_home_heat_mode_is_validated(
+    config_dir: str, data: dict[str, Any]
+) -> None:
+    """Unknown homes, and options the heat mode does not take, are rejected."""
+    async with async_run_integration(config_dir) as integration:
+        integration.cloud.stats.reset()
+        with pytest.raises(ServiceValidationError):
+            await integration.hass.services.async_call(
+                DOMAIN, "activate_home_heat_mode", data, blocking=True
+            )
+        assert integration.cloud.stats.requests["query/push"] == 0
@@ -0,0 +1,83 @@
+"""Tests of the writes to CleverTouch devices."""
+
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from common import async_run_integration
+
+DEVICE_ID = "0-C0"
+
+
+@pytest.fixture(autouse=True)
+def short_debounce():
+    """Flush writes right away."""
+    with patch(
+        "custom_components.clevertouch.coordinator.WRITE_DEBOUNCE_SECONDS", 0.01
+    ):
+        yield
+
+
+async def test_undoing_a_written_value_is_sent(config_dir: str) -> None:
+    """A write undoing a flushed write is sent, even before it was polled."""
+    async with async_run_integration(config_dir) as integration:
+        hass = integration.hass
+        entity_id = integration.entity_id("climate", DEVICE_ID, "radiator")
+        device = integration.cloud_device(DEVICE_ID)
+
+        for preset_mode, gv_mode in (("Eco", "3"), ("Comfort", "0")):
+            await hass.services.async_call(
+                "climate",
+                "set_preset_mode",
+                {"entity_id": entity_id, "preset_mode": preset_mode},
+                blocking=True,
+            )
+            assert device["gv_mode"] == gv_mode
+            assert hass.states.get(entity_id).attributes["preset_mode"] == preset_mode
+
+        assert integration.cloud.stats.requests["query/push"] == 2
+
+
+async def test_writing_the_current_value_is_dropped(config_dir: str) -> None:
+    """A write of the value last written is not sent again."""
+    async with async_run_integration(config_dir) as integration:
+        hass = integration.hass
+        entity_id = integration.entity_id("climate", DEVICE_ID, "radiator")
+
+        for _ in range(2):
+            await hass.services.async_call(
+                "climate",
+                "set_preset_mode",
+                {"entity_id": entity_id, "preset_mode": "Eco"},
+                blocking=True,
+            )
+
+        assert integration.cloud.stats.requests["query/push"] == 1
+
+
+async def test_writes_within_the_debounce_window_are_merged(config_dir: str) -> None:
+    """Only the last of several quick writes to a field is sent."""
+    async with async_run_integration(config_dir) as integration:
+        hass = integration.hass
+        entity_id = integration.entity_id("climate", DEVICE_ID, "radiator")
+        integration.cloud.stats.reset()
+
+        await asyncio.gather(
+            *(
+                hass.services.async_call(
+                    "climate",
+                    "set_temperature",
+                    {"entity_id": entity_id, "temperature": temperature},
+                    blocking=True,
+                )
+                for temperature in (19.0, 19.5, 20.0, 22.5)
+            )
+        )
+        await hass.async_block_till_done()
+
+        assert integration.cloud.stats.requests["query/push"] == 1
+        assert integration.cloud_device(DEVICE_ID)["consigne_confort"] == "725"
+        assert hass.states.get(entity_id).attributes["temperature"] == 22.5
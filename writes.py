@@ -0,0 +1,121 @@
+"""Debounced writes to CleverTouch devices."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+import logging
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+
+_LOGGER = logging.getLogger(__name__)
+
+type Writer = Callable[[Any], Awaitable[None]]
+type Reader = Callable[[], Any]
+
+
+class DeviceWriteQueue:
+    """Class to coalesce writes to a single device."""
+
+    # Interactive controls, e.g. dragging a thermostat slider, may set the same
+    # value many times in a row. Instead of sending every value to the cloud API,
+    # writes are held back for a short debounce window which is restarted on every
+    # new write. When the window expires, only the last value of each field is
+    # written, followed by a single request for quick updates.
+    #
+    # Callers wait until their field has been written (or superseded by a later
+    # value that has been written) and any error is raised to all of them.
+    #
+    # Each field comes with a reader returning its current value, i.e. the
+    # value last written or else polled, which is used to drop writes that
+    # would not change anything. A second reader, returning the polled value,
+    # is handed on with the written values so that the change can be confirmed
+    # later. Comparing with the polled value alone would drop a write undoing
+    # a previous write that was not polled yet.
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        delay: float,
+        on_flushed: Callable[[dict[str, tuple[Any, Reader]]], Awaitable[None]],
+    ) -> None:
+        """Initialize the write queue."""
+        self._hass = hass
+        self._delay = delay
+        self._on_flushed = on_flushed
+        self._pending: dict[str, tuple[Any, Writer, Reader]] = {}
+        self._waiters: dict[str, list[asyncio.Future[None]]] = {}
+        self._timer: asyncio.TimerHandle | None = None
+        self._lock = asyncio.Lock()
+
+    async def async_write(
+        self,
+        field: str,
+        value: Any,
+        writer: Writer,
+        *,
+        current: Reader,
+        reader: Reader,
+    ) -> None:
+        """Queue a value to be written and wait until it has been written.
+
+        If the value equals the current value of the field, any pending write
+        to the field is dropped instead.
+        """
+        if value == current():
+            if field in self._pending:
+                _LOGGER.debug("Dropping pending write of %s", field)
+                del self._pending[field]
+                self._resolve(self._waiters.pop(field, []), None)
+            return
+
+        self._pending[field] = (value, writer, reader)
+        future: asyncio.Future[None] = self._hass.loop.create_future()
+        self._waiters.setdefault(field, []).append(future)
+
+        if self._timer:
+            self._timer.cancel()
+        self._timer = self._hass.loop.call_later(self._delay, self._schedule_flush)
+
+        await future
+
+    async def async_flush(self) -> None:
+        """Write all pending values immediately."""
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+
+        async with self._lock:
+            pending, self._pending = self._pending, {}
+            waiters, self._waiters = self._waiters, {}
+            if not pending:
+                return
+
+            written: dict[str, tuple[Any, Reader]] = {}
+            for field, (value, writer, reader) in pending.items():
+                try:
+                    await writer(value)
+                except Exception as ex:  # pylint: disable=broad-except
+                    _LOGGER.debug("Write of %s failed: %s", field, ex)
+                    self._resolve(waiters.get(field, []), ex)
+                else:
+                    written[field] = (value, reader)
+                    self._resolve(waiters.get(field, []), None)
+
+        if written:
+            await self._on_flushed(written)
+
+    def _schedule_flush(self) -> None:
+        self._timer = None
+        self._hass.async_create_task(self.async_flush())
+
+    @staticmethod
+    def _resolve(waiters: list[asyncio.Future[None]], error: Exception | None) -> None:
+        for future in waiters:
+            if future.done():
+                continue
+            if error is None:
+                future.set_result(None)
+            else:
+                future.set_exception(error)